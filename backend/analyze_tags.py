@@ -1,45 +1,160 @@
+"""Tag statistics of RAW_recipes.csv.
+
+Counts every tag across the whole file and how often each pair of tags
+appears on the same recipe. The file is read in chunks and each chunk is
+counted in a worker process (map); the per-chunk Counters are summed as
+they come back (reduce), with at most a few chunks in flight at a time.
+
+Pair counts come from a chunk's recipe x tag incidence matrix: its Gram
+matrix X^T X holds, for every two tags, the number of recipes carrying
+both, which numpy computes far faster than enumerating pairs per recipe.
+
+The recipes carrying any tag of each multi-tag category option
+(recipe_filters.CATEGORY_GROUPS) are counted from the same matrix: the
+app builds and orders the category filters from these counts.
+
+The result is written as JSON next to the app's columnar cache
+(``data/.cache/RAW_recipes.tag_stats.json``) together with the size and
+mtime of the CSV it was computed from; the app ignores it once the CSV
+changes. Run from the repository root:
+
+    python backend/analyze_tags.py [data/RAW_recipes.csv] [--workers N] [--report]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-import ast
-from collections import Counter
-
-print("Анализ тегов в данных...")
-
-# Load data
-df = pd.read_csv('data/RAW_recipes.csv', nrows=10000)
-all_tags = []
-
-print(f"Загружено {len(df)} рецептов")
-
-# Extract all tags
-for tags_str in df['tags'].dropna():
-    try:
-        if isinstance(tags_str, str):
-            tags = ast.literal_eval(tags_str)
-            all_tags.extend(tags)
-    except:
-        continue
-
-print(f"Найдено {len(all_tags)} тегов всего")
-
-# Count tags
-tag_counts = Counter(all_tags)
-
-print("\n=== ТОП-50 САМЫХ ПОПУЛЯРНЫХ ТЕГОВ ===")
-for tag, count in tag_counts.most_common(50):
-    print(f"{tag}: {count}")
-
-# Find specific categories
-print("\n=== КАТЕГОРИИ БЛЮД ===")
-meal_tags = [tag for tag in tag_counts.keys() if any(word in tag for word in ['breakfast', 'lunch', 'dinner', 'dessert', 'appetizer', 'snack', 'drink', 'cocktail', 'side-dish'])]
-for tag in sorted(meal_tags):
-    print(f"{tag}: {tag_counts[tag]}")
-
-print("\n=== КУХНИ МИРА ===")
-cuisine_tags = [tag for tag in tag_counts.keys() if any(word in tag for word in ['mexican', 'italian', 'indian', 'thai', 'chinese', 'french', 'asian', 'american', 'mediterranean', 'spanish', 'japanese'])]
-for tag in sorted(cuisine_tags):
-    print(f"{tag}: {tag_counts[tag]}")
-
-print("\n=== ДИЕТЫ И ЗДОРОВЬЕ ===")
-diet_tags = [tag for tag in tag_counts.keys() if any(word in tag for word in ['vegetarian', 'vegan', 'healthy', 'low', 'diet', 'gluten', 'keto', 'diabetic'])]
-for tag in sorted(diet_tags):
-    print(f"{tag}: {tag_counts[tag]}")
\ No newline at end of file
+
+# The literal parser, cache layout and category definitions are the app's own
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frontend'))
+
+from columnar_cache import artifact_path  # noqa: E402
+from literal_parser import parse_string_lists  # noqa: E402
+from recipe_filters import CATEGORY_FILTERS, CATEGORY_GROUPS  # noqa: E402
+from tag_stats import ARTIFACT_SUFFIX, FORMAT_VERSION  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+CHUNKSIZE = 20000
+# Most frequent pairs kept in the artifact
+MAX_PAIRS = 20000
+
+
+def count_chunk(tags_column, groups=()):
+    """(recipes, tag counts, pair counts, group counts) of one chunk (runs in a worker process)"""
+    recipes = [sorted(set(tags)) if tags else [] for tags in parse_string_lists(tags_column)]
+    tag_counts = Counter(tag for tags in recipes for tag in tags)
+    vocabulary = sorted(tag_counts)
+    codes = {tag: i for i, tag in enumerate(vocabulary)}
+
+    incidence = np.zeros((len(recipes), len(vocabulary)), dtype=np.float32)
+    rows = np.repeat(np.arange(len(recipes)), [len(tags) for tags in recipes])
+    cols = np.fromiter((codes[tag] for tags in recipes for tag in tags), dtype=np.int64, count=len(rows))
+    incidence[rows, cols] = 1
+    together = incidence.T @ incidence
+
+    first, second = np.triu_indices(len(vocabulary), 1)
+    counts = together[first, second]
+    nonzero = counts > 0
+    pair_counts = Counter({
+        (vocabulary[a], vocabulary[b]): int(n)
+        for a, b, n in zip(first[nonzero], second[nonzero], counts[nonzero])
+    })
+
+    group_counts = Counter()
+    for group in groups:
+        columns = [codes[tag] for tag in group if tag in codes]
+        if columns:
+            group_counts[group] = int(incidence[:, columns].any(axis=1).sum())
+    return len(recipes), tag_counts, pair_counts, group_counts
+
+
+def count_tags(csv_path, workers=None, chunksize=CHUNKSIZE, groups=CATEGORY_GROUPS):
+    """(recipes, tag counts, pair counts, group counts) of the whole file"""
+    workers = workers or os.cpu_count() or 1
+    recipes, tag_counts, pair_counts, group_counts = 0, Counter(), Counter(), Counter()
+
+    def reduce(result):
+        nonlocal recipes
+        chunk_recipes, chunk_tags, chunk_pairs, chunk_groups = result
+        recipes += chunk_recipes
+        tag_counts.update(chunk_tags)
+        pair_counts.update(chunk_pairs)
+        group_counts.update(chunk_groups)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in pd.read_csv(csv_path, usecols=['tags'], chunksize=chunksize):
+            pending.append(pool.submit(count_chunk, chunk['tags'], groups))
+            # Bound the chunks held in memory while workers catch up
+            if len(pending) >= 2 * workers:
+                reduce(pending.popleft().result())
+        while pending:
+            reduce(pending.popleft().result())
+    # Every group is listed, with 0 for groups whose tags never occur
+    return recipes, tag_counts, pair_counts, {group: group_counts[group] for group in groups}
+
+
+def write_artifact(csv_path, recipes, tag_counts, pair_counts, group_counts, output=None):
+    """Write the statistics as JSON, tags and pairs by decreasing count"""
+    stat = os.stat(csv_path)
+    output = output or artifact_path(csv_path, ARTIFACT_SUFFIX)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp_path = output + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            'format_version': FORMAT_VERSION,
+            'source': {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns},
+            'recipes': recipes,
+            'tags': [[tag, count] for tag, count in tag_counts.most_common()],
+            'pairs': [[a, b, count] for (a, b), count in pair_counts.most_common(MAX_PAIRS)],
+            'groups': [[list(group), count] for group, count in group_counts.items()],
+        }, f)
+    os.replace(tmp_path, output)
+    return output
+
+
+def print_report(recipes, tag_counts, pair_counts):
+    """Human-readable summary of the statistics"""
+    print(f"Загружено {recipes} рецептов")
+    print(f"Найдено {sum(tag_counts.values())} тегов всего, {len(tag_counts)} различных")
+
+    print("\n=== ТОП-50 САМЫХ ПОПУЛЯРНЫХ ТЕГОВ ===")
+    for tag, count in tag_counts.most_common(50):
+        print(f"{tag}: {count}")
+
+    # The tags each category filter section is populated with
+    for title, _, _, words, _ in CATEGORY_FILTERS:
+        print(f"\n=== {title} ===")
+        for tag in sorted(tag for tag in tag_counts if any(word in tag for word in words)):
+            print(f"{tag}: {tag_counts[tag]}")
+
+    print("\n=== ЧАСТЫЕ СОЧЕТАНИЯ ТЕГОВ ===")
+    for (a, b), count in pair_counts.most_common(20):
+        print(f"{a} + {b}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count tags and tag pairs of a recipes CSV")
+    parser.add_argument("csv_path", nargs="?", default="data/RAW_recipes.csv")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default=None, help="artifact path (default: next to the app's cache)")
+    parser.add_argument("--report", action="store_true", help="also print the top tags, sections and pairs")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    recipes, tag_counts, pair_counts, group_counts = count_tags(args.csv_path, args.workers)
+    if args.report:
+        print_report(recipes, tag_counts, pair_counts)
+    output = write_artifact(args.csv_path, recipes, tag_counts, pair_counts, group_counts, args.output)
+    logger.info("%s recipes, %s distinct tags -> %s", f"{recipes:,}", f"{len(tag_counts):,}", output)
+
+
+if __name__ == "__main__":
+    main()
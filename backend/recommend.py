@@ -0,0 +1,228 @@
+"""Item-item collaborative filtering over RAW_interactions.csv.
+
+Builds the sparse user x recipe rating matrix and, for every recipe, the k
+recipes whose rating columns are most similar by cosine similarity. Each
+similarity is shrunk by n / (n + SHRINKAGE), where n is the number of
+users who rated both recipes, so a single shared rating does not make two
+obscure recipes look identical. Ratings of 0 (a review without a rating)
+are left out. So are users with more than --max-user-ratings ratings: a
+user with d ratings contributes d^2 recipe pairs and carries little
+signal about any one of them.
+
+The matrix is held twice in compressed sparse form, by recipe (CSC) and by
+user (CSR). The similarities of a block of recipes are the sparse product
+of their columns with the whole matrix: each rating (recipe i, user u) is
+expanded against every rating of user u, and the products are summed per
+(i, j) pair. Blocks are cut so each one expands to a bounded number of
+pairs. They are computed in worker processes, with at most a few blocks in
+flight at a time, and each worker keeps only its block's top k.
+
+The result is written to ``data/.cache/RAW_interactions.item_neighbors.npz``
+next to the app's columnar cache:
+
+- item_ids: int32 recipe ids;
+- neighbors: int32 (recipes, k) recipe ids, best first, padded with -1;
+- scores: the matching float32 similarities;
+- the size and mtime of the CSV it was computed from.
+
+The recipes view reads it to show "people who liked this also liked" and
+ignores it once the CSV changes. Run from the repository root:
+
+    python backend/recommend.py [data/RAW_interactions.csv] [--k 20] [--workers N]
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# The cache layout and artifact format are the app's own
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frontend'))
+
+from columnar_cache import artifact_path  # noqa: E402
+from recommendations import ARTIFACT_SUFFIX, FORMAT_VERSION  # noqa: E402
+
+DEFAULT_K = 20
+SHRINKAGE = 2.0
+MAX_USER_RATINGS = 1000
+# Expanded (recipe, recipe) products per block, bounding a worker's memory
+BLOCK_PAIRS = 4_000_000
+
+
+class RatingMatrix:
+    """User x recipe ratings in compressed sparse form, by recipe and by user"""
+
+    def __init__(self, item_ids, item_ptr, item_users, item_ratings, user_ptr, user_items, user_ratings):
+        self.item_ids = item_ids
+        self.item_ptr = item_ptr
+        self.item_users = item_users
+        self.item_ratings = item_ratings
+        self.user_ptr = user_ptr
+        self.user_items = user_items
+        self.user_ratings = user_ratings
+        self.norms = np.sqrt(self._per_item(item_ratings.astype(np.float64) ** 2))
+
+    @classmethod
+    def read(cls, csv_path, max_user_ratings=MAX_USER_RATINGS):
+        df = pd.read_csv(csv_path, usecols=['user_id', 'recipe_id', 'rating'])
+        df = df[df['rating'] > 0].drop_duplicates(['user_id', 'recipe_id'], keep='last')
+        user_counts = df['user_id'].map(df['user_id'].value_counts())
+        df = df[user_counts <= max_user_ratings]
+
+        item_ids, items = np.unique(df['recipe_id'].to_numpy(), return_inverse=True)
+        _, users = np.unique(df['user_id'].to_numpy(), return_inverse=True)
+        ratings = df['rating'].to_numpy(dtype=np.float32)
+        n_users = int(users.max()) + 1 if len(users) else 0
+
+        # Stable sorts keep each list in file order
+        by_item = np.argsort(items, kind='stable')
+        by_user = np.argsort(users, kind='stable')
+        return cls(
+            item_ids.astype(np.int32),
+            np.searchsorted(items[by_item], np.arange(len(item_ids) + 1)).astype(np.int64),
+            users[by_item].astype(np.int32),
+            ratings[by_item],
+            np.searchsorted(users[by_user], np.arange(n_users + 1)).astype(np.int64),
+            items[by_user].astype(np.int32),
+            ratings[by_user],
+        )
+
+    @property
+    def n_items(self):
+        return len(self.item_ids)
+
+    def _per_item(self, values):
+        """Sum of a per-rating array (in recipe order) for each recipe"""
+        items = np.repeat(np.arange(self.n_items), np.diff(self.item_ptr))
+        return np.bincount(items, weights=values, minlength=self.n_items)
+
+    def pair_costs(self):
+        """Number of expanded products of each recipe"""
+        return self._per_item(np.diff(self.user_ptr)[self.item_users]).astype(np.int64)
+
+    def blocks(self, block_pairs=BLOCK_PAIRS):
+        """(start, end) recipe ranges expanding to about block_pairs products each"""
+        ends = np.cumsum(self.pair_costs())
+        start = 0
+        while start < self.n_items:
+            budget = (ends[start - 1] if start else 0) + block_pairs
+            # At least one recipe per block, however popular its raters are
+            end = max(int(np.searchsorted(ends, budget, side='right')), start + 1)
+            yield start, min(end, self.n_items)
+            start = end
+
+
+def _ragged_positions(starts, lengths):
+    """Concatenation of arange(start, start + length) for every pair, vectorized"""
+    total = int(lengths.sum())
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(total)
+
+
+def similar_block(matrix, start, end, k):
+    """(neighbors, scores) of recipes start:end, as item indices and similarities (runs in a worker process)"""
+    lo, hi = matrix.item_ptr[start], matrix.item_ptr[end]
+    items = np.repeat(np.arange(start, end), np.diff(matrix.item_ptr[start:end + 1]))
+    users = matrix.item_users[lo:hi]
+    degrees = matrix.user_ptr[users + 1] - matrix.user_ptr[users]
+
+    # Every rating of the block against every other rating by the same user
+    positions = _ragged_positions(matrix.user_ptr[users], degrees)
+    first = np.repeat(items, degrees)
+    second = matrix.user_items[positions].astype(np.int64)
+    products = np.repeat(matrix.item_ratings[lo:hi], degrees) * matrix.user_ratings[positions]
+    distinct = first != second
+    keys = (first[distinct] - start) * matrix.n_items + second[distinct]
+
+    keys, inverse = np.unique(keys, return_inverse=True)
+    dots = np.bincount(inverse, weights=products[distinct], minlength=len(keys))
+    common = np.bincount(inverse, minlength=len(keys))
+    first, second = keys // matrix.n_items, keys % matrix.n_items
+    scores = dots / (matrix.norms[first + start] * matrix.norms[second]) * common / (common + SHRINKAGE)
+
+    # Best k per recipe: sort by recipe, then score descending (ties by recipe index)
+    order = np.lexsort((second, -scores, first))
+    first, second, scores = first[order], second[order], scores[order]
+    rank = np.arange(len(first)) - np.searchsorted(first, first)
+    keep = rank < k
+    neighbors = np.full((end - start, k), -1, dtype=np.int32)
+    best = np.zeros((end - start, k), dtype=np.float32)
+    neighbors[first[keep], rank[keep]] = second[keep]
+    best[first[keep], rank[keep]] = scores[keep]
+    return neighbors, best
+
+
+_worker_matrix = None
+
+
+def _init_worker(matrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _similar_block_task(start, end, k):
+    return start, similar_block(_worker_matrix, start, end, k)
+
+
+def item_neighbors(matrix, k=DEFAULT_K, workers=None):
+    """(neighbors, scores) of every recipe; neighbors are item indices, -1 padded"""
+    workers = workers or os.cpu_count() or 1
+    neighbors = np.full((matrix.n_items, k), -1, dtype=np.int32)
+    scores = np.zeros((matrix.n_items, k), dtype=np.float32)
+
+    def collect(result):
+        start, (block_neighbors, block_scores) = result
+        neighbors[start:start + len(block_neighbors)] = block_neighbors
+        scores[start:start + len(block_scores)] = block_scores
+
+    # The matrix is sent to each worker once, not with every block
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(matrix,)) as pool:
+        pending = deque()
+        for start, end in matrix.blocks():
+            pending.append(pool.submit(_similar_block_task, start, end, k))
+            # Bound the blocks held in memory while workers catch up
+            if len(pending) >= 2 * workers:
+                collect(pending.popleft().result())
+        while pending:
+            collect(pending.popleft().result())
+    return neighbors, scores
+
+
+def write_artifact(csv_path, matrix, neighbors, scores, output=None):
+    """Write the neighbours as recipe ids with their scores"""
+    stat = os.stat(csv_path)
+    output = output or artifact_path(csv_path, ARTIFACT_SUFFIX)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    neighbor_ids = np.where(neighbors >= 0, matrix.item_ids[np.maximum(neighbors, 0)], -1).astype(np.int32)
+    tmp_path = output + ".tmp.npz"
+    np.savez(tmp_path, format_version=FORMAT_VERSION, source_size=stat.st_size,
+             source_mtime_ns=stat.st_mtime_ns, item_ids=matrix.item_ids,
+             neighbors=neighbor_ids, scores=scores)
+    os.replace(tmp_path, output)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute the most similar recipes of every recipe from ratings")
+    parser.add_argument("csv_path", nargs="?", default="data/RAW_interactions.csv")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="neighbours kept per recipe")
+    parser.add_argument("--max-user-ratings", type=int, default=MAX_USER_RATINGS,
+                        help="leave out users with more ratings than this")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default=None, help="artifact path (default: next to the app's cache)")
+    args = parser.parse_args()
+
+    matrix = RatingMatrix.read(args.csv_path, args.max_user_ratings)
+    print(f"{len(matrix.item_ratings):,} ratings of {matrix.n_items:,} recipes by "
+          f"{len(matrix.user_ptr) - 1:,} users, {int(matrix.pair_costs().sum()):,} products")
+    neighbors, scores = item_neighbors(matrix, args.k, args.workers)
+    covered = int(np.count_nonzero(neighbors[:, 0] >= 0))
+    output = write_artifact(args.csv_path, matrix, neighbors, scores, args.output)
+    print(f"{covered:,} recipes with neighbours -> {output}")
+
+
+if __name__ == "__main__":
+    main()
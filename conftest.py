@@ -0,0 +1,3 @@
+# users/ holds Django tests, which need Django's runner and its test database:
+#     python backend/manage.py test users
+collect_ignore = ['users']
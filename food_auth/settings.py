@@ -11,6 +11,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -142,3 +143,8 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Recipe search and export API: the Streamlit app's index modules and the files they serve
+FRONTEND_DIR = BASE_DIR / 'frontend'
+RECIPES_CSV = os.environ.get('FOODCOM_RECIPES_CSV', str(BASE_DIR / 'data' / 'RAW_recipes.csv'))
+INTERACTIONS_CSV = os.environ.get('FOODCOM_INTERACTIONS_CSV', str(BASE_DIR / 'data' / 'RAW_interactions.csv'))
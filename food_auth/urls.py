@@ -15,13 +15,16 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from users.views import home
 from users.views_auth_redirect import redirect_to_streamlit
+from users.views_api import export, recipe_search
 
 urlpatterns = [
     path('', home, name='home'),
     path('admin/', admin.site.urls),
     path('accounts/', include('allauth.urls')),
     path('auth-redirect/', redirect_to_streamlit, name='auth-redirect'),
+    path('api/recipes/search', recipe_search, name='recipe-search'),
+    re_path(r'^api/export/(?P<kind>recipes|reviews)\.(?P<fmt>ndjson|csv)$', export, name='export'),
 ]
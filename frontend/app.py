@@ -2,12 +2,29 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import os
-import ast
 import json
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 from languages import get_text, LANGUAGES
+from binning import density_grid
+from columnar_cache import ensure_cache, load_dataset, read_rows
+from dataset_registry import REGISTRY
+from filter_engine import MASK_CACHE, evaluate
+from fingerprints import RowFingerprints, file_fingerprints
+from id_index import IdIndex, join_column
+from ingredient_index import load_or_build_index, match_pantry, pantry_coverage, parse_pantry
+from nutrition import NUTRITION_COLUMNS, NUTRITION_LABELS, column_means
+from profile_artifact import load_or_build_report
+from recipe_filters import CATEGORY_GROUPS, category_options, recipe_predicates
+from recipe_loaders import load_name_index, load_nutrition_matrix, load_recipes, load_tag_index
+from recommendations import AlsoLiked, artifact_version
+from result_cache import RESULT_CACHE
+from review_filters import review_predicates
+from review_loaders import load_review_search, load_review_sort_index, load_reviews
+from search_backend import SEARCH_BACKEND, NameSearch, search_version, sqlite_recipe_search
+from tag_categories import CATEGORIES, OTHER, TagCategories
+from tag_stats import TagStats
 
 # Page config
 st.set_page_config(
@@ -16,21 +33,123 @@ st.set_page_config(
     layout="wide"
 )
 
+# Recommendations listed per recipe card
+ALSO_LIKED_SHOWN = 5
+
+# Row caps used when full-dataset mode is off
+RECIPE_SAMPLE_ROWS = 5000
+REVIEW_SAMPLE_ROWS = 10000
+ANALYSIS_SAMPLE_ROWS = 10000
+
+# Upper bound of each nutrition slider; selecting it means "no upper limit"
+NUTRITION_SLIDER_MAX = {'calories': 1000}
+NUTRITION_PDV_SLIDER_MAX = 200
+
+# Scatter plots with more points than this are drawn as 2D density grids
+SCATTER_MAX_POINTS = int(os.environ.get("FOODCOM_SCATTER_MAX_POINTS", 5000))
+
+# Review sort options -> (column, ascending)
+REVIEW_SORT_KEYS = {
+    "Date (Newest)": ('date', False),
+    "Date (Oldest)": ('date', True),
+    "Rating (High)": ('rating', False),
+    "Rating (Low)": ('rating', True),
+    "Review Length": ('review_length', False),
+}
+
+# Tag groups of the recipe cards: (category code, icon, title, tags shown)
+TAG_CATEGORY_DISPLAY = [
+    (CATEGORIES.index('cuisine'), "🌍", "Cuisine", 3),
+    (CATEGORIES.index('diet'), "🥗", "Diet", 3),
+    (CATEGORIES.index('method'), "👩‍🍳", "Method", 3),
+    (CATEGORIES.index('occasion'), "🎉", "Occasion", 2),
+]
+
 def load_data():
     """Load recipe data from CSV files"""
-    data_files = {}
-    
     # Look for CSV files in current directory and data folder
     search_paths = [".", "data"]
-    
-    for path in search_paths:
-        if os.path.exists(path):
-            for file in os.listdir(path):
-                if file.endswith('.csv'):
-                    full_path = os.path.join(path, file)
-                    data_files[file] = full_path
-    
-    return data_files
+    return REGISTRY.list_csv_files(search_paths)
+
+def load_tag_stats(file_path):
+    """Shared tag frequencies: the tag statistics artifact when fresh, else the tag index counts"""
+    tag_index = load_tag_index(file_path)
+    return REGISTRY.derived(file_path, "recipes", "tag_stats", load_dataset,
+                            lambda df: TagStats.load(file_path) or TagStats.from_index(tag_index, CATEGORY_GROUPS))
+
+def load_tag_categories(file_path):
+    """Shared per-recipe tag breakdown by display category"""
+    return REGISTRY.derived(file_path, "recipes", "tag_categories", load_dataset,
+                            lambda df: TagCategories.build(df['tags']))
+
+def load_ingredient_index(file_path):
+    """Shared normalized ingredient -> recipe bitmap index"""
+    return REGISTRY.derived(file_path, "recipes", "ingredient_index", load_dataset,
+                            lambda df: load_or_build_index(file_path, df['ingredients']))
+
+def load_id_index(file_path):
+    """Shared recipe id -> row position index, persisted next to the columnar cache"""
+    return REGISTRY.derived(file_path, "recipes", "id_index", load_dataset,
+                            lambda df: IdIndex.load_or_build(file_path, df['id']))
+
+def load_also_liked(file_path, interactions_path):
+    """Shared "also liked" neighbours keyed by recipe row, or None until backend/recommend.py has run"""
+    id_index = load_id_index(file_path)
+    # Keyed by the artifact's version too, so a fresh run of the job is picked up
+    name = f"also_liked:{interactions_path}:{artifact_version(interactions_path)}"
+    return REGISTRY.derived(file_path, "recipes", name, load_dataset,
+                            lambda df: AlsoLiked.load(interactions_path, id_index, len(df)))
+
+def load_recipe_search(file_path):
+    """Recipe text search with the configured backend (see search_backend)"""
+    df = load_recipes(file_path)
+    if SEARCH_BACKEND == "sqlite":
+        return sqlite_recipe_search(load_id_index(file_path), df['id'].to_numpy())
+    return NameSearch(load_name_index(file_path), df['name'])
+
+def read_analysis_sample(path):
+    return pd.read_csv(path, nrows=ANALYSIS_SAMPLE_ROWS)
+
+def load_analysis_sample(file_path):
+    """Shared first rows of any CSV, for the row-level analysis views outside full-dataset mode"""
+    return REGISTRY.get(file_path, "analysis", read_analysis_sample)
+
+def load_analysis_columns(file_path, columns, full_dataset=False):
+    """Shared columns of the analysis rows: every row from the columnar cache, or the sample"""
+    if full_dataset:
+        # Only the requested columns of the whole file are read, never the full frame
+        return REGISTRY.get(file_path, f"analysis-columns:{','.join(columns)}",
+                            lambda path: load_dataset(path, columns=columns))
+    return load_analysis_sample(file_path)[columns]
+
+def read_analysis_rows(file_path, rows, full_dataset=False):
+    """Analysis rows at the given positions"""
+    if full_dataset:
+        return read_rows(file_path, rows)
+    return load_analysis_sample(file_path).take(rows)
+
+def load_fingerprints(file_path, full_dataset=False):
+    """Shared row fingerprints of the analysis rows, computed once per version of the file"""
+    if full_dataset:
+        return REGISTRY.get(file_path, "analysis-fingerprints",
+                            lambda path: RowFingerprints(file_fingerprints(path)))
+    return REGISTRY.derived(file_path, "analysis", "fingerprints", read_analysis_sample, RowFingerprints.build)
+
+def load_profile(file_path, progress=None):
+    """Shared profile report of a whole CSV, read from its persisted artifact when fresh"""
+    return REGISTRY.get(file_path, "profile", lambda path: load_or_build_report(path, progress))
+
+def load_with_progress(load, file_path, message, **kwargs):
+    """Run a dataset loader, showing a progress bar while it ingests the file"""
+    progress_bar = st.progress(0.0, text=message)
+    try:
+        return load(file_path, progress=lambda fraction: progress_bar.progress(fraction, text=message), **kwargs)
+    finally:
+        progress_bar.empty()
+
+def has_items(value):
+    """Check that a parsed list cell is present and non-empty"""
+    return value is not None and len(value) > 0
 
 def main():
     # Language selection
@@ -98,6 +217,17 @@ def main():
     # Data file selection
     st.sidebar.header(get_text(language, "data_selection"))
 
+    full_dataset = st.sidebar.toggle(
+        "🌐 Full dataset",
+        help="Use every row of the selected file instead of the first few thousand"
+    )
+
+    if st.sidebar.button("🔄 Reload data"):
+        REGISTRY.invalidate()
+        RESULT_CACHE.clear()
+        MASK_CACHE.clear()
+        data_files = load_data()
+
     if "📖" in view_mode:  # Recipes mode
         recipe_files = [f for f in data_files.keys() if 'recipe' in f.lower()]
         # Prioritize RAW_recipes.csv
@@ -111,7 +241,7 @@ def main():
                 recipe_files,
                 index=default_idx
             )
-            show_recipes(data_files[selected_file], language)
+            show_recipes(data_files[selected_file], language, full_dataset)
         else:
             st.error(get_text(language, "select_file_sidebar"))
 
@@ -128,7 +258,7 @@ def main():
                 review_files,
                 index=default_idx
             )
-            show_reviews(data_files[selected_file], language)
+            show_reviews(data_files[selected_file], language, full_dataset)
         else:
             st.error(get_text(language, "select_reviews_sidebar"))
 
@@ -141,16 +271,30 @@ def main():
             get_text(language, "select_data"),
             list(data_files.keys())
         )
-        show_analysis(data_files[selected_file], language)
+        show_analysis(data_files[selected_file], language, full_dataset)
 
-def show_recipes(file_path, language):
+    # Cache counters, for sizing FOODCOM_CACHE_MB, FOODCOM_RESULT_CACHE_MB and FOODCOM_MASK_CACHE_MB
+    with st.sidebar.expander("🗄️ Cache statistics"):
+        datasets = REGISTRY.stats()
+        results = RESULT_CACHE.stats()
+        st.caption(f"Datasets: {datasets['entries']} loaded, "
+                   f"{datasets['bytes'] / 2**20:,.0f} of {datasets['budget_bytes'] / 2**20:,.0f} MB")
+        st.caption(f"Filter results: {results['hits']} hits, {results['disk_hits']} disk hits, "
+                   f"{results['misses']} misses ({results['hit_rate']:.0%}), "
+                   f"{results['entries']} entries, {results['bytes'] / 2**20:,.1f} MB")
+        masks = MASK_CACHE.stats()
+        st.caption(f"Predicate masks: {masks['hits']} hits, {masks['misses']} misses ({masks['hit_rate']:.0%}), "
+                   f"{masks['entries']} entries, {masks['bytes'] / 2**20:,.1f} MB")
+
+def show_recipes(file_path, language, full_dataset=False):
     """Display enhanced recipes interface"""
     st.header(get_text(language, "recipes_title"))
     
     try:
         # Load data with progress bar
-        with st.spinner("Loading recipes..."):
-            df = pd.read_csv(file_path, nrows=5000)  # Increased limit
+        df = load_with_progress(load_recipes, file_path, "Loading recipes...")
+        if not full_dataset:
+            df = df.head(RECIPE_SAMPLE_ROWS)
         
         # Enhanced filters sidebar
         st.sidebar.subheader("🔍 Recipe Filters")
@@ -183,250 +327,125 @@ def show_recipes(file_path, language):
                 (1, 20)
             )
         
-        # Enhanced category filters
+        # Pantry search
+        pantry = []
+        if 'ingredients' in df.columns:
+            st.sidebar.subheader("🧺 Cook With What I Have")
+            pantry = parse_pantry(st.sidebar.text_area(
+                "Ingredients you have",
+                placeholder="eggs, butter, flour, milk...",
+                help="Comma- or newline-separated"
+            ))
+            max_missing = st.sidebar.number_input("Missing ingredients allowed", 0, 10, 0)
+        
+        # Category filters, built from the tag statistics and ordered by how many recipes they match
+        selected_categories = []
+        more_tags = []
         if 'tags' in df.columns:
-            st.sidebar.subheader("📋 Recipe Categories")
-            
-            # Meal Type Filter
-            meal_types = {
-                "🌅 Breakfast": ['breakfast', 'brunch', 'breakfast-eggs'],
-                "🥪 Lunch": ['lunch', 'lunch-snacks'],  
-                "🍽️ Dinner": ['main-dish', 'dinner-party'],
-                "🍰 Desserts": ['desserts', 'frozen-desserts'],
-                "🥨 Appetizers": ['appetizers', 'snacks'],
-                "🍹 Drinks": ['cocktails', 'beverages'],
-                "🥗 Side Dishes": ['side-dishes']
-            }
-            
-            selected_meal_types = st.sidebar.multiselect(
-                "🍽️ Meal Types",
-                list(meal_types.keys())
-            )
-            
-            # Cuisine Filter  
-            st.sidebar.subheader("🌍 World Cuisines")
-            cuisines = {
-                "🇲🇽 Mexican": ['mexican'],
-                "🇮🇹 Italian": ['italian'],
-                "🇺🇸 American": ['american', 'north-american'],
-                "🇨🇳 Chinese": ['chinese'],
-                "🇮🇳 Indian": ['indian'],
-                "🇫🇷 French": ['french'],
-                "🇹🇭 Thai": ['thai'],
-                "🇯🇵 Japanese": ['japanese'],
-                "🇪🇸 Spanish": ['spanish'],
-                "🌏 Asian": ['asian']
-            }
-            
-            selected_cuisines = st.sidebar.multiselect(
-                "🌍 Select Cuisines",
-                list(cuisines.keys())
-            )
-            
-            # Diet & Health Filter
-            st.sidebar.subheader("🥗 Diet & Health")
-            diet_options = {
-                "🌱 Vegetarian": ['vegetarian'],
-                "🌿 Vegan": ['vegan'],
-                "💪 Healthy": ['healthy', 'healthy-2'],
-                "🔥 Low-Carb": ['low-carb', 'very-low-carbs'],
-                "🧈 Low-Fat": ['low-fat'],
-                "🧂 Low-Sodium": ['low-sodium'],
-                "❤️ Low-Cholesterol": ['low-cholesterol'],
-                "🍯 Diabetic": ['diabetic'],
-                "🌾 Gluten-Free": ['gluten-free']
-            }
-            
-            selected_diets = st.sidebar.multiselect(
-                "🥗 Dietary Preferences",
-                list(diet_options.keys())
-            )
-            
-            # Cooking Method Filter
-            st.sidebar.subheader("👩‍🍳 Cooking Methods")
-            cooking_methods = {
-                "🥘 Slow Cooker": ['crock-pot-slow-cooker'],
-                "🔥 Grilling": ['grilling', 'barbecue'],
-                "🥧 Baking": ['oven', 'baking'],
-                "⚡ Quick & Easy": ['15-minutes-or-less', '30-minutes-or-less', 'easy'],
-                "🍳 Beginner": ['beginner-cook', '3-steps-or-less'],
-                "💰 Budget": ['inexpensive', '5-ingredients-or-less']
-            }
-            
-            selected_methods = st.sidebar.multiselect(
-                "👩‍� Cooking Style",
-                list(cooking_methods.keys())
-            )
-            
-            # Occasion Filter
-            st.sidebar.subheader("🎉 Special Occasions")
-            occasions = {
-                "🎄 Christmas": ['christmas'],
-                "🎃 Halloween": ['halloween'],  
-                "🦃 Thanksgiving": ['thanksgiving'],
-                "💕 Valentine's": ['valentines-day'],
-                "☘️ St Patrick's": ['st-patricks-day'],
-                "🐰 Easter": ['easter'],
-                "🎆 4th of July": ['4th-of-july'],
-                "🎊 New Year": ['new-years'],
-                "🎂 Birthday": ['birthday'],
-                "🥳 Party": ['dinner-party', 'party']
-            }
-            
-            selected_occasions = st.sidebar.multiselect(
-                "🎉 Occasions",
-                list(occasions.keys())
-            )
-            
-            # Seasonal Filter
-            st.sidebar.subheader("🌿 Seasonal")
-            seasons = {
-                "🌸 Spring": ['spring'],
-                "☀️ Summer": ['summer'],
-                "🍂 Fall": ['fall', 'autumn'],
-                "❄️ Winter": ['winter']
-            }
-            
-            selected_seasons = st.sidebar.multiselect(
-                "🌿 Seasons",
-                list(seasons.keys())
-            )
-            
-            # Difficulty Filter
-            st.sidebar.subheader("⭐ Difficulty Level")
-            difficulty_levels = {
-                "👶 Beginner": ['beginner-cook', '3-steps-or-less', 'easy'],
-                "⚡ Quick (15 min)": ['15-minutes-or-less'],
-                "🕐 Medium (30 min)": ['30-minutes-or-less'],
-                "🕒 Long (60 min)": ['60-minutes-or-less'],
-                "👨‍🍳 Advanced": ['intermediate-cook', 'advanced']
-            }
-            
-            selected_difficulty = st.sidebar.multiselect(
-                "⭐ Recipe Difficulty",
-                list(difficulty_levels.keys())
+            tag_stats = load_tag_stats(file_path)
+            for title, label, icon, options in category_options(tag_stats):
+                st.sidebar.subheader(title)
+                selected = st.sidebar.multiselect(
+                    label,
+                    list(options),
+                    format_func=lambda option, options=options: f"{option} ({options[option][1]:,})"
+                )
+                selected_categories.extend((icon, option, options[option][0]) for option in selected)
+            
+            # Every tag of the file, most frequent first
+            st.sidebar.subheader("🏷️ More Tags")
+            more_tags = st.sidebar.multiselect(
+                "🏷️ Any tag",
+                tag_stats.most_common(),
+                format_func=lambda tag: f"{tag} ({tag_stats.count(tag):,})",
+                help=f"Counts cover all {tag_stats.recipes:,} recipes of the file"
             )
+            if more_tags and tag_stats.has_pairs:
+                st.sidebar.caption("Often together with: " + ", ".join(
+                    f"{tag} ({count:,})" for tag, count in tag_stats.related(more_tags)
+                ))
         
         # Nutrition filters
+        nutrition = None
+        nutrition_ranges = {}
         if 'nutrition' in df.columns:
             st.sidebar.subheader("📊 Nutrition Filters")
             
-            # Extract nutrition data for filtering
-            nutrition_data = []
-            for nutrition_str in df['nutrition'].dropna().head(1000):
-                try:
-                    nutrition = ast.literal_eval(nutrition_str)
-                    if len(nutrition) >= 7:
-                        nutrition_data.append(nutrition)
-                except:
-                    continue
+            # Dense (N, 7) matrix over the whole file, indexed by row position
+            nutrition = load_nutrition_matrix(file_path)
             
-            if nutrition_data:
-                nutrition_df = pd.DataFrame(nutrition_data, 
-                    columns=['calories', 'fat', 'sugar', 'sodium', 'protein', 'saturated_fat', 'carbs'])
-                
+            if not np.isnan(nutrition[:, 0]).all():
                 # Calorie filter
-                if not nutrition_df['calories'].isna().all():
-                    cal_range = st.sidebar.slider(
-                        "🔥 Calories",
-                        0, 1000, (0, 500)
-                    )
+                cal_max = NUTRITION_SLIDER_MAX['calories']
+                cal_range = st.sidebar.slider(
+                    "🔥 Calories",
+                    0, cal_max, (0, cal_max),
+                    help=f"{cal_max} means no upper limit"
+                )
+                nutrition_ranges['calories'] = cal_range
+                
+                with st.sidebar.expander("🥩 More nutrition filters (% daily value)"):
+                    for column, label in zip(NUTRITION_COLUMNS[1:], NUTRITION_LABELS[1:]):
+                        column_max = NUTRITION_SLIDER_MAX.get(column, NUTRITION_PDV_SLIDER_MAX)
+                        nutrition_ranges[column] = st.slider(
+                            label, 0, column_max, (0, column_max),
+                            help=f"{column_max} means no upper limit"
+                        )
         
-        # Apply filters
-        filtered_df = df.copy()
+        # Combine all selected category filters
+        all_selected_tags = [tag for _, _, tags in selected_categories for tag in tags] + more_tags
         
-        # Name filter
-        if search_term:
-            filtered_df = filtered_df[
-                filtered_df['name'].str.contains(search_term, case=False, na=False)
-            ]
+        # Only nutrition sliders moved off their full range filter anything
+        nutrition_filters = {}
+        for column, (low, high) in nutrition_ranges.items():
+            column_max = NUTRITION_SLIDER_MAX.get(column, NUTRITION_PDV_SLIDER_MAX)
+            if low > 0 or high < column_max:
+                nutrition_filters[column] = (low, high if high < column_max else None)
         
-        # Time filter
-        if 'minutes' in df.columns:
-            filtered_df = filtered_df[
-                (filtered_df['minutes'] >= min_time) & 
-                (filtered_df['minutes'] <= max_time)
-            ]
+        def filter_rows():
+            """Row positions of df passing every filter, in display order"""
+            # Each predicate's mask is cached by its parameters: only changed filters are recomputed
+            predicates = recipe_predicates(df, filter_state,
+                                           lambda: load_recipe_search(file_path),
+                                           lambda: load_tag_index(file_path),
+                                           lambda: nutrition)
+            keep = evaluate("recipes", search_version(file_path), len(df), predicates)
+            
+            # Pantry filter, ranked by the share of ingredients already at hand
+            if pantry:
+                ranked, _, _ = match_pantry(load_ingredient_index(file_path), pantry, max_missing)
+                ranked = ranked[ranked < len(df)]
+                return ranked[keep[ranked]]
+            # Text search results by relevance
+            if filter_state['name']:
+                ranked, _ = load_recipe_search(file_path).ranked(filter_state['name'])
+                ranked = ranked[ranked < len(df)]
+                return ranked[keep[ranked]]
+            return np.flatnonzero(keep)
         
-        # Ingredients filter
-        if 'n_ingredients' in df.columns:
-            filtered_df = filtered_df[
-                (filtered_df['n_ingredients'] >= min_ingr) & 
-                (filtered_df['n_ingredients'] <= max_ingr)
-            ]
-        
-        # Apply category filters
-        if 'tags' in df.columns:
-            # Combine all selected filters
-            all_selected_tags = []
-            
-            # Add meal type tags
-            if selected_meal_types:
-                for meal_type in selected_meal_types:
-                    all_selected_tags.extend(meal_types[meal_type])
-            
-            # Add cuisine tags
-            if selected_cuisines:
-                for cuisine in selected_cuisines:
-                    all_selected_tags.extend(cuisines[cuisine])
-            
-            # Add diet tags
-            if selected_diets:
-                for diet in selected_diets:
-                    all_selected_tags.extend(diet_options[diet])
-            
-            # Add cooking method tags
-            if selected_methods:
-                for method in selected_methods:
-                    all_selected_tags.extend(cooking_methods[method])
-            
-            # Add occasion tags
-            if selected_occasions:
-                for occasion in selected_occasions:
-                    all_selected_tags.extend(occasions[occasion])
-            
-            # Add seasonal tags
-            if selected_seasons:
-                for season in selected_seasons:
-                    all_selected_tags.extend(seasons[season])
-            
-            # Add difficulty tags
-            if selected_difficulty:
-                for difficulty in selected_difficulty:
-                    all_selected_tags.extend(difficulty_levels[difficulty])
-            
-            # Apply tag filter if any tags selected
-            if all_selected_tags:
-                def check_tags(tags_str):
-                    if pd.isna(tags_str):
-                        return False
-                    try:
-                        tags = ast.literal_eval(str(tags_str))
-                        return any(tag in tags for tag in all_selected_tags)
-                    except:
-                        return False
-                
-                filtered_df = filtered_df[filtered_df['tags'].apply(check_tags)]
+        # Canonical filter state: selections sorted, inactive filters left out
+        filter_state = {
+            'rows': len(df),
+            'name': search_term.lower() if search_term and 'name' in df.columns else '',
+            'minutes': [min_time, max_time] if 'minutes' in df.columns else None,
+            'n_ingredients': [min_ingr, max_ingr] if 'n_ingredients' in df.columns else None,
+            'nutrition': {column: list(bounds) for column, bounds in nutrition_filters.items()},
+            'tags': sorted(set(all_selected_tags)),
+            'pantry': pantry,
+            'max_missing': max_missing if pantry else 0,
+        }
+        rows = RESULT_CACHE.rows("recipes", search_version(file_path), filter_state, filter_rows)
+        filtered_df = df.iloc[rows]
         
         # Display filter summary and results
         st.subheader(f"🍽️ Found {len(filtered_df):,} recipes out of {len(df):,} total")
         
         # Show active filters summary
         active_filters = []
-        if selected_meal_types:
-            active_filters.extend([f"📋 {meal}" for meal in selected_meal_types])
-        if selected_cuisines:
-            active_filters.extend([f"🌍 {cuisine}" for cuisine in selected_cuisines])
-        if selected_diets:
-            active_filters.extend([f"🥗 {diet}" for diet in selected_diets])
-        if selected_methods:
-            active_filters.extend([f"👩‍🍳 {method}" for method in selected_methods])
-        if selected_occasions:
-            active_filters.extend([f"🎉 {occasion}" for occasion in selected_occasions])
-        if selected_seasons:
-            active_filters.extend([f"🌿 {season}" for season in selected_seasons])
-        if selected_difficulty:
-            active_filters.extend([f"⭐ {diff}" for diff in selected_difficulty])
+        active_filters.extend(f"{icon} {option}" for icon, option, _ in selected_categories)
+        active_filters.extend(f"🏷️ {tag}" for tag in more_tags)
+        if pantry:
+            active_filters.append(f"🧺 {len(pantry)} pantry items")
         
         if active_filters:
             st.info(f"**Active filters:** {', '.join(active_filters)}")
@@ -448,18 +467,18 @@ def show_recipes(file_path, language):
                 st.metric("👩‍🍳 Avg Steps", f"{avg_steps:.0f}")
             
             with col4:
-                if 'nutrition' in filtered_df.columns:
-                    # Calculate average calories
-                    calories_list = []
-                    for nutrition_str in filtered_df['nutrition'].dropna():
-                        try:
-                            nutrition = ast.literal_eval(nutrition_str)
-                            if len(nutrition) > 0:
-                                calories_list.append(nutrition[0])
-                        except:
-                            continue
-                    avg_calories = sum(calories_list) / len(calories_list) if calories_list else 0
+                if nutrition is not None:
+                    # Averages over the current selection
+                    nutrition_means = column_means(nutrition, filtered_df.index.to_numpy())
+                    avg_calories = np.nan_to_num(nutrition_means['calories'])
                     st.metric("🔥 Avg Calories", f"{avg_calories:.0f}")
+            
+            if nutrition is not None:
+                st.caption("Avg per serving: " + ", ".join(
+                    f"{label} {nutrition_means[column]:.0f}"
+                    for column, label in zip(NUTRITION_COLUMNS[1:], NUTRITION_LABELS[1:])
+                    if not np.isnan(nutrition_means[column])
+                ))
         
         # Results per page
         results_per_page = st.selectbox("📄 Results per page", [5, 10, 20, 50], index=1)
@@ -475,6 +494,20 @@ def show_recipes(file_path, language):
             else:
                 page_df = filtered_df.head(results_per_page)
             
+            tag_categories = load_tag_categories(file_path) if 'tags' in df.columns else None
+            
+            # Item-item neighbours from the ratings, if the offline job has been run
+            # Found where the file selector looks, like the recipes file itself
+            interactions_path = load_data().get('RAW_interactions.csv')
+            also_liked = load_also_liked(file_path, interactions_path) if interactions_path else None
+            recipe_names = load_recipes(file_path)['name']
+            
+            # Where the search text matched, excerpted for this page's recipes only
+            snippets = {}
+            if filter_state['name']:
+                page_rows = page_df.index.to_numpy()
+                snippets = dict(zip(page_rows, load_recipe_search(file_path).snippets(filter_state['name'], page_rows)))
+            
             # Show recipes
             for idx, recipe in page_df.iterrows():
                 with st.expander(f"🍽️ {recipe['name']}"):
@@ -498,6 +531,13 @@ def show_recipes(file_path, language):
                         # Rating (if available)
                         st.metric("📊 Recipe ID", recipe.get('id', 'N/A'))
                     
+                    if pantry and has_items(recipe.get('ingredients')):
+                        have, recipe_size = pantry_coverage(recipe['ingredients'], pantry)
+                        st.write(f"🧺 **You have {have} of {recipe_size} ingredients**")
+                    
+                    if snippets.get(idx):
+                        st.caption(f"🔎 {snippets[idx]}")
+                    
                     st.divider()
                     
                     # Main content
@@ -510,93 +550,47 @@ def show_recipes(file_path, language):
                             st.write(recipe['description'])
                         
                         # Cooking steps
-                        if 'steps' in recipe and pd.notna(recipe['steps']):
+                        if 'steps' in recipe and has_items(recipe['steps']):
                             st.markdown("**👩‍🍳 Cooking Steps:**")
-                            try:
-                                steps = ast.literal_eval(recipe['steps'])
-                                for i, step in enumerate(steps, 1):
-                                    st.write(f"{i}. {step}")
-                            except:
-                                st.write(recipe['steps'])
+                            for i, step in enumerate(recipe['steps'], 1):
+                                st.write(f"{i}. {step}")
                         
                         # Ingredients list
-                        if 'ingredients' in recipe and pd.notna(recipe['ingredients']):
+                        if 'ingredients' in recipe and has_items(recipe['ingredients']):
                             st.markdown("**🛒 Ingredients:**")
-                            try:
-                                ingredients = ast.literal_eval(recipe['ingredients'])
-                                # Display in columns for better layout
-                                ing_cols = st.columns(2)
-                                for i, ingredient in enumerate(ingredients):
-                                    with ing_cols[i % 2]:
-                                        st.write(f"• {ingredient}")
-                            except:
-                                st.write(recipe['ingredients'])
+                            # Display in columns for better layout
+                            ing_cols = st.columns(2)
+                            for i, ingredient in enumerate(recipe['ingredients']):
+                                with ing_cols[i % 2]:
+                                    st.write(f"• {ingredient}")
                     
                     with col_right:
                         # Nutrition info
-                        if 'nutrition' in recipe and pd.notna(recipe['nutrition']):
+                        if 'nutrition' in recipe and has_items(recipe['nutrition']):
                             st.markdown("**📊 Nutrition (per serving):**")
                             try:
-                                nutrition = ast.literal_eval(recipe['nutrition'])
-                                nutrition_labels = ['Calories', 'Fat (g)', 'Sugar (g)', 
-                                                  'Sodium (mg)', 'Protein (g)', 
-                                                  'Saturated Fat (g)', 'Carbs (g)']
-                                
-                                for i, (label, value) in enumerate(zip(nutrition_labels, nutrition)):
-                                    if i < len(nutrition):
-                                        st.write(f"• **{label}:** {value}")
+                                # Not `nutrition`: that name is the matrix the filter predicates read
+                                recipe_nutrition = recipe['nutrition']
+                                for label, value in zip(NUTRITION_LABELS, recipe_nutrition):
+                                    st.write(f"• **{label}:** {value:g}")
                             except:
                                 st.write("Nutrition data available")
                         
                         # Enhanced Tags/Categories display
-                        if 'tags' in recipe and pd.notna(recipe['tags']):
+                        if 'tags' in recipe and has_items(recipe['tags']):
                             st.markdown("**🏷️ Categories:**")
                             try:
-                                tags = ast.literal_eval(recipe['tags'])
-                                
-                                # Categorize tags for better display
-                                cuisine_found = []
-                                diet_found = []
-                                method_found = []
-                                occasion_found = []
-                                
-                                cuisine_keywords = ['mexican', 'italian', 'american', 'chinese', 'indian', 
-                                                   'french', 'thai', 'japanese', 'spanish', 'asian']
-                                diet_keywords = ['vegetarian', 'vegan', 'healthy', 'low-carb', 'low-fat', 
-                                               'low-sodium', 'diabetic', 'gluten-free']
-                                method_keywords = ['easy', 'quick', 'slow-cooker', 'oven', 'grilling', 
-                                                  'baking', 'beginner-cook']
-                                occasion_keywords = ['christmas', 'halloween', 'thanksgiving', 'party', 
-                                                    'birthday', 'holiday']
-                                
-                                for tag in tags:
-                                    tag_lower = tag.lower()
-                                    if any(keyword in tag_lower for keyword in cuisine_keywords):
-                                        cuisine_found.append(tag)
-                                    elif any(keyword in tag_lower for keyword in diet_keywords):
-                                        diet_found.append(tag)
-                                    elif any(keyword in tag_lower for keyword in method_keywords):
-                                        method_found.append(tag)
-                                    elif any(keyword in tag_lower for keyword in occasion_keywords):
-                                        occasion_found.append(tag)
-                                
-                                # Display categorized tags
-                                if cuisine_found:
-                                    st.write("🌍 **Cuisine:** " + ", ".join([t.replace('-', ' ').title() for t in cuisine_found[:3]]))
-                                if diet_found:
-                                    st.write("🥗 **Diet:** " + ", ".join([t.replace('-', ' ').title() for t in diet_found[:3]]))
-                                if method_found:
-                                    st.write("👩‍🍳 **Method:** " + ", ".join([t.replace('-', ' ').title() for t in method_found[:3]]))
-                                if occasion_found:
-                                    st.write("🎉 **Occasion:** " + ", ".join([t.replace('-', ' ').title() for t in occasion_found[:2]]))
+                                # Tags were classified once per distinct tag; this only slices arrays
+                                groups = tag_categories.breakdown(idx)
+                                for code, icon, title, limit in TAG_CATEGORY_DISPLAY:
+                                    if len(groups[code]):
+                                        st.write(f"{icon} **{title}:** " + ", ".join(tag_categories.labels[groups[code][:limit]]))
                                 
                                 # Show some general tags
-                                general_tags = [tag for tag in tags if tag not in cuisine_found + diet_found + method_found + occasion_found]
-                                if general_tags:
-                                    relevant_general = [tag.replace('-', ' ').title() for tag in general_tags[:5] 
-                                                      if tag not in ['preparation', 'time-to-make', 'course', 'main-ingredient']]
-                                    if relevant_general:
-                                        st.write("📋 **Other:** " + ", ".join(relevant_general))
+                                general = groups[OTHER][:5]
+                                relevant_general = tag_categories.labels[general[~tag_categories.hidden[general]]]
+                                if len(relevant_general):
+                                    st.write("📋 **Other:** " + ", ".join(relevant_general))
                                         
                             except Exception as e:
                                 st.write("Categories available")
@@ -607,6 +601,14 @@ def show_recipes(file_path, language):
                         
                         if 'submitted' in recipe and pd.notna(recipe['submitted']):
                             st.write(f"**📅 Submitted:** {recipe['submitted']}")
+                        
+                        # Two array reads: the neighbours were re-keyed by row when loaded
+                        if also_liked is not None:
+                            liked_rows, _ = also_liked.lookup(idx, ALSO_LIKED_SHOWN)
+                            if len(liked_rows):
+                                st.markdown("**💞 People who liked this also liked:**")
+                                for name in recipe_names.iloc[liked_rows]:
+                                    st.write(f"• {name}")
         
         else:
             st.info(get_text(language, "no_recipes"))
@@ -616,19 +618,20 @@ def show_recipes(file_path, language):
         st.error(f"Error loading recipes: {str(e)}")
         st.write("Please make sure you have selected the correct recipe file (RAW_recipes.csv)")
 
-def show_reviews(file_path, language):
+def show_reviews(file_path, language, full_dataset=False):
     """Display enhanced reviews interface"""
     st.header(get_text(language, "reviews_title"))
     
     try:
-        with st.spinner("Loading reviews..."):
-            df = pd.read_csv(file_path, nrows=10000)
+        df = load_with_progress(load_reviews, file_path, "Loading reviews...")
+        if not full_dataset:
+            df = df.head(REVIEW_SAMPLE_ROWS)
         
-        # Load recipe data for joining
-        recipe_files = [f for f in os.listdir('data') if 'RAW_recipes.csv' in f]
-        recipes_df = None
-        if recipe_files:
-            recipes_df = pd.read_csv(f'data/{recipe_files[0]}', nrows=5000)
+        # Load recipe data for joining (always the full recipe set)
+        # Found where the file selector looks, so it matches what the recipes view shows
+        recipes_path = load_data().get('RAW_recipes.csv')
+        if recipes_path:
+            load_with_progress(load_recipes, recipes_path, "Loading recipes...")
         
         # Enhanced filters in sidebar
         st.sidebar.subheader("🔍 Review Filters")
@@ -644,7 +647,6 @@ def show_reviews(file_path, language):
         
         # Date filter
         if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
             min_date = df['date'].min()
             max_date = df['date'].max()
             
@@ -657,7 +659,6 @@ def show_reviews(file_path, language):
         
         # Review length filter
         if 'review' in df.columns:
-            df['review_length'] = df['review'].astype(str).str.len()
             min_length = st.sidebar.slider(
                 "📝 Minimum review length", 
                 0, 500, 50
@@ -669,29 +670,28 @@ def show_reviews(file_path, language):
             placeholder="Enter keywords..."
         )
         
-        # Apply filters
-        filtered_df = df.copy()
-        
-        # Rating filter
-        if 'rating' in df.columns and selected_ratings:
-            filtered_df = filtered_df[filtered_df['rating'].isin(selected_ratings)]
-        
-        # Date filter
-        if 'date' in df.columns and len(date_range) == 2:
-            filtered_df = filtered_df[
-                (filtered_df['date'] >= pd.Timestamp(date_range[0])) &
-                (filtered_df['date'] <= pd.Timestamp(date_range[1]))
-            ]
+        # Queries the search backend cannot answer (BM25 with stopwords only) match the raw text
+        review_search = load_review_search(file_path) if search_text and 'review' in df.columns else None
+        ranked_search = review_search is not None and review_search.accepts(search_text)
         
-        # Review length filter
-        if 'review' in df.columns:
-            filtered_df = filtered_df[filtered_df['review_length'] >= min_length]
+        def filter_rows():
+            """Row positions of df passing every filter"""
+            # Each predicate's mask is cached by its parameters: only changed filters are recomputed
+            predicates = review_predicates(df, filter_state, lambda: review_search)
+            return np.flatnonzero(evaluate("reviews", search_version(file_path), len(df), predicates))
         
-        # Text search filter
-        if search_text and 'review' in df.columns:
-            filtered_df = filtered_df[
-                filtered_df['review'].str.contains(search_text, case=False, na=False)
-            ]
+        # Canonical filter state: selections sorted, inactive filters left out
+        filter_state = {
+            'rows': len(df),
+            'ratings': sorted(selected_ratings) if 'rating' in df.columns else [],
+            'dates': [str(day) for day in date_range] if 'date' in df.columns and len(date_range) == 2 else None,
+            'min_length': min_length if 'review' in df.columns else None,
+            # Both search paths are case-insensitive
+            'search': search_text.lower() if 'review' in df.columns else '',
+        }
+        reviews_version = search_version(file_path)
+        rows = RESULT_CACHE.rows("reviews", reviews_version, filter_state, filter_rows)
+        filtered_df = df.iloc[rows]
         
         # Display statistics
         col1, col2, col3, col4 = st.columns(4)
@@ -733,31 +733,49 @@ def show_reviews(file_path, language):
         
         if len(filtered_df) > 0:
             # Sort by date (newest first) or rating
-            sort_option = st.selectbox(
-                "Sort by", 
-                ["Date (Newest)", "Date (Oldest)", "Rating (High)", "Rating (Low)", "Review Length"]
-            )
-            
-            if sort_option == "Date (Newest)" and 'date' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('date', ascending=False)
-            elif sort_option == "Date (Oldest)" and 'date' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('date', ascending=True)
-            elif sort_option == "Rating (High)" and 'rating' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('rating', ascending=False)
-            elif sort_option == "Rating (Low)" and 'rating' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('rating', ascending=True)
-            elif sort_option == "Review Length" and 'review' in filtered_df.columns:
-                filtered_df = filtered_df.sort_values('review_length', ascending=False)
+            sort_options = list(REVIEW_SORT_KEYS)
+            if ranked_search:
+                sort_options.insert(0, "Relevance")
+            sort_option = st.selectbox("Sort by", sort_options)
+            
+            def order_rows():
+                """Row positions of the filtered reviews in display order"""
+                if sort_option == "Relevance":
+                    hits, scores = review_search.ranked(search_text)
+                    inside = hits < len(df)
+                    relevance = np.zeros(len(df), dtype=np.float32)
+                    relevance[hits[inside]] = scores[inside]
+                    return rows[np.argsort(-relevance[rows], kind='stable')]
+                if REVIEW_SORT_KEYS[sort_option][0] in df.columns:
+                    # Precomputed permutation restricted to the filtered rows: no sort per rerun
+                    sort_index = load_review_sort_index(file_path, *REVIEW_SORT_KEYS[sort_option])
+                    selected = np.zeros(len(sort_index.permutation), dtype=bool)
+                    selected[rows] = True
+                    return sort_index.order(selected)
+                return rows
+            
+            ordered = RESULT_CACHE.rows("reviews-sorted", reviews_version,
+                                        dict(filter_state, sort=sort_option), order_rows)
             
             # Pagination
-            total_pages = (len(filtered_df) - 1) // reviews_per_page + 1
+            total_pages = (len(ordered) - 1) // reviews_per_page + 1
+            start_idx = 0
             if total_pages > 1:
                 page = st.selectbox(f"Page (1-{total_pages})", range(1, total_pages + 1))
                 start_idx = (page - 1) * reviews_per_page
-                end_idx = start_idx + reviews_per_page
-                page_df = filtered_df.iloc[start_idx:end_idx]
-            else:
-                page_df = filtered_df.head(reviews_per_page)
+            page_df = df.iloc[ordered[start_idx:start_idx + reviews_per_page]]
+            
+            # Attach recipe names to the whole page with one indexed lookup
+            if recipes_path is not None and 'recipe_id' in page_df.columns:
+                page_df = page_df.assign(recipe_name=join_column(
+                    load_id_index(recipes_path), page_df['recipe_id'], load_recipes(recipes_path)['name']
+                ))
+            
+            # Where the search matched, excerpted for this page's reviews only
+            snippets = {}
+            if ranked_search:
+                page_rows = page_df.index.to_numpy()
+                snippets = dict(zip(page_rows, review_search.snippets(search_text, page_rows)))
             
             # Display reviews
             for idx, review in page_df.iterrows():
@@ -779,12 +797,12 @@ def show_reviews(file_path, language):
                         if 'user_id' in review and pd.notna(review['user_id']):
                             st.write(f"**User ID:** {review['user_id']}")
                     
+                    if snippets.get(idx):
+                        st.caption(f"🔎 {snippets[idx]}")
+                    
                     # Recipe information (if available)
-                    if 'recipe_id' in review and recipes_df is not None:
-                        recipe_info = recipes_df[recipes_df['id'] == review['recipe_id']]
-                        if not recipe_info.empty:
-                            recipe_name = recipe_info.iloc[0]['name']
-                            st.write(f"**🍽️ Recipe:** {recipe_name}")
+                    if 'recipe_name' in review and pd.notna(review['recipe_name']):
+                        st.write(f"**🍽️ Recipe:** {review['recipe_name']}")
                     
                     # Review text
                     if 'review' in review and pd.notna(review['review']):
@@ -809,13 +827,23 @@ def show_reviews(file_path, language):
         st.error(f"Error loading reviews: {str(e)}")
         st.write("Please make sure you have selected the correct reviews file (RAW_interactions.csv)")
 
-def show_analysis(file_path, language):
+def show_analysis(file_path, language, full_dataset=False):
     """Display comprehensive data analysis"""
     st.header(get_text(language, "analysis_title"))
     
     try:
-        with st.spinner("Loading data for analysis..."):
-            df = pd.read_csv(file_path, nrows=10000)
+        # Every chart and statistic describes the whole file, from its persisted profile report
+        profile = load_with_progress(load_profile, file_path, "Profiling the whole file...")
+        
+        # Raw rows are only read for the row-level views: duplicate groups and the scatter plot
+        load_rows = st.checkbox(
+            "📄 Load rows for duplicate groups and scatter plots",
+            help="Reads the data (a sample unless the full dataset is selected); everything else comes from the profile"
+        )
+        if load_rows and full_dataset:
+            # The whole file is parsed on the process pool into its columnar cache, then read a
+            # column or a row at a time from there rather than held in memory
+            load_with_progress(ensure_cache, file_path, "Building the columnar cache...")
         
         # Analysis tabs
         tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -829,17 +857,17 @@ def show_analysis(file_path, language):
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("📊 Total Records", f"{len(df):,}")
+                st.metric("📊 Total Records", f"{profile.rows:,}")
             
             with col2:
-                st.metric("📈 Columns", len(df.columns))
+                st.metric("📈 Columns", len(profile.columns))
             
             with col3:
-                memory_usage = df.memory_usage(deep=True).sum() / 1024**2
+                memory_usage = profile.memory_bytes / 1024**2
                 st.metric("💾 Memory Usage", f"{memory_usage:.1f} MB")
             
             with col4:
-                duplicates = df.duplicated().sum()
+                duplicates = profile.duplicates
                 st.metric("🔍 Duplicates", f"{duplicates:,}")
             
             # File information
@@ -847,13 +875,30 @@ def show_analysis(file_path, language):
             st.write(f"**📁 File:** {file_name}")
             st.write(f"**📅 Analysis Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}")
             
+            # Duplicate groups of the loaded rows, found through row fingerprints
+            fingerprints = load_fingerprints(file_path, full_dataset) if load_rows else None
+            if fingerprints is not None and fingerprints.duplicates > 0:
+                with st.expander(f"🔁 Duplicate groups ({fingerprints.duplicates:,} repeated rows in the loaded data)"):
+                    verify = st.checkbox("Verify groups row by row", help="Rules out 64-bit fingerprint collisions")
+                    def rows_of(rows):
+                        return read_analysis_rows(file_path, rows, full_dataset)
+                    groups = fingerprints.verified_groups(rows_of, limit=20) if verify else fingerprints.groups(limit=20)
+                    for rows in groups:
+                        shown = ', '.join(str(row) for row in rows[:10]) + (', ...' if len(rows) > 10 else '')
+                        st.write(f"**{len(rows)} identical rows:** {shown}")
+                        st.dataframe(rows_of(rows[:1]), use_container_width=True)
+            
             # Quick data preview
             st.subheader("👀 Data Preview")
-            st.dataframe(df.head(10), use_container_width=True)
+            if load_rows:
+                preview = read_analysis_rows(file_path, np.arange(min(100, profile.rows)), full_dataset)
+            else:
+                preview = profile.preview.head(10)
+            st.dataframe(preview, use_container_width=True)
             
             # Column types summary
             st.subheader("🏷️ Column Types Summary")
-            dtype_counts = df.dtypes.value_counts()
+            dtype_counts = profile.dtypes().value_counts()
             
             fig_pie = px.pie(
                 values=dtype_counts.values,
@@ -866,18 +911,10 @@ def show_analysis(file_path, language):
             # Data quality analysis
             st.subheader("🔍 Data Quality Assessment")
             
-            # Missing data analysis
-            missing_data = df.isnull().sum()
-            missing_percent = (missing_data / len(df)) * 100
-            
-            quality_df = pd.DataFrame({
-                'Column': df.columns,
-                'Missing Count': missing_data.values,
-                'Missing %': missing_percent.values,
-                'Data Type': df.dtypes.values,
-                'Unique Values': [df[col].nunique() for col in df.columns],
-                'Completeness': [(1 - df[col].isnull().mean()) * 100 for col in df.columns]
-            })
+            # Missing counts, distinct counts and completeness per column
+            quality_df = profile.quality()
+            missing_data = quality_df.set_index('Column')['Missing Count']
+            missing_percent = quality_df['Missing %']
             
             # Sort by missing percentage
             quality_df = quality_df.sort_values('Missing %', ascending=False)
@@ -892,14 +929,14 @@ def show_analysis(file_path, language):
                     title="Missing Data Percentage by Column",
                     labels={'x': 'Columns', 'y': 'Missing %'}
                 )
-                fig_missing.update_xaxis(tickangle=45)
+                fig_missing.update_xaxes(tickangle=45)
                 st.plotly_chart(fig_missing, use_container_width=True)
             
             # Data completeness heatmap
             st.subheader("🔥 Data Completeness Heatmap")
-            completeness = df.notna().astype(int)
+            completeness = profile.preview.notna().astype(int)
             
-            if len(df) <= 1000:  # Only for reasonable dataset sizes
+            if profile.rows <= 1000:  # Only for reasonable dataset sizes
                 fig_heatmap = px.imshow(
                     completeness.iloc[:100].T,  # Show first 100 rows
                     title="Data Completeness (White=Present, Black=Missing)",
@@ -912,17 +949,17 @@ def show_analysis(file_path, language):
             st.subheader("📊 Statistical Summary")
             
             # Numeric columns analysis
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            profiled_numeric_cols = profile.numeric_columns
             
-            if len(numeric_cols) > 0:
+            if len(profiled_numeric_cols) > 0:
                 st.write("**🔢 Numeric Columns Statistics:**")
-                numeric_stats = df[numeric_cols].describe()
+                numeric_stats = profile.describe()
                 st.dataframe(numeric_stats, use_container_width=True)
                 
                 # Correlation matrix for numeric columns
-                if len(numeric_cols) > 1:
+                if len(profiled_numeric_cols) > 1:
                     st.subheader("🔗 Correlation Matrix")
-                    corr_matrix = df[numeric_cols].corr()
+                    corr_matrix = profile.correlation()
                     
                     fig_corr = px.imshow(
                         corr_matrix,
@@ -933,15 +970,16 @@ def show_analysis(file_path, language):
                     st.plotly_chart(fig_corr, use_container_width=True)
             
             # Categorical columns analysis
-            categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+            categorical_cols = profile.categorical_columns
             
             if len(categorical_cols) > 0:
                 st.write("**📝 Categorical Columns Analysis:**")
                 
                 for col in categorical_cols[:5]:  # Limit to first 5 categorical columns
-                    if df[col].nunique() <= 20:  # Only for columns with reasonable number of unique values
+                    value_counts = profile.top_values(col)
+                    # Only for columns with reasonable number of unique values
+                    if value_counts is not None and profile.distinct(col) <= 20:
                         st.write(f"**{col}:**")
-                        value_counts = df[col].value_counts().head(10)
                         
                         fig_cat = px.bar(
                             x=value_counts.values,
@@ -956,6 +994,8 @@ def show_analysis(file_path, language):
             # Distribution analysis
             st.subheader("📈 Data Distributions")
             
+            numeric_cols = profile.numeric_columns
+            
             if len(numeric_cols) > 0:
                 # Select column for distribution
                 selected_col = st.selectbox(
@@ -964,30 +1004,63 @@ def show_analysis(file_path, language):
                 )
                 
                 if selected_col:
+                    bin_mode = st.radio("Histogram bins", ["Fixed width", "Quantile"], horizontal=True)
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        # Histogram
-                        fig_hist = px.histogram(
-                            df,
-                            x=selected_col,
+                        # Histogram of the whole file, binned when the report was built
+                        histogram = profile.histogram(selected_col, quantile=bin_mode == "Quantile")
+                        if histogram is None:
+                            histogram = np.array([0.0, 1.0]), np.zeros(1, dtype=np.int64)
+                        edges, counts = histogram
+                        if bin_mode == "Quantile":
+                            # Unequal widths: bar heights must be densities to keep the shape
+                            heights, y_label = counts / np.diff(edges), "Density"
+                        else:
+                            heights, y_label = counts, "Count"
+                        fig_hist = go.Figure(go.Bar(
+                            x=(edges[:-1] + edges[1:]) / 2,
+                            y=heights,
+                            width=np.diff(edges),
+                            customdata=np.column_stack([edges[:-1], edges[1:], counts]),
+                            hovertemplate="%{customdata[0]:.4g} – %{customdata[1]:.4g}<br>Count: %{customdata[2]}<extra></extra>"
+                        ))
+                        fig_hist.update_layout(
                             title=f"Distribution of {selected_col}",
-                            nbins=30
+                            xaxis_title=selected_col,
+                            yaxis_title=y_label,
+                            bargap=0
                         )
                         st.plotly_chart(fig_hist, use_container_width=True)
                     
                     with col2:
-                        # Box plot
-                        fig_box = px.box(
-                            df,
-                            y=selected_col,
-                            title=f"Box Plot of {selected_col}"
-                        )
-                        st.plotly_chart(fig_box, use_container_width=True)
+                        # Box plot from a precomputed five-number summary and sampled outliers
+                        summary = profile.box_summary(selected_col)
+                        if summary is not None:
+                            fig_box = go.Figure(go.Box(
+                                x=[selected_col],
+                                q1=[summary['q1']],
+                                median=[summary['median']],
+                                q3=[summary['q3']],
+                                lowerfence=[summary['lower_whisker']],
+                                upperfence=[summary['upper_whisker']],
+                                mean=[summary['mean']],
+                                name=selected_col
+                            ))
+                            if len(summary['outliers']):
+                                fig_box.add_trace(go.Scatter(
+                                    x=[selected_col] * len(summary['outliers']),
+                                    y=summary['outliers'],
+                                    mode='markers',
+                                    name=f"Outliers ({summary['n_outliers']:,}, "
+                                         f"{len(summary['outliers']):,} shown)"
+                                ))
+                            fig_box.update_layout(title=f"Box Plot of {selected_col}", yaxis_title=selected_col)
+                            st.plotly_chart(fig_box, use_container_width=True)
                     
                     # Statistical summary for selected column
                     st.write(f"**Statistics for {selected_col}:**")
-                    stats = df[selected_col].describe()
+                    stats = profile.column_stats(selected_col)
                     
                     stat_cols = st.columns(len(stats))
                     for i, (stat_name, stat_value) in enumerate(stats.items()):
@@ -1011,21 +1084,41 @@ def show_analysis(file_path, language):
                     y_col = st.selectbox("Y-axis:", numeric_cols, index=1 if len(numeric_cols) > 1 else 0)
                 
                 if x_col != y_col:
-                    # Create scatter plot
-                    sample_size = min(1000, len(df))  # Limit for performance
-                    sample_df = df.sample(n=sample_size) if len(df) > sample_size else df
-                    
-                    fig_scatter = px.scatter(
-                        sample_df,
-                        x=x_col,
-                        y=y_col,
-                        title=f"Relationship between {x_col} and {y_col}",
-                        opacity=0.6
-                    )
-                    st.plotly_chart(fig_scatter, use_container_width=True)
+                    df = load_analysis_columns(file_path, [x_col, y_col], full_dataset) if load_rows else None
+                    if df is None:
+                        st.info("Load the rows (at the top of the page) to draw the scatter plot.")
+                    elif len(df) > SCATTER_MAX_POINTS:
+                        # Too many points to draw: log-scaled counts on a 2D grid over every row
+                        x_edges, y_edges, counts = density_grid(df[x_col], df[y_col])
+                        with np.errstate(divide='ignore'):
+                            log_counts = np.where(counts > 0, np.log10(counts), np.nan).astype(np.float32)
+                        fig_scatter = go.Figure(go.Heatmap(
+                            x=(x_edges[:-1] + x_edges[1:]) / 2,
+                            y=(y_edges[:-1] + y_edges[1:]) / 2,
+                            z=log_counts.T,
+                            customdata=counts.T,
+                            colorscale='Viridis',
+                            colorbar=dict(title="log10(count)"),
+                            hovertemplate=f"{x_col}: %{{x:.4g}}<br>{y_col}: %{{y:.4g}}<br>Count: %{{customdata}}<extra></extra>"
+                        ))
+                        fig_scatter.update_layout(
+                            title=f"Relationship between {x_col} and {y_col} ({len(df):,} rows, binned)",
+                            xaxis_title=x_col,
+                            yaxis_title=y_col
+                        )
+                    else:
+                        fig_scatter = px.scatter(
+                            df,
+                            x=x_col,
+                            y=y_col,
+                            title=f"Relationship between {x_col} and {y_col}",
+                            opacity=0.6
+                        )
+                    if df is not None:
+                        st.plotly_chart(fig_scatter, use_container_width=True)
                     
-                    # Correlation coefficient
-                    correlation = df[x_col].corr(df[y_col])
+                    # Correlation coefficient over the whole file
+                    correlation = profile.correlation().at[x_col, y_col]
                     st.metric("Correlation Coefficient", f"{correlation:.3f}")
             
             # Advanced insights
@@ -1035,7 +1128,7 @@ def show_analysis(file_path, language):
             
             # Check for potential issues
             if duplicates > 0:
-                insights.append(f"⚠️ Found {duplicates:,} duplicate rows ({duplicates/len(df)*100:.1f}%)")
+                insights.append(f"⚠️ Found {duplicates:,} duplicate rows ({duplicates/profile.rows*100:.1f}%)")
             
             # Check missing data
             high_missing = quality_df[quality_df['Missing %'] > 50]
@@ -1043,17 +1136,14 @@ def show_analysis(file_path, language):
                 insights.append(f"⚠️ {len(high_missing)} columns have >50% missing data")
             
             # Check data skewness for numeric columns
-            for col in numeric_cols[:3]:  # Check first 3 numeric columns
-                skewness = df[col].skew()
+            for col in profiled_numeric_cols[:3]:  # Check first 3 numeric columns
+                skewness = profile.skewness(col)
                 if abs(skewness) > 2:
                     insights.append(f"📊 Column '{col}' is highly skewed (skewness: {skewness:.2f})")
             
             # Check for potential outliers
-            for col in numeric_cols[:3]:
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                outliers = df[(df[col] < Q1 - 1.5*IQR) | (df[col] > Q3 + 1.5*IQR)][col].count()
+            for col in profiled_numeric_cols[:3]:
+                outliers = profile.outliers(col)
                 if outliers > 0:
                     insights.append(f"📈 Column '{col}' has {outliers} potential outliers")
             
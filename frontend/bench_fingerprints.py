@@ -0,0 +1,44 @@
+"""Micro-benchmark: row fingerprints from factorized codes vs from the cell contents
+
+Usage:
+    python frontend/bench_fingerprints.py [data/RAW_interactions.csv] [nrows]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from fingerprints import RowFingerprints, frame_fingerprints, row_fingerprints
+
+
+def best_of(func, df, repeat=3):
+    """Best wall time of several runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'data/RAW_interactions.csv'
+    nrows = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    df = pd.read_csv(csv_path, nrows=nrows)
+
+    expected = df.duplicated().to_numpy()
+    for fingerprint in (row_fingerprints, frame_fingerprints):
+        assert (RowFingerprints(fingerprint(df)).duplicated() == expected).all(), \
+            f"{fingerprint.__name__} disagrees with DataFrame.duplicated"
+
+    print(f"{len(df):,} rows from {csv_path}")
+    print(f"{'columns':<16} {'contents':>10} {'codes':>10} {'speedup':>9}")
+    for col in [*df.columns, None]:
+        frame = df if col is None else df[[col]]
+        slow = best_of(row_fingerprints, frame)
+        fast = best_of(frame_fingerprints, frame)
+        print(f"{col or '(all)':<16} {slow * 1000:>8.1f}ms {fast * 1000:>8.1f}ms {slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
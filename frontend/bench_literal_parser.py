@@ -0,0 +1,55 @@
+"""Micro-benchmark: batch literal parser vs per-row ast.literal_eval
+
+Usage:
+    python frontend/bench_literal_parser.py [data/RAW_recipes.csv] [nrows]
+"""
+import ast
+import sys
+import time
+
+import pandas as pd
+
+from literal_parser import parse_float_lists, parse_string_lists
+
+
+def per_row(series):
+    """The old path: ast.literal_eval on every row"""
+    parsed = []
+    for value in series:
+        try:
+            parsed.append(ast.literal_eval(value))
+        except (ValueError, SyntaxError):
+            parsed.append(None)
+    return parsed
+
+
+def best_of(func, series, repeat=3):
+    """Best wall time of several runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(series)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else 'data/RAW_recipes.csv'
+    nrows = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    df = pd.read_csv(csv_path, nrows=nrows)
+
+    print(f"{len(df):,} rows from {csv_path}")
+    print(f"{'column':<12} {'literal_eval':>14} {'batch':>10} {'speedup':>9}")
+    for col, batch in [('tags', parse_string_lists), ('steps', parse_string_lists),
+                       ('ingredients', parse_string_lists), ('nutrition', parse_float_lists)]:
+        if col not in df.columns:
+            continue
+        series = df[col].dropna()
+        assert batch(series) == per_row(series), f"parsers disagree on {col}"
+        slow = best_of(per_row, series)
+        fast = best_of(batch, series)
+        print(f"{col:<12} {slow * 1000:>12.1f}ms {fast * 1000:>8.1f}ms {slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: text search through pandas vs the in-memory indexes vs SQLite FTS5
+
+The pandas path scans the text columns with str.contains for every word of
+the query, which is what a search costs without an index. The FTS5 tables
+must have been filled by the import command first:
+
+    python backend/manage.py import_foodcom --recipes data/RAW_recipes.csv \\
+        --interactions data/RAW_interactions.csv
+
+Usage:
+    python frontend/bench_search.py [data/RAW_recipes.csv] [data/RAW_interactions.csv] [db.sqlite3]
+"""
+import sys
+import time
+
+import numpy as np
+
+from columnar_cache import load_dataset
+from id_index import IdIndex
+from review_search import BM25Index
+from search_backend import (SEARCH_DB, NameSearch, ReviewSearch, sqlite_recipe_search,
+                            sqlite_review_search)
+from trigram_index import TrigramIndex
+
+RECIPE_QUERIES = ['chicken', 'chocolate cake', 'lemon garlic', 'zucchini']
+REVIEW_QUERIES = ['delicious', 'too salty', 'kids loved it', 'cinnamon']
+
+
+def best_of(func, query, repeat=3):
+    """Best wall time of several runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(query)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def contains_all(columns):
+    """The pandas path: rows where one of columns contains each word of the query"""
+    def search(query):
+        keep = np.ones(len(columns[0]), dtype=bool)
+        for word in query.lower().split():
+            keep &= np.logical_or.reduce([column.str.contains(word, case=False, na=False, regex=False).to_numpy()
+                                          for column in columns])
+        return np.flatnonzero(keep)
+    return search
+
+
+def report(title, queries, paths):
+    print(title)
+    print(f"{'query':<16}" + ''.join(f"{name:>22}" for name, _ in paths))
+    for query in queries:
+        cells = []
+        for _, func in paths:
+            elapsed = best_of(func, query)
+            cells.append(f"{elapsed * 1000:>9.1f}ms {len(func(query)):>9,}")
+        print(f"{query:<16}" + ''.join(f"{cell:>22}" for cell in cells))
+    print()
+
+
+def main():
+    recipes_path = sys.argv[1] if len(sys.argv) > 1 else 'data/RAW_recipes.csv'
+    reviews_path = sys.argv[2] if len(sys.argv) > 2 else 'data/RAW_interactions.csv'
+    db_path = sys.argv[3] if len(sys.argv) > 3 else SEARCH_DB
+
+    recipes = load_dataset(recipes_path)
+    reviews = load_dataset(reviews_path)
+    ingredients = recipes['ingredients'].map(lambda items: '' if items is None else ', '.join(items))
+    names = NameSearch(TrigramIndex.load_or_build(recipes_path, recipes['name']))
+    recipe_fts = sqlite_recipe_search(IdIndex.load_or_build(recipes_path, recipes['id']),
+                                      recipes['id'].to_numpy(), db_path)
+    review_index = ReviewSearch(BM25Index.load_or_build(reviews_path, reviews['review']), reviews['review'])
+    review_fts = sqlite_review_search(reviews['user_id'], reviews['recipe_id'], db_path)
+
+    print(f"{len(recipes):,} recipes, {len(reviews):,} reviews, FTS5 database {db_path}")
+    print("each cell: best of 3 and number of matches\n")
+    report("Recipes", RECIPE_QUERIES, [
+        ("pandas name", contains_all([recipes['name']])),
+        ("pandas all text", contains_all([recipes['name'], recipes['description'], ingredients])),
+        ("trigram name", names.matches),
+        ("fts5", recipe_fts.matches),
+        ("fts5 ranked", lambda query: recipe_fts.ranked(query)[0]),
+    ])
+    report("Reviews", REVIEW_QUERIES, [
+        ("pandas", contains_all([reviews['review']])),
+        ("bm25", review_index.matches),
+        ("fts5", review_fts.matches),
+        ("bm25 ranked", lambda query: review_index.ranked(query)[0]),
+        ("fts5 ranked", lambda query: review_fts.ranked(query)[0]),
+    ])
+
+
+if __name__ == "__main__":
+    main()
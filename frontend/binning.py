@@ -0,0 +1,100 @@
+"""Server-side aggregation for distribution charts.
+
+Plotly serializes every data point it is given, so charts built straight
+from a large column send megabytes to the browser. These helpers reduce a
+column to what the chart actually draws: bin edges and counts for a
+histogram, the five-number summary and a bounded sample of outliers for a
+box plot, a 2D count grid for a scatter plot of many points. The payload
+then depends on the number of bins, not of rows.
+
+Histograms and box plots are computed chunk by chunk over the whole file
+(see profile_artifact), so the helpers for them work on parts of a column:
+bin edges and fences come from the profile, and per-chunk outlier samples
+are merged into one.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_BINS = 30
+DEFAULT_DENSITY_BINS = 100
+MAX_OUTLIER_POINTS = 200
+
+
+def finite_values(values):
+    """Finite float64 values of a column, without missing values"""
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def fixed_width_edges(low, high, bins=DEFAULT_BINS):
+    """Edges of equal-width bins spanning [low, high], one unit wide if the data is constant"""
+    return np.linspace(low, high if high > low else low + 1, bins + 1)
+
+
+def quantile_bin_edges(quantiles):
+    """Edges of bins between quantiles, holding roughly equal numbers of values
+
+    Repeated quantiles (common in integer columns) are merged, so there may
+    be fewer bins than quantiles.
+    """
+    edges = np.unique(quantiles)
+    if len(edges) == 1:
+        edges = np.array([edges[0], edges[0] + 1])
+    return edges
+
+
+def tukey_fences(q1, q3):
+    """(low, high) bounds outside which a value is a box plot outlier"""
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
+def split_outliers(values, fences, max_outliers=MAX_OUTLIER_POINTS, seed=0):
+    """(whiskers, sampled outliers, outlier count) of finite values for Tukey fences
+
+    The whiskers are the smallest and largest values inside the fences,
+    (inf, -inf) when there are none, so that they combine with min and max.
+    """
+    low, high = fences
+    inside = values[(values >= low) & (values <= high)]
+    outliers = values[(values < low) | (values > high)]
+    sample = outliers
+    if len(outliers) > max_outliers:
+        # Seeded, so the chart does not change between reruns
+        sample = np.random.default_rng(seed).choice(outliers, max_outliers, replace=False)
+    whiskers = (inside.min(), inside.max()) if len(inside) else (np.inf, -np.inf)
+    return whiskers, sample, len(outliers)
+
+
+def merge_outlier_samples(samples, max_outliers=MAX_OUTLIER_POINTS, seed=0):
+    """Fixed-size sample of all outliers from (sample, outlier count) pairs of parts of a column
+
+    Every part contributes in proportion to its outlier count, drawn from
+    its own sample (which holds all of its outliers, or max_outliers of them).
+    """
+    samples = [(sample, n) for sample, n in samples if len(sample)]
+    if not samples:
+        return np.empty(0)
+    counts = np.array([n for _, n in samples], dtype=np.float64)
+    if counts.sum() <= max_outliers:
+        # Every part's sample holds all of its outliers
+        return np.sort(np.concatenate([sample for sample, _ in samples]))
+    # Largest remainder: whole shares first, then one more for the largest fractions
+    shares = max_outliers * counts / counts.sum()
+    taken = np.floor(shares).astype(np.int64)
+    taken[np.argsort(taken - shares, kind='stable')[:max_outliers - taken.sum()]] += 1
+    rng = np.random.default_rng(seed)
+    return np.sort(np.concatenate([rng.choice(sample, k, replace=False) for (sample, _), k in zip(samples, taken)]))
+
+
+def density_grid(x, y, bins=DEFAULT_DENSITY_BINS):
+    """(x_edges, y_edges, counts) of a 2D histogram over the rows where both x and y are finite"""
+    x = pd.to_numeric(pd.Series(x), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    y = pd.to_numeric(pd.Series(y), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    both = np.isfinite(x) & np.isfinite(y)
+    x, y = x[both], y[both]
+    if len(x) == 0:
+        return np.array([0.0, 1.0]), np.array([0.0, 1.0]), np.zeros((1, 1), dtype=np.int64)
+    ranges = [(v.min(), v.max() if v.max() > v.min() else v.min() + 1) for v in (x, y)]
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=ranges)
+    return x_edges, y_edges, counts.astype(np.int64)
@@ -0,0 +1,168 @@
+"""Inverted index from list-column terms to compressed row bitmaps.
+
+Each distinct term (a tag, an ingredient, ...) maps to the set of row
+positions whose list contains it. Frequent terms are stored as packed
+bitmaps (one bit per row) and rare ones as sorted int32 position arrays,
+whichever is smaller, much like the containers of a Roaring bitmap.
+Filters then become unions or intersections of these sets instead of a
+Python-level scan over every row.
+
+Indexes can be persisted next to the columnar cache; on disk every term is
+stored as its sorted row positions and the containers are rebuilt on load.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import artifact_path, cache_dir_for, is_artifact_fresh, mark_artifact_fresh
+
+
+def explode_positions(list_column):
+    """Flatten a list column into parallel arrays of (row position, term)"""
+    lists = pd.Series(list_column).reset_index(drop=True)
+    lengths = lists.map(lambda items: 0 if items is None else len(items)).to_numpy()
+    positions = np.repeat(np.arange(len(lists), dtype=np.int32), lengths)
+    terms = [term for items in lists if items is not None for term in items]
+    return positions, terms
+
+
+def _container(rows, n_rows):
+    """Smaller of a sorted position array and a packed bitmap for rows"""
+    if rows.nbytes < (n_rows + 7) // 8:
+        return rows
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[rows] = True
+    return np.packbits(mask)
+
+
+class BitmapIndex:
+    """Term -> row-set index over a list column"""
+
+    def __init__(self, n_rows, sets, counts, row_sizes):
+        self.n_rows = n_rows
+        self._sets = sets
+        self._counts = counts
+        # Number of distinct terms in each row
+        self.row_sizes = row_sizes
+
+    @classmethod
+    def build(cls, list_column, normalize=None):
+        """Build the index from a column of lists (None for missing rows)"""
+        positions, terms = explode_positions(list_column)
+        n_rows = len(list_column)
+        if normalize is not None:
+            terms = [normalize(term) for term in terms]
+        codes, vocabulary = pd.factorize(pd.Series(terms, dtype=object))
+        return cls._from_postings(n_rows, vocabulary, codes, positions)
+
+    @classmethod
+    def _from_postings(cls, n_rows, vocabulary, codes, positions):
+        # Group positions by term; a row may list a term twice
+        order = np.argsort(codes, kind='stable')
+        codes, positions = codes[order], positions[order]
+        bounds = np.searchsorted(codes, np.arange(len(vocabulary) + 1))
+
+        sets, counts = {}, {}
+        row_sizes = np.zeros(n_rows, dtype=np.uint16)
+        for code, term in enumerate(vocabulary):
+            rows = np.unique(positions[bounds[code]:bounds[code + 1]])
+            counts[term] = len(rows)
+            row_sizes[rows] += 1
+            sets[term] = _container(rows, n_rows)
+        return cls(n_rows, sets, counts, row_sizes)
+
+    @classmethod
+    def load_or_build(cls, csv_path, list_column, suffix, normalize=None):
+        """Load the index persisted under suffix for csv_path, rebuilding it if the CSV changed"""
+        path = artifact_path(csv_path, suffix)
+        if is_artifact_fresh(csv_path, suffix):
+            with np.load(path) as data:
+                offsets = data['offsets']
+                terms = data['terms'].tobytes().decode('utf-8')
+                vocabulary = terms.split('\n') if len(offsets) > 1 else []
+                codes = np.repeat(np.arange(len(vocabulary)), np.diff(offsets))
+                return cls._from_postings(int(data['n_rows']), vocabulary, codes, data['positions'])
+
+        index = cls.build(list_column, normalize)
+        os.makedirs(cache_dir_for(csv_path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        terms = index.terms()
+        postings = [index.rows(term) for term in terms]
+        offsets = np.concatenate(([0], np.cumsum([len(rows) for rows in postings]))).astype(np.int64)
+        np.savez(
+            tmp_path,
+            n_rows=index.n_rows,
+            # Terms are tags/ingredients and never contain newlines
+            terms=np.frombuffer('\n'.join(terms).encode('utf-8'), dtype=np.uint8),
+            offsets=offsets,
+            positions=np.concatenate(postings) if postings else np.empty(0, dtype=np.int32),
+        )
+        os.replace(tmp_path, path)
+        mark_artifact_fresh(csv_path, suffix)
+        return index
+
+    @property
+    def nbytes(self):
+        return sum(rows.nbytes for rows in self._sets.values()) + self.row_sizes.nbytes
+
+    def terms(self):
+        """All indexed terms"""
+        return list(self._sets)
+
+    def count(self, term):
+        """Number of rows containing term"""
+        return self._counts.get(term, 0)
+
+    def rows(self, term):
+        """Sorted row positions containing term"""
+        rows = self._sets.get(term)
+        if rows is None:
+            return np.empty(0, dtype=np.int32)
+        if rows.dtype == np.uint8:
+            return np.flatnonzero(self.to_mask(rows)).astype(np.int32)
+        return rows
+
+    def _bitmap(self, term):
+        rows = self._sets.get(term)
+        if rows is None:
+            return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        if rows.dtype == np.uint8:
+            return rows
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def union(self, terms):
+        """Packed bitmap of rows containing any of terms"""
+        result = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for term in set(terms):
+            result |= self._bitmap(term)
+        return result
+
+    def count_any(self, terms, n_rows=None):
+        """Number of rows (among the first n_rows) containing any of terms"""
+        return int(np.unpackbits(self.union(terms), count=self.n_rows if n_rows is None else n_rows).sum())
+
+    def intersection(self, terms):
+        """Packed bitmap of rows containing all of terms"""
+        terms = set(terms)
+        if not terms:
+            return np.packbits(np.ones(self.n_rows, dtype=bool))
+        result = None
+        for term in sorted(terms, key=self.count):
+            bitmap = self._bitmap(term)
+            result = bitmap.copy() if result is None else result & bitmap
+        return result
+
+    def to_mask(self, bitmap):
+        """Boolean row mask for a packed bitmap"""
+        return np.unpackbits(bitmap, count=self.n_rows).view(bool)
+
+    def any_mask(self, terms):
+        """Boolean mask of rows containing any of terms"""
+        return self.to_mask(self.union(terms))
+
+    def all_mask(self, terms):
+        """Boolean mask of rows containing all of terms"""
+        return self.to_mask(self.intersection(terms))
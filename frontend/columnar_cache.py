@@ -0,0 +1,214 @@
+"""Columnar on-disk cache for the Food.com CSV files.
+
+The raw CSVs store list columns (tags, steps, ingredients, nutrition) as
+Python literals, so every read has to re-parse them. This module converts a
+CSV once into a Parquet file with those columns already parsed and typed,
+and rebuilds it only when the source file's size or mtime changes. The
+conversion runs chunk by chunk on a process pool (see parallel_ingest).
+Chunks are typed independently, so when a later chunk needs a wider type
+(a column that was all empty so far, or ints that turn into floats), the
+row groups written so far are rewritten under the widened schema.
+
+Build the cache ahead of time with:
+
+    python frontend/columnar_cache.py data/RAW_recipes.csv
+"""
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from literal_parser import parse_float_lists, parse_string_lists
+from parallel_ingest import DEFAULT_CHUNKSIZE, iter_chunks
+
+CACHE_DIR_NAME = ".cache"
+CACHE_FORMAT_VERSION = 1
+
+# Literal columns of RAW_recipes.csv and their parsed Arrow types
+STRING_LIST_COLUMNS = ['tags', 'steps', 'ingredients']
+FLOAT_LIST_COLUMNS = ['nutrition']
+
+
+def cache_dir_for(csv_path):
+    """Directory holding cache artifacts for a CSV file"""
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME)
+
+
+def artifact_path(csv_path, suffix):
+    """Path of a cache artifact derived from a CSV file"""
+    base = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir_for(csv_path), f"{base}.{suffix}")
+
+
+def source_signature(csv_path):
+    """Size and mtime of the source file, used to detect stale caches"""
+    stat = os.stat(csv_path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "format_version": CACHE_FORMAT_VERSION,
+    }
+
+
+def is_artifact_fresh(csv_path, suffix):
+    """Check that an artifact exists and was built from the current CSV"""
+    meta_path = artifact_path(csv_path, f"{suffix}.meta.json")
+    if not os.path.exists(meta_path) or not os.path.exists(artifact_path(csv_path, suffix)):
+        return False
+    try:
+        with open(meta_path) as f:
+            return json.load(f) == source_signature(csv_path)
+    except (OSError, ValueError):
+        return False
+
+
+def unique_tmp_path(path):
+    """Temporary path next to path, distinct per process and thread building it"""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def mark_artifact_fresh(csv_path, suffix):
+    """Record the source signature an artifact was built from"""
+    meta_path = artifact_path(csv_path, f"{suffix}.meta.json")
+    tmp_path = unique_tmp_path(meta_path)
+    with open(tmp_path, "w") as f:
+        json.dump(source_signature(csv_path), f)
+    os.replace(tmp_path, meta_path)
+
+
+def parse_literal_columns(df):
+    """Replace the literal list columns of a frame with parsed lists"""
+    # object dtype even for an empty chunk, which pandas would otherwise make float64
+    for col in STRING_LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.Series(parse_string_lists(df[col]), index=df.index, dtype=object)
+    for col in FLOAT_LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.Series(parse_float_lists(df[col]), index=df.index, dtype=object)
+    return df
+
+
+def arrow_schema(df):
+    """Arrow schema for a parsed frame with typed list columns"""
+    fields = []
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    for field in inferred:
+        if field.name in STRING_LIST_COLUMNS:
+            field = pa.field(field.name, pa.list_(pa.string()))
+        elif field.name in FLOAT_LIST_COLUMNS:
+            field = pa.field(field.name, pa.list_(pa.float64()))
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _merge_field(field, other):
+    """Narrowest field holding the values of both, strings when their types do not mix"""
+    try:
+        return pa.unify_schemas([pa.schema([field]), pa.schema([other])],
+                                promote_options="permissive").field(0)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Numbers in one chunk and text in another: pandas would read the column as text too
+        return pa.field(field.name, pa.string())
+
+
+def merge_schemas(schema, other):
+    """Schema of a file whose chunks have the two schemas (same columns, same order)"""
+    return pa.schema([field if field.equals(other_field) else _merge_field(field, other_field)
+                      for field, other_field in zip(schema, other)])
+
+
+def _final_schema(schema):
+    """Schema to write: columns empty in every chunk are stored as strings"""
+    return pa.schema([pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                      for field in schema])
+
+
+def parse_chunk(chunk):
+    """Parse the literal columns of one CSV chunk into an Arrow table"""
+    df = parse_literal_columns(chunk)
+    return pa.Table.from_pandas(df, schema=arrow_schema(df), preserve_index=False)
+
+
+def _rewrite(path, schema):
+    """Rewrite a Parquet file under a wider schema, one row group at a time; returns an open writer"""
+    widened_path = path + ".widened"
+    writer = pq.ParquetWriter(widened_path, schema)
+    source = pq.ParquetFile(path)
+    for i in range(source.num_row_groups):
+        writer.write_table(source.read_row_group(i).cast(schema))
+    source.close()
+    os.replace(widened_path, path)
+    return writer
+
+
+def build_cache(csv_path, progress=None, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Convert a CSV into a Parquet cache with parsed list columns"""
+    os.makedirs(cache_dir_for(csv_path), exist_ok=True)
+    parquet_path = artifact_path(csv_path, "parquet")
+    # Another process may be building the same cache: each writes its own file, the last rename wins
+    tmp_path = unique_tmp_path(parquet_path)
+
+    writer = None
+    try:
+        for table in iter_chunks(csv_path, parse_chunk, chunksize, workers, progress):
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, _final_schema(table.schema))
+                schema = table.schema
+            elif not table.schema.equals(schema):
+                widened = merge_schemas(schema, table.schema)
+                if not _final_schema(widened).equals(writer.schema):
+                    writer.close()
+                    writer = _rewrite(tmp_path, _final_schema(widened))
+                schema = widened
+            writer.write_table(table.cast(writer.schema))
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+    else:
+        # Header-only file
+        table = parse_chunk(pd.read_csv(csv_path))
+        pq.write_table(table.cast(_final_schema(table.schema)), tmp_path)
+
+    os.replace(tmp_path, parquet_path)
+    mark_artifact_fresh(csv_path, "parquet")
+    return parquet_path
+
+
+def ensure_cache(csv_path, progress=None):
+    """Path of the Parquet cache of a CSV, rebuilt first if stale"""
+    if not is_artifact_fresh(csv_path, "parquet"):
+        build_cache(csv_path, progress=progress)
+    return artifact_path(csv_path, "parquet")
+
+
+def load_dataset(csv_path, nrows=None, columns=None, progress=None):
+    """Load a CSV through its columnar cache, rebuilding the cache if stale"""
+    df = pd.read_parquet(ensure_cache(csv_path, progress), columns=columns)
+    if nrows is not None:
+        df = df.head(nrows)
+    return df
+
+
+def read_rows(csv_path, rows, columns=None):
+    """Rows of a CSV at the given positions, read from its columnar cache without loading the rest"""
+    dataset = ds.dataset(ensure_cache(csv_path), format="parquet")
+    return dataset.take(np.asarray(rows, dtype=np.int64), columns=columns).to_pandas()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python frontend/columnar_cache.py <file.csv> [<file.csv> ...]")
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        print(f"{path} -> {build_cache(path)}")
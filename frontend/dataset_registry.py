@@ -0,0 +1,243 @@
+"""Process-wide registry of loaded datasets.
+
+Streamlit re-executes app.py on every widget interaction and runs each
+browser session in its own thread, but imported modules live for the whole
+process. Keeping the registry here means every session and every rerun
+shares one DataFrame per file instead of re-reading it.
+
+Frames returned by the registry are shared between sessions and must be
+treated as read-only: filter into new frames, never assign columns in place.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+# Memory budget for cached datasets, in MB (override with FOODCOM_CACHE_MB)
+DEFAULT_BUDGET_MB = 2048
+# Cells sampled per list column when estimating what its lists hold
+LIST_SAMPLE_ROWS = 1000
+
+
+def file_version(path):
+    """Version token of a file: changes whenever its size or mtime changes"""
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _list_items_nbytes(column):
+    """Estimated size of the items held by the list cells of an object column
+
+    memory_usage(deep=True) sizes such a cell by its own header only (a
+    list's pointers, an array view's 112 bytes), not by the strings or
+    numbers in it. The items are sized on a sample of the cells.
+    """
+    sample = column.iloc[::max(1, len(column) // LIST_SAMPLE_ROWS)]
+    total = 0
+    for cell in sample:
+        if isinstance(cell, np.ndarray):
+            total += cell.nbytes
+            if cell.dtype == object:
+                total += sum(sys.getsizeof(item) for item in cell)
+        elif isinstance(cell, (list, tuple)):
+            total += sum(sys.getsizeof(item) for item in cell)
+    return int(total * len(column) / len(sample)) if len(sample) else 0
+
+
+def frame_nbytes(df):
+    """Approximate in-memory size of a DataFrame (or of any other cached object)"""
+    if not hasattr(df, "memory_usage"):
+        return artifact_nbytes(df)
+    total = int(df.memory_usage(deep=True).sum())
+    for column in df.columns[df.dtypes == object]:
+        total += _list_items_nbytes(df[column])
+    return total
+
+
+def object_nbytes(value):
+    """Approximate deep size of plain Python data: containers, strings, arrays and object attributes"""
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            total += item.nbytes
+            if item.dtype == object:
+                stack.extend(item.ravel().tolist())
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__") and not isinstance(item, type):
+            stack.append(vars(item))
+    return total
+
+
+def artifact_nbytes(artifact):
+    """Approximate in-memory size of a derived artifact (index, matrix, ...)"""
+    if hasattr(artifact, "nbytes"):
+        return int(artifact.nbytes)
+    return object_nbytes(artifact)
+
+
+class DatasetRegistry:
+    """LRU cache of immutable DataFrames keyed by path, kind and file version"""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks = {}
+        self._dir_listing = None
+
+    def get(self, path, kind, loader):
+        """Return the cached frame for (path, kind), loading it if missing or stale"""
+        key = (os.path.abspath(path), kind)
+        version = file_version(path)
+
+        with self._lock:
+            entry = self._touch(key, version)
+            if entry is not None:
+                return entry["data"]
+
+        # Only one session loads a given dataset; the others wait for it
+        with self._loading(key):
+            with self._lock:
+                entry = self._touch(key, version)
+                if entry is not None:
+                    return entry["data"]
+            data = loader(path)
+            with self._lock:
+                self._entries[key] = {
+                    "version": version,
+                    "data": data,
+                    "nbytes": frame_nbytes(data),
+                    "derived": {},
+                }
+                self._evict(keep=key)
+            return data
+
+    def derived(self, path, kind, name, loader, build):
+        """Artifact built by build(frame) from the cached (path, kind) frame
+
+        Artifacts (indexes, matrices, ...) live with the frame they were built
+        from: they are rebuilt when the file changes and evicted with it. A
+        build may itself ask for other artifacts of the same frame.
+        """
+        data = self.get(path, kind, loader)
+        key = (os.path.abspath(path), kind)
+
+        with self._loading(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry["data"] is data and name in entry["derived"]:
+                    return entry["derived"][name]
+            artifact = build(data)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry["data"] is data:
+                    entry["derived"][name] = artifact
+                    entry["nbytes"] += artifact_nbytes(artifact)
+                    self._evict(keep=key)
+            return artifact
+
+    def version(self, path, kind):
+        """File version of the cached (path, kind) entry, or None if not loaded"""
+        with self._lock:
+            entry = self._entries.get((os.path.abspath(path), kind))
+            return entry["version"] if entry else None
+
+    def invalidate(self, path=None):
+        """Drop cached datasets for one file, or all of them"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._dir_listing = None
+                return
+            path = os.path.abspath(path)
+            for key in [k for k in self._entries if k[0] == path]:
+                del self._entries[key]
+
+    def stats(self):
+        """Summary of cached entries for display and sizing"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(e["nbytes"] for e in self._entries.values()),
+                "budget_bytes": self.budget_bytes,
+            }
+
+    def list_csv_files(self, search_paths):
+        """Map file name -> path of CSVs in search_paths, re-listed only when a directory changes"""
+        signature = tuple(
+            (path, os.stat(path).st_mtime_ns) for path in search_paths if os.path.isdir(path)
+        )
+        with self._lock:
+            if self._dir_listing and self._dir_listing[0] == signature:
+                return dict(self._dir_listing[1])
+
+        data_files = {}
+        for path, _ in signature:
+            for file in os.listdir(path):
+                if file.endswith('.csv'):
+                    data_files[file] = os.path.join(path, file)
+
+        with self._lock:
+            self._dir_listing = (signature, data_files)
+        return dict(data_files)
+
+    @contextmanager
+    def _loading(self, key):
+        """Hold the load lock of key, created on first use and dropped once no thread needs it
+
+        The lock is reentrant, so a loader or build running under it can
+        load other artifacts of the same key.
+        """
+        with self._lock:
+            lock, users = self._load_locks.get(key, (None, 0))
+            lock = lock or threading.RLock()
+            self._load_locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                _, users = self._load_locks[key]
+                if users == 1:
+                    del self._load_locks[key]
+                else:
+                    self._load_locks[key] = (lock, users - 1)
+
+    def _touch(self, key, version):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["version"] != version:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self, keep):
+        total = sum(e["nbytes"] for e in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.budget_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key)["nbytes"]
+
+
+REGISTRY = DatasetRegistry(
+    int(os.environ.get("FOODCOM_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024
+)
@@ -0,0 +1,41 @@
+"""Incremental evaluation of filter conjunctions.
+
+A filter is a list of predicates, each a (name, params, compute) triple
+where compute() returns a boolean mask over the frame's rows. Every
+predicate's mask is cached on its own, keyed by its name and parameters,
+so moving one slider recomputes only that slider's mask; the others come
+from the cache and the result is a handful of ANDs.
+
+Masks are kept as packed bitmaps (one bit per row, like the containers of
+BitmapIndex), which makes them 8x smaller and the ANDs 8x cheaper.
+"""
+import os
+
+import numpy as np
+
+from result_cache import ResultCache
+
+# Memory budget for predicate masks, in MB (override with FOODCOM_MASK_CACHE_MB)
+DEFAULT_MASK_CACHE_MB = 128
+
+
+def evaluate(namespace, version, n_rows, predicates, cache=None):
+    """Boolean mask of the rows passing every predicate
+
+    namespace and version identify the frame the masks are computed over;
+    predicates with params None are skipped.
+    """
+    cache = MASK_CACHE if cache is None else cache
+    combined = None
+    for name, params, compute in predicates:
+        if params is None:
+            continue
+        state = {'rows': n_rows, 'predicate': name, 'params': params}
+        bitmap = cache.rows(namespace, version, state, lambda: np.packbits(np.asarray(compute(), dtype=bool)))
+        combined = bitmap.copy() if combined is None else np.bitwise_and(combined, bitmap, out=combined)
+    if combined is None:
+        return np.ones(n_rows, dtype=bool)
+    return np.unpackbits(combined, count=n_rows).view(bool)
+
+
+MASK_CACHE = ResultCache(int(os.environ.get("FOODCOM_MASK_CACHE_MB", DEFAULT_MASK_CACHE_MB)) * 1024 * 1024)
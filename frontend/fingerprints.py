@@ -0,0 +1,115 @@
+"""64-bit row fingerprints for duplicate detection.
+
+Every row is hashed to one uint64 with pandas' vectorized hashing, so
+finding duplicates is a sort of integers rather than a comparison of wide
+text rows. Within a single frame, each text column is first factorized
+to integer codes and the codes are hashed: hash_pandas_object encodes
+every string to UTF-8 and runs SipHash over it, which is several times
+slower than factorizing (about 5x on RAW_interactions.csv, most of it in
+the review column; see bench_fingerprints.py). row_fingerprints() hashes
+the contents instead, for fingerprints that must agree across chunks.
+
+Rows with equal fingerprints form candidate groups. A 64-bit collision
+between different rows is astronomically unlikely, and verified_groups()
+rules it out by comparing only the rows inside candidate groups.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from columnar_cache import ensure_cache
+
+# Rows hashed at a time when fingerprinting a whole file
+BATCH_ROWS = 65536
+
+
+def row_fingerprints(df):
+    """uint64 fingerprint of every row of a frame"""
+    try:
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        # Unhashable cells (parsed lists): hash their text form instead
+        return pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+
+
+def file_fingerprints(csv_path, batch_rows=BATCH_ROWS):
+    """uint64 fingerprint of every row of a CSV, hashed batch by batch from its columnar cache
+
+    Only the fingerprints are held, never the rows. The cache gives every
+    batch the same column types, so equal rows hash equally wherever they
+    fall in the file.
+    """
+    parquet = pq.ParquetFile(ensure_cache(csv_path))
+    parts = [row_fingerprints(batch.to_pandas()) for batch in parquet.iter_batches(batch_rows)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint64)
+
+
+def frame_fingerprints(df):
+    """uint64 fingerprint of every row, comparable only within this frame"""
+    columns = {}
+    for i, col in enumerate(df.columns):
+        if pd.api.types.is_numeric_dtype(df[col]):
+            # Numbers hash as fast as codes would
+            columns[i] = df[col]
+            continue
+        try:
+            columns[i] = pd.factorize(df[col])[0]
+        except TypeError:
+            columns[i] = pd.factorize(df[col].astype(str))[0]
+    return pd.util.hash_pandas_object(pd.DataFrame(columns, index=df.index), index=False).to_numpy()
+
+
+class RowFingerprints:
+    """Row fingerprints of a frame, grouped by value"""
+
+    def __init__(self, fingerprints):
+        self.fingerprints = fingerprints
+        self._order = np.argsort(fingerprints, kind='stable')
+        ordered = fingerprints[self._order]
+        self._starts = np.flatnonzero(np.concatenate([[True], ordered[1:] != ordered[:-1]]))
+        self._sizes = np.diff(np.append(self._starts, len(ordered)))
+
+    @classmethod
+    def build(cls, df):
+        return cls(frame_fingerprints(df))
+
+    @property
+    def nbytes(self):
+        return self.fingerprints.nbytes + self._order.nbytes + self._starts.nbytes + self._sizes.nbytes
+
+    @property
+    def duplicates(self):
+        """Rows whose fingerprint occurs earlier in the frame (as DataFrame.duplicated counts)"""
+        return len(self.fingerprints) - len(self._starts)
+
+    def duplicated(self):
+        """Boolean mask of rows repeating an earlier row"""
+        mask = np.ones(len(self.fingerprints), dtype=bool)
+        # The stable sort puts each group's first row at the group start
+        mask[self._order[self._starts]] = False
+        return mask
+
+    def groups(self, limit=None):
+        """Row positions of each group of identical fingerprints, largest groups first"""
+        repeated = np.flatnonzero(self._sizes > 1)
+        repeated = repeated[np.argsort(-self._sizes[repeated], kind='stable')]
+        if limit is not None:
+            repeated = repeated[:limit]
+        return [self._order[self._starts[g]:self._starts[g] + self._sizes[g]] for g in repeated]
+
+    def verified_groups(self, read_rows, limit=None):
+        """groups() split by exact row equality, dropping rows that only collided
+
+        read_rows returns the rows at the given positions as a frame
+        (DataFrame.take, or columnar_cache.read_rows for a whole file).
+        """
+        verified = []
+        for rows in self.groups(limit):
+            # Text form so that missing values compare equal, as in DataFrame.duplicated
+            keys = pd.Series(list(read_rows(rows).astype(str).itertuples(index=False, name=None)))
+            codes = pd.factorize(keys)[0]
+            for code in np.unique(codes):
+                exact = rows[codes == code]
+                if len(exact) > 1:
+                    verified.append(exact)
+        return verified
@@ -0,0 +1,69 @@
+"""Recipe id -> row position index.
+
+Recipe ids are sparse integers, so the index is the sorted id array plus the
+permutation that sorts it. Lookups are vectorized binary searches, which
+lets a whole page of reviews be joined to recipe names in one call. The
+arrays are persisted next to the columnar cache (``*.ids.npz``).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import artifact_path, cache_dir_for, is_artifact_fresh, mark_artifact_fresh
+
+ARTIFACT_SUFFIX = "ids.npz"
+
+
+class IdIndex:
+    """Sorted ids with their row positions"""
+
+    def __init__(self, sorted_ids, positions):
+        self.sorted_ids = sorted_ids
+        self.positions = positions
+
+    @classmethod
+    def build(cls, ids):
+        """Build the index from a column of integer ids"""
+        ids = pd.Series(ids).to_numpy(dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        return cls(ids[order], order.astype(np.int64))
+
+    @classmethod
+    def load_or_build(cls, csv_path, ids):
+        """Load the persisted index for csv_path, rebuilding it if the CSV changed"""
+        path = artifact_path(csv_path, ARTIFACT_SUFFIX)
+        if is_artifact_fresh(csv_path, ARTIFACT_SUFFIX):
+            with np.load(path) as data:
+                return cls(data['sorted_ids'], data['positions'])
+
+        index = cls.build(ids)
+        os.makedirs(cache_dir_for(csv_path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, sorted_ids=index.sorted_ids, positions=index.positions)
+        os.replace(tmp_path, path)
+        mark_artifact_fresh(csv_path, ARTIFACT_SUFFIX)
+        return index
+
+    @property
+    def nbytes(self):
+        return self.sorted_ids.nbytes + self.positions.nbytes
+
+    def lookup(self, ids):
+        """Row positions of ids, -1 where an id is unknown"""
+        ids = pd.Series(ids).fillna(-1).to_numpy(dtype=np.int64)
+        if len(self.sorted_ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        slots = np.searchsorted(self.sorted_ids, ids)
+        slots = np.minimum(slots, len(self.sorted_ids) - 1)
+        found = self.sorted_ids[slots] == ids
+        return np.where(found, self.positions[slots], -1)
+
+
+def join_column(index, ids, column):
+    """Values of column (a Series of the indexed frame) for ids, None where unknown"""
+    rows = index.lookup(ids)
+    found = rows >= 0
+    joined = np.full(len(rows), None, dtype=object)
+    joined[found] = column.iloc[rows[found]].to_numpy(dtype=object)
+    return joined
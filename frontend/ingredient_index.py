@@ -0,0 +1,114 @@
+"""Pantry ("cook with what I have") queries over recipe ingredients.
+
+Ingredients are normalized and indexed with a BitmapIndex. Normalizing
+lowercases a name, splits it into words at spaces and punctuation, and
+reduces every word to a singular form, so "Eggs" and "egg" are one
+ingredient. A pantry item, normalized the same way, covers every
+ingredient whose name ends with its words: "flour" covers "flour" and
+"all-purpose flour", but not "flour tortillas".
+
+For a pantry list, every recipe gets the number of its distinct
+ingredients covered by the pantry; recipes missing at most k ingredients
+are returned ranked by coverage (share of the recipe's ingredients
+already in the pantry).
+"""
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from bitmap_index import BitmapIndex
+
+# Versioned with the normalization: the artifact stores normalized names
+ARTIFACT_SUFFIX = "ingredients.v2.npz"
+
+WORD = re.compile(r"[\w']+")
+
+
+def singular(word):
+    """Singular form of an English plural, or the word itself"""
+    if word.endswith("'s"):
+        # A possessive, as in "chef's"
+        return word
+    if len(word) > 3 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith(('oes', 'ches', 'shes', 'sses', 'xes', 'zes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def normalize_ingredient(name):
+    """Canonical form of an ingredient name: lowercase singular words, single spaces"""
+    return ' '.join(singular(word) for word in WORD.findall(str(name).lower()))
+
+
+def covers(item, ingredient):
+    """Whether a normalized pantry item covers a normalized ingredient"""
+    return ingredient == item or ingredient.endswith(' ' + item)
+
+
+def parse_pantry(text):
+    """Normalized pantry items from comma- or newline-separated text"""
+    items = (normalize_ingredient(item) for item in re.split(r"[,;\n]", text or ''))
+    return sorted({item for item in items if item})
+
+
+class IngredientIndex:
+    """Ingredient bitmap index, with the ingredients each pantry item covers"""
+
+    def __init__(self, index):
+        self.index = index
+        # Every trailing run of words of every ingredient -> the ingredients ending with it
+        self._covered = defaultdict(list)
+        for term in index.terms():
+            words = term.split(' ')
+            for start in range(len(words)):
+                self._covered[' '.join(words[start:])].append(term)
+
+    @property
+    def n_rows(self):
+        return self.index.n_rows
+
+    @property
+    def row_sizes(self):
+        return self.index.row_sizes
+
+    @property
+    def nbytes(self):
+        return self.index.nbytes + sum(len(suffix) + 8 * len(terms) for suffix, terms in self._covered.items())
+
+    def covered(self, pantry):
+        """Indexed ingredients covered by any of the pantry items"""
+        return {term for item in pantry for term in self._covered.get(normalize_ingredient(item), [])}
+
+
+def load_or_build_index(csv_path, ingredients):
+    """Persisted ingredient index for a recipes CSV"""
+    return IngredientIndex(BitmapIndex.load_or_build(csv_path, ingredients, ARTIFACT_SUFFIX, normalize_ingredient))
+
+
+def match_pantry(index, pantry, max_missing=0):
+    """Recipes makeable from pantry with at most max_missing extra ingredients
+
+    Returns (rows, coverage, missing) sorted by coverage, best first, then
+    by fewest missing ingredients.
+    """
+    hits = np.zeros(index.n_rows, dtype=np.int32)
+    for term in index.covered(pantry):
+        hits[index.index.rows(term)] += 1
+
+    sizes = index.row_sizes.astype(np.int32)
+    missing = sizes - hits
+    rows = np.flatnonzero((hits > 0) & (missing <= max_missing))
+    coverage = hits[rows] / sizes[rows]
+    order = np.lexsort((missing[rows], -coverage))
+    return rows[order], coverage[order], missing[rows][order]
+
+
+def pantry_coverage(ingredients, pantry):
+    """(ingredients at hand, distinct ingredients) of one recipe for a pantry"""
+    items = {normalize_ingredient(item) for item in ingredients}
+    pantry = [normalize_ingredient(item) for item in pantry]
+    return sum(any(covers(item, ingredient) for item in pantry) for ingredient in items), len(items)
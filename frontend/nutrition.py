@@ -0,0 +1,50 @@
+"""Dense numeric view of the recipes' nutrition column.
+
+RAW_recipes.csv stores nutrition as a 7-item list per recipe. Here it is
+turned into one float32 (N, 7) matrix so range filters and averages are
+plain numpy operations over the whole selection.
+"""
+import numpy as np
+import pandas as pd
+
+NUTRITION_COLUMNS = ['calories', 'fat', 'sugar', 'sodium', 'protein', 'saturated_fat', 'carbs']
+NUTRITION_LABELS = ['Calories', 'Fat (% DV)', 'Sugar (% DV)', 'Sodium (% DV)',
+                    'Protein (% DV)', 'Saturated Fat (% DV)', 'Carbs (% DV)']
+
+
+def nutrition_matrix(nutrition_column):
+    """float32 (N, 7) matrix from a column of parsed nutrition lists, NaN where missing"""
+    lists = pd.Series(nutrition_column).reset_index(drop=True)
+    width = len(NUTRITION_COLUMNS)
+    matrix = np.full((len(lists), width), np.nan, dtype=np.float32)
+
+    lengths = lists.map(lambda values: 0 if values is None else len(values)).to_numpy()
+    complete = np.flatnonzero(lengths == width)
+    if len(complete):
+        matrix[complete] = np.stack(lists.iloc[complete].to_numpy()).astype(np.float32)
+    for pos in np.flatnonzero((lengths > 0) & (lengths != width)):
+        values = np.asarray(lists.iloc[pos], dtype=np.float32)[:width]
+        matrix[pos, :len(values)] = values
+    return matrix
+
+
+def range_mask(matrix, column, low=None, high=None):
+    """Rows whose value in column lies in [low, high]; None leaves that side open"""
+    values = matrix[:, NUTRITION_COLUMNS.index(column)]
+    mask = ~np.isnan(values)
+    if low is not None:
+        mask &= values >= low
+    if high is not None:
+        mask &= values <= high
+    return mask
+
+
+def column_means(matrix, rows=None):
+    """Mean of each nutrition column over the selected rows, ignoring missing values"""
+    selected = matrix if rows is None else matrix[rows]
+    present = ~np.isnan(selected)
+    counts = present.sum(axis=0)
+    sums = np.where(present, selected, 0).sum(axis=0, dtype=np.float64)
+    means = np.full(len(NUTRITION_COLUMNS), np.nan)
+    np.divide(sums, counts, out=means, where=counts > 0)
+    return dict(zip(NUTRITION_COLUMNS, means))
@@ -0,0 +1,60 @@
+"""Parallel chunked CSV ingest.
+
+The CSV is tokenized in chunks by pandas in the calling process and each
+chunk is handed to a process pool for the expensive per-row work (parsing
+the literal list columns). At most ``2 * workers`` chunks are in flight at
+any time, so peak memory depends on the chunk size and core count, not on
+the size of the file.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 20000
+
+
+def default_workers():
+    """Number of worker processes to use for ingest"""
+    return int(os.environ.get("FOODCOM_INGEST_WORKERS", os.cpu_count() or 1))
+
+
+def iter_chunks(csv_path, transform, chunksize=DEFAULT_CHUNKSIZE, workers=None, progress=None):
+    """Yield transform(chunk) for each chunk of a CSV, in file order
+
+    transform must be a module-level function so it can be sent to worker
+    processes. progress, if given, is called with the fraction of the file
+    processed so far.
+    """
+    workers = workers or default_workers()
+    total_bytes = os.path.getsize(csv_path) or 1
+
+    def report(position):
+        if progress is not None:
+            progress(min(position / total_bytes, 1.0))
+
+    with open(csv_path, 'rb') as f:
+        reader = pd.read_csv(f, chunksize=chunksize)
+
+        if workers == 1:
+            for chunk in reader:
+                result = transform(chunk)
+                report(f.tell())
+                yield result
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in reader:
+                pending.append((pool.submit(transform, chunk), f.tell()))
+                # Bound the number of chunks held in memory at once
+                if len(pending) >= 2 * workers:
+                    future, position = pending.popleft()
+                    yield future.result()
+                    report(position)
+            while pending:
+                future, position = pending.popleft()
+                yield future.result()
+                report(position)
+
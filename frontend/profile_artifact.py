@@ -0,0 +1,319 @@
+"""Persisted profile reports for the analysis view.
+
+A ProfileReport is the rendered form of a DatasetProfile: per-column
+missingness, distinct counts, top values, summary statistics, histograms
+(fixed-width and quantile bins) and box plot summaries, plus the
+correlation matrix, duplicate count and a preview of the first rows. It is
+written as JSON next to the columnar cache (``*.profile.json``) and
+rebuilt only when the source CSV changes, so the analysis view opens
+without touching the data.
+
+Build the reports ahead of time with:
+
+    python frontend/profile_artifact.py data/RAW_recipes.csv data/RAW_interactions.csv
+"""
+import json
+import os
+import sys
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from binning import (MAX_OUTLIER_POINTS, finite_values, fixed_width_edges, merge_outlier_samples, quantile_bin_edges,
+                     split_outliers, tukey_fences)
+from columnar_cache import artifact_path, cache_dir_for, is_artifact_fresh, mark_artifact_fresh
+from parallel_ingest import DEFAULT_CHUNKSIZE, iter_chunks
+from profiler import PREVIEW_ROWS, profile_csv
+
+ARTIFACT_SUFFIX = "profile.json"
+# Bump when the report layout changes; older reports are then rebuilt
+REPORT_FORMAT_VERSION = 3
+
+HISTOGRAM_BINS = 30
+TOP_VALUES = 20
+STAT_NAMES = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+def _chunk_distributions(chunk, edges, quantile_edges, fences, max_outliers=MAX_OUTLIER_POINTS):
+    """Bin counts, whisker ends and sampled outliers of one chunk's numeric columns (runs in a worker process)"""
+    parts = {}
+    for col, col_edges in edges.items():
+        values = finite_values(chunk[col])
+        whiskers, sample, n_outliers = split_outliers(values, fences[col], max_outliers)
+        parts[col] = {
+            'counts': np.histogram(values, bins=col_edges)[0],
+            'quantile_counts': np.histogram(values, bins=quantile_edges[col])[0],
+            'whiskers': whiskers,
+            'outliers': sample,
+            'n_outliers': n_outliers,
+        }
+    return parts
+
+
+def column_distributions(csv_path, profile, bins=HISTOGRAM_BINS, chunksize=DEFAULT_CHUNKSIZE, workers=None,
+                         progress=None):
+    """Exact histograms and box plot summaries of the numeric columns, in a second pass over the file
+
+    The first pass (the profile) gives the range, quantiles and quartiles
+    the bins and Tukey fences are placed on; this pass counts the values.
+    """
+    edges, quantile_edges, fences = {}, {}, {}
+    for col in profile.numeric_columns:
+        column = profile.columns[col]
+        if not column.count:
+            continue
+        edges[col] = fixed_width_edges(column.digest.min, column.digest.max, bins)
+        quantile_edges[col] = quantile_bin_edges(column.quantile(np.linspace(0, 1, bins + 1)))
+        fences[col] = tukey_fences(*column.quantile([0.25, 0.75]))
+
+    counts = {col: np.zeros(len(edges[col]) - 1, dtype=np.int64) for col in edges}
+    quantile_counts = {col: np.zeros(len(quantile_edges[col]) - 1, dtype=np.int64) for col in edges}
+    whiskers = {col: (np.inf, -np.inf) for col in edges}
+    outliers = {col: [] for col in edges}
+    chunk_distributions = partial(_chunk_distributions, edges=edges, quantile_edges=quantile_edges, fences=fences)
+    for parts in iter_chunks(csv_path, chunk_distributions, chunksize, workers, progress):
+        for col, part in parts.items():
+            counts[col] += part['counts']
+            quantile_counts[col] += part['quantile_counts']
+            whiskers[col] = (min(whiskers[col][0], part['whiskers'][0]), max(whiskers[col][1], part['whiskers'][1]))
+            outliers[col].append((part['outliers'], part['n_outliers']))
+
+    distributions = {}
+    for col in edges:
+        distributions[col] = {
+            'histogram': {'edges': edges[col].tolist(), 'counts': counts[col].tolist()},
+            'quantile_histogram': {'edges': quantile_edges[col].tolist(), 'counts': quantile_counts[col].tolist()},
+            'box': {
+                'lower_whisker': _json_value(whiskers[col][0]),
+                'upper_whisker': _json_value(whiskers[col][1]),
+                'outliers': merge_outlier_samples(outliers[col]).tolist(),
+                'n_outliers': int(sum(n for _, n in outliers[col])),
+            },
+        }
+    return distributions
+
+
+def _json_value(value):
+    """Plain JSON value for a numpy scalar; NaN becomes null"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+class ProfileReport:
+    """Rendered profile of one CSV, with the DatasetProfile accessors the analysis view uses"""
+
+    def __init__(self, report):
+        self.report = report
+        self._columns = {column['name']: column for column in report['columns']}
+
+    @classmethod
+    def from_profile(cls, profile, distributions=None):
+        distributions = distributions or {}
+        describe = profile.describe()
+        columns = []
+        for name, column in profile.columns.items():
+            top = profile.top_values(name, TOP_VALUES)
+            entry = {
+                'name': name,
+                'dtype': column.dtype,
+                'count': int(column.count),
+                'missing': int(profile.rows - column.count),
+                'distinct': int(column.distinct),
+                'numeric': column.numeric,
+                'top_values': None if top is None else [[_json_value(v), int(c)] for v, c in top.items()],
+                'stats': None,
+                'histogram': None,
+                'quantile_histogram': None,
+                'box': None,
+            }
+            entry.update(distributions.get(name, {}))
+            if column.numeric:
+                entry['stats'] = {stat: _json_value(describe.at[stat, name]) for stat in STAT_NAMES}
+                entry['stats']['skewness'] = _json_value(profile.skewness(name))
+                if entry['box'] is not None:
+                    entry['stats']['outliers'] = entry['box']['n_outliers']
+                else:
+                    entry['stats']['outliers'] = int(profile.outliers(name)) if column.count else 0
+            columns.append(entry)
+
+        corr = profile.correlation()
+        preview = profile.preview.head(PREVIEW_ROWS)
+        return cls({
+            'format_version': REPORT_FORMAT_VERSION,
+            'rows': int(profile.rows),
+            'memory_bytes': int(profile.memory_bytes),
+            'duplicates': int(profile.duplicates),
+            'columns': columns,
+            'correlation': {
+                'columns': list(corr.columns),
+                'values': [[_json_value(v) for v in row] for row in corr.to_numpy()],
+            },
+            'preview': {
+                'columns': list(preview.columns),
+                'data': [[_json_value(v) for v in row] for row in preview.astype(object).to_numpy()],
+            },
+        })
+
+    @property
+    def rows(self):
+        return self.report['rows']
+
+    @property
+    def memory_bytes(self):
+        return self.report['memory_bytes']
+
+    @property
+    def duplicates(self):
+        return self.report['duplicates']
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def numeric_columns(self):
+        return [name for name, column in self._columns.items() if column['numeric']]
+
+    @property
+    def categorical_columns(self):
+        return [name for name, column in self._columns.items() if not column['numeric']]
+
+    @property
+    def preview(self):
+        preview = self.report['preview']
+        return pd.DataFrame(preview['data'], columns=preview['columns'])
+
+    def dtypes(self):
+        return pd.Series({name: column['dtype'] for name, column in self._columns.items()})
+
+    def distinct(self, col):
+        return self._columns[col]['distinct']
+
+    def quality(self):
+        """Missing and distinct counts per column"""
+        columns = list(self._columns.values())
+        missing = np.array([column['missing'] for column in columns])
+        missing_percent = missing / self.rows * 100 if self.rows else np.zeros(len(columns))
+        return pd.DataFrame({
+            'Column': [column['name'] for column in columns],
+            'Missing Count': missing,
+            'Missing %': missing_percent,
+            'Data Type': [column['dtype'] for column in columns],
+            'Unique Values': [column['distinct'] for column in columns],
+            'Completeness': 100 - missing_percent,
+        })
+
+    def describe(self):
+        """The rows of DataFrame.describe() for the numeric columns"""
+        return pd.DataFrame(
+            {name: [self._columns[name]['stats'][stat] for stat in STAT_NAMES] for name in self.numeric_columns},
+            index=STAT_NAMES, dtype=np.float64,
+        )
+
+    def correlation(self):
+        corr = self.report['correlation']
+        return pd.DataFrame(corr['values'], index=corr['columns'], columns=corr['columns'], dtype=np.float64)
+
+    def top_values(self, col, n=10):
+        """Most frequent values of a column, or None if it has too many to count exactly"""
+        top = self._columns[col]['top_values']
+        if top is None:
+            return None
+        return pd.Series([count for _, count in top[:n]], index=[value for value, _ in top[:n]], dtype=np.int64)
+
+    def histogram(self, col, quantile=False):
+        """(edges, counts) of a numeric column over the whole file, or None
+
+        With quantile, the bins hold roughly equal numbers of values (see
+        binning.quantile_bin_edges).
+        """
+        histogram = self._columns[col]['quantile_histogram' if quantile else 'histogram']
+        if histogram is None:
+            return None
+        return np.array(histogram['edges']), np.array(histogram['counts'], dtype=np.int64)
+
+    def box_summary(self, col):
+        """Five-number summary of a numeric column with Tukey whiskers and sampled outliers"""
+        box = self._columns[col]['box']
+        if box is None:
+            return None
+        stats = self._columns[col]['stats']
+        return {
+            'q1': stats['25%'],
+            'median': stats['50%'],
+            'q3': stats['75%'],
+            'lower_whisker': box['lower_whisker'],
+            'upper_whisker': box['upper_whisker'],
+            'mean': stats['mean'],
+            'outliers': np.array(box['outliers'], dtype=np.float64),
+            'n_outliers': box['n_outliers'],
+        }
+
+    def column_stats(self, col):
+        """Series.describe() of a numeric column"""
+        stats = self._columns[col]['stats']
+        return pd.Series([stats[stat] for stat in STAT_NAMES], index=STAT_NAMES, dtype=np.float64)
+
+    def skewness(self, col):
+        value = self._columns[col]['stats']['skewness']
+        return np.nan if value is None else value
+
+    def outliers(self, col):
+        return self._columns[col]['stats']['outliers']
+
+
+def build_report(csv_path, progress=None):
+    """Profile a CSV (one pass) and bin its numeric columns (second pass)"""
+    first_pass = None if progress is None else (lambda fraction: progress(fraction / 2))
+    second_pass = None if progress is None else (lambda fraction: progress(0.5 + fraction / 2))
+    profile = profile_csv(csv_path, progress=first_pass)
+    return ProfileReport.from_profile(profile, column_distributions(csv_path, profile, progress=second_pass))
+
+
+def load_report(csv_path):
+    """The persisted report for csv_path, or None if it is missing or stale"""
+    if not is_artifact_fresh(csv_path, ARTIFACT_SUFFIX):
+        return None
+    try:
+        with open(artifact_path(csv_path, ARTIFACT_SUFFIX)) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if report.get('format_version') != REPORT_FORMAT_VERSION:
+        return None
+    return ProfileReport(report)
+
+
+def save_report(csv_path, report):
+    """Persist a report next to the columnar cache"""
+    os.makedirs(cache_dir_for(csv_path), exist_ok=True)
+    path = artifact_path(csv_path, ARTIFACT_SUFFIX)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report.report, f)
+    os.replace(tmp_path, path)
+    mark_artifact_fresh(csv_path, ARTIFACT_SUFFIX)
+
+
+def load_or_build_report(csv_path, progress=None):
+    """The persisted report for csv_path, profiling the file live (and persisting it) if needed"""
+    report = load_report(csv_path)
+    if report is None:
+        report = build_report(csv_path, progress)
+        save_report(csv_path, report)
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python frontend/profile_artifact.py <file.csv> [<file.csv> ...]")
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        report = build_report(path)
+        save_report(path, report)
+        print(f"{path}: {report.rows:,} rows, {len(report.columns)} columns "
+              f"-> {artifact_path(path, ARTIFACT_SUFFIX)}")
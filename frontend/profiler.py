@@ -0,0 +1,470 @@
+"""Single-pass streaming profile of a CSV file.
+
+The file is read in chunks (see parallel_ingest) and every chunk is reduced
+to a DatasetProfile of mergeable summaries:
+
+- exact row, non-null and (while small) value counts per column,
+- mean, variance and skewness as Welford/Chan moments,
+- distinct counts with a HyperLogLog sketch,
+- quantiles with a merging t-digest,
+- pairwise-complete Pearson correlation from co-moment matrices,
+- duplicate rows from 64-bit row fingerprints (see fingerprints).
+
+Partial profiles from worker processes are combined with merge(), so the
+whole file is profiled in one pass with memory bounded by the sketch sizes
+(plus 8 bytes per distinct row for the duplicate count).
+
+Profile a file from the command line with:
+
+    python frontend/profiler.py data/RAW_interactions.csv
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from fingerprints import row_fingerprints
+from parallel_ingest import DEFAULT_CHUNKSIZE, iter_chunks
+
+HLL_PRECISION = 14
+TDIGEST_COMPRESSION = 200
+# Columns with more distinct values than this keep no exact value counts
+TOP_VALUES_CAP = 1000
+PREVIEW_ROWS = 100
+
+
+def is_numeric(series):
+    """Numeric columns are profiled with moments, quantiles and correlation"""
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def value_hashes(series):
+    """64-bit hashes of the non-null values of a column"""
+    values = series.dropna()
+    if is_numeric(values):
+        # int and float chunks of one column must hash alike
+        values = values.astype(np.float64)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**precision one-byte registers"""
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add(self, hashes):
+        """Add an array of uint64 hashes"""
+        p = self.precision
+        slots = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes << np.uint64(p)
+        # Rank = leading zeros of the remaining bits + 1, from the float exponent
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, 64 - p + 1, 65 - exponent)
+        rank = np.clip(rank, 1, 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, slots, rank)
+
+    def merge(self, other):
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+
+class TDigest:
+    """Merging t-digest: weighted centroids, finest at the tails"""
+
+    def __init__(self, compression=TDIGEST_COMPRESSION, means=None, weights=None,
+                 minimum=np.inf, maximum=-np.inf):
+        self.compression = compression
+        self.means = np.empty(0) if means is None else means
+        self.weights = np.empty(0) if weights is None else weights
+        self.min = minimum
+        self.max = maximum
+
+    @classmethod
+    def from_values(cls, values, compression=TDIGEST_COMPRESSION):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return cls(compression)
+        return cls(compression, minimum=values.min(), maximum=values.max())._compressed(
+            values, np.ones(len(values)))
+
+    def _compressed(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Arcsine scale function: one bucket per unit of k, so centroids are small near q=0 and q=1
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        buckets = np.floor(k - k.min()).astype(np.int64)
+        starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        return TDigest(self.compression, merged_means, merged_weights, self.min, self.max)
+
+    def merge(self, other):
+        if len(other.weights) == 0:
+            return self
+        if len(self.weights) == 0:
+            return other
+        digest = TDigest(self.compression, minimum=min(self.min, other.min), maximum=max(self.max, other.max))
+        return digest._compressed(np.concatenate([self.means, other.means]),
+                                  np.concatenate([self.weights, other.weights]))
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def _knots(self):
+        mids = np.cumsum(self.weights) - self.weights / 2
+        return (np.concatenate([[self.min], self.means, [self.max]]),
+                np.concatenate([[0.0], mids, [self.count]]))
+
+    def quantile(self, q):
+        """Estimated value at quantile q (scalar or array)"""
+        if len(self.weights) == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        values, ranks = self._knots()
+        return np.interp(np.asarray(q) * self.count, ranks, values)
+
+    def cdf(self, x):
+        """Estimated fraction of values <= x"""
+        if len(self.weights) == 0:
+            return np.nan
+        values, ranks = self._knots()
+        return np.interp(x, values, ranks) / self.count
+
+    @property
+    def nbytes(self):
+        return self.means.nbytes + self.weights.nbytes
+
+
+class Moments:
+    """Count, mean and central moments (M2, M3) of a numeric column"""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, m3=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.m3 = m3
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return cls()
+        mean = values.mean()
+        deviations = values - mean
+        return cls(len(values), mean, float(np.dot(deviations, deviations)), float(np.sum(deviations ** 3)))
+
+    def merge(self, other):
+        """Chan et al. pairwise update, the parallel form of Welford's algorithm"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        mean = self.mean + delta * nb / n
+        m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        return Moments(n, mean, m2, m3)
+
+    @property
+    def variance(self):
+        """Sample variance, as pandas computes it"""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def skewness(self):
+        """Adjusted Fisher-Pearson skewness, as pandas computes it"""
+        n = self.count
+        if n < 3 or self.m2 == 0:
+            return np.nan
+        g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+        return g1 * np.sqrt(n * (n - 1)) / (n - 2)
+
+
+class CoMoments:
+    """Pairwise-complete co-moments of numeric columns
+
+    Entry [i, j] of each matrix describes column i over the rows where both
+    i and j are present, which is what DataFrame.corr() uses.
+    """
+
+    def __init__(self, columns, n, mean, m2, c):
+        self.columns = list(columns)
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.c = c
+
+    @classmethod
+    def from_frame(cls, numeric):
+        x = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(x)
+        p = present.astype(np.float64)
+        counts = present.sum(axis=0)
+        # Shift by the chunk means so the sums below do not lose precision
+        shift = np.divide(np.where(present, x, 0).sum(axis=0), counts, out=np.zeros(x.shape[1]), where=counts > 0)
+        x0 = np.where(present, x - shift, 0.0)
+        n = p.T @ p
+        s = x0.T @ p
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, shift[:, None] + s / n, 0.0)
+            m2 = np.where(n > 0, (x0 ** 2).T @ p - s ** 2 / n, 0.0)
+            c = np.where(n > 0, x0.T @ x0 - s * s.T / n, 0.0)
+        return cls(numeric.columns, n, mean, m2, c)
+
+    def _aligned(self, columns):
+        k = len(columns)
+        arrays = [np.zeros((k, k)) for _ in range(4)]
+        where = [columns.index(col) for col in self.columns]
+        for target, source in zip(arrays, (self.n, self.mean, self.m2, self.c)):
+            target[np.ix_(where, where)] = source
+        return arrays
+
+    def merge(self, other):
+        columns = self.columns + [col for col in other.columns if col not in self.columns]
+        na, ma, m2a, ca = self._aligned(columns)
+        nb, mb, m2b, cb = other._aligned(columns)
+        n = na + nb
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(n > 0, na * nb / n, 0.0)
+            delta = mb - ma
+            mean = ma + np.where(n > 0, delta * nb / n, 0.0)
+        return CoMoments(columns, n, mean, m2a + m2b + delta ** 2 * weight, ca + cb + delta * delta.T * weight)
+
+    def correlation(self):
+        """Pearson correlation matrix as a DataFrame"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.c / np.sqrt(self.m2 * self.m2.T)
+        corr[self.n < 2] = np.nan
+        np.fill_diagonal(corr, np.where(np.diag(self.m2) > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+    @property
+    def nbytes(self):
+        return self.n.nbytes * 4
+
+
+class ColumnProfile:
+    """Mergeable summary of one column"""
+
+    def __init__(self, dtype, count, hll, value_counts, moments=None, digest=None):
+        self.dtype = dtype
+        self.count = count
+        self.hll = hll
+        # Exact value -> count while the column has at most TOP_VALUES_CAP distinct values, else None
+        self.value_counts = value_counts
+        self.moments = moments
+        self.digest = digest
+
+    @classmethod
+    def from_series(cls, series):
+        hll = HyperLogLog()
+        hll.add(value_hashes(series))
+        counts = series.value_counts()
+        value_counts = counts.to_dict() if len(counts) <= TOP_VALUES_CAP else None
+        if not is_numeric(series):
+            return cls(str(series.dtype), int(series.count()), hll, value_counts)
+        values = series.dropna().to_numpy(dtype=np.float64)
+        return cls(str(series.dtype), len(values), hll, value_counts,
+                   Moments.from_values(values), TDigest.from_values(values))
+
+    @property
+    def numeric(self):
+        return self.moments is not None
+
+    def merge(self, other):
+        if self.value_counts is None or other.value_counts is None:
+            value_counts = None
+        else:
+            value_counts = dict(self.value_counts)
+            for value, count in other.value_counts.items():
+                value_counts[value] = value_counts.get(value, 0) + count
+            if len(value_counts) > TOP_VALUES_CAP:
+                value_counts = None
+
+        if self.numeric and other.numeric:
+            dtype = self.dtype if self.dtype == other.dtype else 'float64'
+            moments, digest = self.moments.merge(other.moments), self.digest.merge(other.digest)
+        else:
+            # A chunk that did not parse as numbers makes the whole column non-numeric
+            dtype = self.dtype if self.dtype == other.dtype else 'object'
+            moments, digest = None, None
+        return ColumnProfile(dtype, self.count + other.count, self.hll.merge(other.hll), value_counts, moments, digest)
+
+    @property
+    def distinct(self):
+        """Exact distinct count when value counts were kept, else the HyperLogLog estimate"""
+        if self.value_counts is not None:
+            return len(self.value_counts)
+        return self.hll.estimate()
+
+    def quantile(self, q):
+        """Quantiles of a numeric column: exact while value counts are kept, else from the t-digest"""
+        if self.value_counts is None or self.count == 0:
+            return self.digest.quantile(q)
+        values = np.array(sorted(self.value_counts), dtype=np.float64)
+        ends = np.cumsum([self.value_counts[value] for value in sorted(self.value_counts)])
+        # Linear interpolation between order statistics, as pandas does
+        rank = (self.count - 1) * np.asarray(q, dtype=np.float64)
+        low = values[np.searchsorted(ends, np.floor(rank), side='right')]
+        high = values[np.searchsorted(ends, np.ceil(rank), side='right')]
+        return low + (rank - np.floor(rank)) * (high - low)
+
+    def count_outside(self, low, high):
+        """Number of values below low or above high"""
+        if self.value_counts is None:
+            outside = self.digest.cdf(low) + 1 - self.digest.cdf(high)
+            return int(round(outside * self.digest.count))
+        return sum(count for value, count in self.value_counts.items() if value < low or value > high)
+
+    @property
+    def nbytes(self):
+        return self.hll.nbytes + (self.digest.nbytes if self.digest is not None else 0)
+
+
+class DatasetProfile:
+    """Mergeable profile of a whole table"""
+
+    def __init__(self, rows, columns, comoments, row_hashes, memory_bytes, preview):
+        self.rows = rows
+        self.columns = columns
+        self.comoments = comoments
+        # Sorted distinct row hashes, for the duplicate count
+        self.row_hashes = row_hashes
+        self.memory_bytes = memory_bytes
+        self.preview = preview
+
+    @classmethod
+    def from_frame(cls, df):
+        columns = {col: ColumnProfile.from_series(df[col]) for col in df.columns}
+        numeric = [col for col in df.columns if columns[col].numeric]
+        row_hashes = np.unique(row_fingerprints(df))
+        return cls(len(df), columns, CoMoments.from_frame(df[numeric]), row_hashes,
+                   int(df.memory_usage(deep=True).sum()), df.head(PREVIEW_ROWS))
+
+    def merge(self, other):
+        """Profile of self's rows followed by other's rows"""
+        columns = dict(self.columns)
+        for col, profile in other.columns.items():
+            columns[col] = columns[col].merge(profile) if col in columns else profile
+        preview = self.preview
+        if len(preview) < PREVIEW_ROWS:
+            preview = pd.concat([preview, other.preview.head(PREVIEW_ROWS - len(preview))], ignore_index=True)
+        return DatasetProfile(
+            self.rows + other.rows,
+            columns,
+            self.comoments.merge(other.comoments),
+            np.union1d(self.row_hashes, other.row_hashes),
+            self.memory_bytes + other.memory_bytes,
+            preview,
+        )
+
+    @property
+    def nbytes(self):
+        return (sum(col.nbytes for col in self.columns.values()) + self.comoments.nbytes
+                + self.row_hashes.nbytes + int(self.preview.memory_usage(deep=True).sum()))
+
+    @property
+    def duplicates(self):
+        """Rows identical to an earlier row"""
+        return self.rows - len(self.row_hashes)
+
+    @property
+    def numeric_columns(self):
+        return [col for col, profile in self.columns.items() if profile.numeric]
+
+    @property
+    def categorical_columns(self):
+        return [col for col, profile in self.columns.items() if not profile.numeric]
+
+    def dtypes(self):
+        return pd.Series({col: profile.dtype for col, profile in self.columns.items()})
+
+    def quality(self):
+        """Missing and distinct counts per column"""
+        names = list(self.columns)
+        counts = np.array([self.columns[col].count for col in names])
+        missing = self.rows - counts
+        missing_percent = missing / self.rows * 100 if self.rows else np.zeros(len(names))
+        return pd.DataFrame({
+            'Column': names,
+            'Missing Count': missing,
+            'Missing %': missing_percent,
+            'Data Type': [self.columns[col].dtype for col in names],
+            'Unique Values': [self.columns[col].distinct for col in names],
+            'Completeness': 100 - missing_percent,
+        })
+
+    def describe(self):
+        """The rows of DataFrame.describe() for the numeric columns"""
+        stats = {}
+        for col in self.numeric_columns:
+            profile = self.columns[col]
+            quartiles = profile.quantile([0.25, 0.5, 0.75])
+            stats[col] = [profile.count, profile.moments.mean if profile.count else np.nan,
+                          np.sqrt(profile.moments.variance), profile.digest.min, *quartiles, profile.digest.max]
+        return pd.DataFrame(stats, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+
+    def correlation(self):
+        return self.comoments.correlation().loc[self.numeric_columns, self.numeric_columns]
+
+    def top_values(self, col, n=10):
+        """Most frequent values of a column, or None if it has too many to count exactly"""
+        value_counts = self.columns[col].value_counts
+        if value_counts is None:
+            return None
+        return pd.Series(value_counts, dtype=np.int64).sort_values(ascending=False, kind='stable').head(n)
+
+    def skewness(self, col):
+        return self.columns[col].moments.skewness
+
+    def outliers(self, col):
+        """Number of values beyond 1.5 IQR of the quartiles (estimated for high-cardinality columns)"""
+        profile = self.columns[col]
+        q1, q3 = profile.quantile([0.25, 0.75])
+        iqr = q3 - q1
+        return profile.count_outside(q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+
+
+def profile_chunk(chunk):
+    """Profile of one chunk (runs in a worker process)"""
+    return DatasetProfile.from_frame(chunk)
+
+
+def profile_csv(csv_path, chunksize=DEFAULT_CHUNKSIZE, workers=None, progress=None):
+    """Profile a whole CSV in one chunked, parallel pass"""
+    profile = None
+    for partial in iter_chunks(csv_path, profile_chunk, chunksize, workers, progress):
+        profile = partial if profile is None else profile.merge(partial)
+    if profile is None:
+        return DatasetProfile.from_frame(pd.read_csv(csv_path))
+    return profile
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python frontend/profiler.py <file.csv>")
+        sys.exit(1)
+    profile = profile_csv(sys.argv[1])
+    print(f"{sys.argv[1]}: {profile.rows:,} rows, {profile.duplicates:,} duplicates")
+    print(profile.quality().to_string(index=False))
+    print(profile.describe().to_string())
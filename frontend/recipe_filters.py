@@ -0,0 +1,186 @@
+"""Recipe filters shared by the recipes view and the search API.
+
+A filter state is a plain dict in canonical form, which is also the key the
+filtered rows are cached under (see result_cache):
+
+    name           lowercased text search (see search_backend), '' for none
+    minutes        [low, high] cooking time bounds, or None
+    n_ingredients  [low, high] ingredient count bounds, or None
+    tags           sorted tags, matching recipes that carry any of them
+    nutrition      {column: [low, high]}, high None for no upper limit
+
+recipe_predicates() turns a state into filter_engine predicates, so every
+caller shares the same cached masks.
+"""
+import re
+
+import numpy as np
+
+from nutrition import range_mask
+from tag_categories import tag_label
+
+# Recipe category filters: (section title, multiselect label, summary icon, words, option -> tags).
+# The options listed here group related tags under one name; category_options() adds
+# every other tag of the file containing one of the section's words as an option of its own.
+CATEGORY_FILTERS = [
+    ("📋 Recipe Categories", "🍽️ Meal Types", "📋",
+     ['breakfast', 'brunch', 'lunch', 'dinner', 'main-dish', 'dessert', 'appetizer', 'snack',
+      'beverage', 'cocktail', 'side-dish', 'soup', 'salad'], {
+        "🌅 Breakfast": ['breakfast', 'brunch', 'breakfast-eggs'],
+        "🥪 Lunch": ['lunch', 'lunch-snacks'],
+        "🍽️ Dinner": ['main-dish', 'dinner-party'],
+        "🍰 Desserts": ['desserts', 'frozen-desserts'],
+        "🥨 Appetizers": ['appetizers', 'snacks'],
+        "🍹 Drinks": ['cocktails', 'beverages'],
+        "🥗 Side Dishes": ['side-dishes'],
+    }),
+    ("🌍 World Cuisines", "🌍 Select Cuisines", "🌍",
+     ['mexican', 'italian', 'american', 'chinese', 'indian', 'french', 'thai', 'japanese', 'spanish',
+      'asian', 'greek', 'german', 'mediterranean', 'middle-eastern', 'african', 'european', 'caribbean',
+      'korean', 'vietnamese', 'cajun', 'creole', 'irish', 'british', 'scottish', 'moroccan', 'brazilian',
+      'hawaiian', 'russian', 'polish', 'scandinavian', 'turkish', 'lebanese', 'cuban', 'filipino'], {
+        "🇲🇽 Mexican": ['mexican'],
+        "🇮🇹 Italian": ['italian'],
+        "🇺🇸 American": ['american', 'north-american'],
+        "🇨🇳 Chinese": ['chinese'],
+        "🇮🇳 Indian": ['indian'],
+        "🇫🇷 French": ['french'],
+        "🇹🇭 Thai": ['thai'],
+        "🇯🇵 Japanese": ['japanese'],
+        "🇪🇸 Spanish": ['spanish'],
+        "🌏 Asian": ['asian'],
+    }),
+    ("🥗 Diet & Health", "🥗 Dietary Preferences", "🥗",
+     ['vegetarian', 'vegan', 'healthy', 'low-', 'gluten-free', 'diabetic', 'dairy-free', 'egg-free',
+      'lactose', 'kosher', 'high-protein', 'high-fiber'], {
+        "🌱 Vegetarian": ['vegetarian'],
+        "🌿 Vegan": ['vegan'],
+        "💪 Healthy": ['healthy', 'healthy-2'],
+        "🔥 Low-Carb": ['low-carb', 'very-low-carbs'],
+        "🧈 Low-Fat": ['low-fat'],
+        "🧂 Low-Sodium": ['low-sodium'],
+        "❤️ Low-Cholesterol": ['low-cholesterol'],
+        "🍯 Diabetic": ['diabetic'],
+        "🌾 Gluten-Free": ['gluten-free'],
+    }),
+    ("👩‍🍳 Cooking Methods", "👩‍🍳 Cooking Style", "👩‍🍳",
+     ['crock-pot', 'slow-cooker', 'grilling', 'barbecue', 'oven', 'baking', 'stove-top', 'microwave',
+      'broil', 'deep-fry', 'no-cook', 'pressure-cooker', 'smoker', 'stir-fry', 'roast', 'steam'], {
+        "🥘 Slow Cooker": ['crock-pot-slow-cooker'],
+        "🔥 Grilling": ['grilling', 'barbecue'],
+        "🥧 Baking": ['oven', 'baking'],
+        "⚡ Quick & Easy": ['15-minutes-or-less', '30-minutes-or-less', 'easy'],
+        "🍳 Beginner": ['beginner-cook', '3-steps-or-less'],
+        "💰 Budget": ['inexpensive', '5-ingredients-or-less'],
+    }),
+    ("🎉 Special Occasions", "🎉 Occasions", "🎉",
+     ['christmas', 'halloween', 'thanksgiving', 'valentines', 'st-patricks', 'easter', '4th-of-july',
+      'new-years', 'birthday', 'party', 'holiday', 'wedding', 'hanukkah', 'passover', 'picnic', 'potluck'], {
+        "🎄 Christmas": ['christmas'],
+        "🎃 Halloween": ['halloween'],
+        "🦃 Thanksgiving": ['thanksgiving'],
+        "💕 Valentine's": ['valentines-day'],
+        "☘️ St Patrick's": ['st-patricks-day'],
+        "🐰 Easter": ['easter'],
+        "🎆 4th of July": ['4th-of-july'],
+        "🎊 New Year": ['new-years'],
+        "🎂 Birthday": ['birthday'],
+        "🥳 Party": ['dinner-party', 'party'],
+    }),
+    ("🌿 Seasonal", "🌿 Seasons", "🌿",
+     ['spring', 'summer', 'fall', 'autumn', 'winter'], {
+        "🌸 Spring": ['spring'],
+        "☀️ Summer": ['summer'],
+        "🍂 Fall": ['fall', 'autumn'],
+        "❄️ Winter": ['winter'],
+    }),
+    ("⭐ Difficulty Level", "⭐ Recipe Difficulty", "⭐",
+     ['beginner-cook', 'intermediate-cook', 'advanced', 'easy', 'minutes-or-less', 'hours-or-less',
+      'steps-or-less'], {
+        "👶 Beginner": ['beginner-cook', '3-steps-or-less', 'easy'],
+        "⚡ Quick (15 min)": ['15-minutes-or-less'],
+        "🕐 Medium (30 min)": ['30-minutes-or-less'],
+        "🕒 Long (60 min)": ['60-minutes-or-less'],
+        "👨‍🍳 Advanced": ['intermediate-cook', 'advanced'],
+    }),
+]
+
+
+def option_slug(option):
+    """ASCII name of a category option: "🇮🇹 Italian" -> "italian", "🕐 Medium (30 min)" -> "medium-30-min" """
+    return re.sub(r'[^a-z0-9]+', '-', option.split(' ', 1)[-1].lower()).strip('-')
+
+
+# Option slug -> tags; options sharing a name across sections ("beginner") are merged
+CATEGORY_TAGS = {}
+for _, _, _, _, options in CATEGORY_FILTERS:
+    for option, tags in options.items():
+        CATEGORY_TAGS.setdefault(option_slug(option), set()).update(tags)
+
+# Options grouping several tags, as sorted tuples: their recipe counts are unions, which
+# the tag statistics job counts exactly
+CATEGORY_GROUPS = sorted({tuple(sorted(set(tags))) for _, _, _, _, options in CATEGORY_FILTERS
+                          for tags in options.values() if len(set(tags)) > 1})
+
+
+def category_tags(slugs):
+    """Tags of the category options named by slugs; raises KeyError for an unknown slug"""
+    tags = set()
+    for slug in slugs:
+        tags |= CATEGORY_TAGS[slug]
+    return tags
+
+
+def category_options(tag_stats):
+    """CATEGORY_FILTERS populated and ordered from tag statistics (see tag_stats)
+
+    Returns (title, label, icon, {option: (tags, count)}) per section, options
+    by decreasing recipe count. Listed options that match no recipe are left
+    out, and every other tag of the file containing one of the section's
+    words becomes an option of its own.
+    """
+    sections = []
+    for title, label, icon, words, options in CATEGORY_FILTERS:
+        counted = {option: (tags, tag_stats.count_any(tags)) for option, tags in options.items()}
+        listed = {tag for tags in options.values() for tag in tags}
+        for tag in tag_stats.most_common(exclude=listed):
+            if any(word in tag for word in words):
+                counted[tag_label(tag)] = ([tag], tag_stats.count(tag))
+        ordered = sorted(((option, entry) for option, entry in counted.items() if entry[1] > 0),
+                         key=lambda item: -item[1][1])
+        sections.append((title, label, icon, dict(ordered)))
+    return sections
+
+
+def recipe_predicates(df, state, text_search, tag_index, nutrition):
+    """filter_engine predicates of a filter state over df
+
+    text_search (a search_backend recipe search), tag_index and nutrition
+    are zero-argument loaders, called only by the predicates whose masks
+    are not cached yet.
+    """
+    minutes = state.get('minutes')
+    n_ingredients = state.get('n_ingredients')
+    tags = state.get('tags') or []
+
+    def name_mask():
+        rows = text_search().matches(state['name'])
+        mask = np.zeros(len(df), dtype=bool)
+        mask[rows[rows < len(df)]] = True
+        return mask
+
+    predicates = [
+        ('name', state.get('name') or None, name_mask),
+        ('minutes', minutes,
+         lambda: ((df['minutes'] >= minutes[0]) & (df['minutes'] <= minutes[1])).to_numpy()),
+        ('n_ingredients', n_ingredients,
+         lambda: ((df['n_ingredients'] >= n_ingredients[0]) & (df['n_ingredients'] <= n_ingredients[1])).to_numpy()),
+        # Union of the selected tags' bitmaps, indexed by row position
+        ('tags', tags or None,
+         lambda: tag_index().any_mask(tags)[:len(df)]),
+    ]
+    for column, (low, high) in (state.get('nutrition') or {}).items():
+        predicates.append((f'nutrition:{column}', [low, high],
+                           lambda column=column, low=low, high=high:
+                           range_mask(nutrition(), column, low, high)[:len(df)]))
+    return predicates
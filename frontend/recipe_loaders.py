@@ -0,0 +1,47 @@
+"""Shared recipes frame and indexes, for the recipes view and the search API.
+
+Every loader goes through the process-wide dataset registry under the
+"recipes" kind, so the Streamlit app, the Django search API and the exports
+share one copy of the frame and of each index per version of the file, in
+whichever of them runs in the process.
+"""
+import numpy as np
+
+from bitmap_index import BitmapIndex
+from columnar_cache import load_dataset
+from dataset_registry import REGISTRY
+from nutrition import nutrition_matrix
+from sort_index import SortIndex
+from trigram_index import TrigramIndex
+
+
+def load_recipes(file_path, progress=None):
+    """Shared recipes frame with parsed list columns"""
+    return REGISTRY.get(file_path, "recipes", lambda path: load_dataset(path, progress=progress))
+
+
+def load_tag_index(file_path):
+    """Shared tag -> recipe bitmap index, built once per version of the recipes file"""
+    return REGISTRY.derived(file_path, "recipes", "tag_index", load_dataset,
+                            lambda df: BitmapIndex.load_or_build(file_path, df['tags'], "tags.npz"))
+
+
+def load_nutrition_matrix(file_path):
+    """Shared float32 (N, 7) nutrition matrix of the recipes file"""
+    return REGISTRY.derived(file_path, "recipes", "nutrition", load_dataset,
+                            lambda df: nutrition_matrix(df['nutrition']))
+
+
+def load_name_index(file_path):
+    """Shared trigram index over recipe names, persisted next to the columnar cache"""
+    return REGISTRY.derived(file_path, "recipes", "name_index", load_dataset,
+                            lambda df: TrigramIndex.load_or_build(file_path, df['name']))
+
+
+def load_sort_index(file_path, column, ascending):
+    """Shared permutation of the recipes by column, or in file order for column None"""
+    if column is None:
+        return REGISTRY.derived(file_path, "recipes", "sort:row", load_dataset,
+                                lambda df: SortIndex(np.arange(len(df), dtype=np.int64)))
+    return REGISTRY.derived(file_path, "recipes", f"sort:{column}:{ascending}", load_dataset,
+                            lambda df: SortIndex.build(df[column], ascending))
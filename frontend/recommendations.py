@@ -0,0 +1,76 @@
+""""People who liked this also liked" recipes from item-item similarities.
+
+The neighbours are computed offline over the whole interactions file by
+the collaborative-filtering job in backend/recommend.py. The job writes
+them to ``data/.cache/RAW_interactions.item_neighbors.npz`` as recipe ids,
+together with the size and mtime of the CSV they describe. AlsoLiked reads
+that artifact once and re-keys it by row of the recipes frame, so a
+recipe's recommendations are one row of an int32 array. It is None when
+the artifact is missing or stale.
+
+Refresh the neighbours with:
+
+    python backend/recommend.py data/RAW_interactions.csv
+"""
+import os
+
+import numpy as np
+
+from columnar_cache import artifact_path
+
+ARTIFACT_SUFFIX = "item_neighbors.npz"
+# Bump when the artifact layout changes; backend/recommend.py writes this version
+FORMAT_VERSION = 1
+
+
+def artifact_version(interactions_path):
+    """Size and mtime of the neighbours artifact, or None if it has not been built"""
+    try:
+        stat = os.stat(artifact_path(interactions_path, ARTIFACT_SUFFIX))
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class AlsoLiked:
+    """Most similar recipes of every recipe, as row positions of the recipes frame"""
+
+    def __init__(self, neighbors, scores):
+        # (rows, k): neighbour rows best first, padded with -1
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @classmethod
+    def load(cls, interactions_path, id_index, n_rows):
+        """Neighbours from the job's artifact mapped onto the indexed frame, or None if missing or stale"""
+        try:
+            with np.load(artifact_path(interactions_path, ARTIFACT_SUFFIX)) as data:
+                artifact = {name: data[name] for name in data.files}
+            stat = os.stat(interactions_path)
+        except (OSError, ValueError):
+            return None
+        if artifact.get('format_version') != FORMAT_VERSION:
+            return None
+        if (artifact['source_size'], artifact['source_mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            return None
+
+        # Recipes rated but missing from the frame map to -1 and are left out
+        item_rows = id_index.lookup(artifact['item_ids'])
+        neighbor_rows = id_index.lookup(artifact['neighbors'].ravel()).reshape(artifact['neighbors'].shape)
+        known = item_rows >= 0
+        k = neighbor_rows.shape[1]
+        neighbors = np.full((n_rows, k), -1, dtype=np.int32)
+        scores = np.zeros((n_rows, k), dtype=np.float32)
+        neighbors[item_rows[known]] = neighbor_rows[known]
+        scores[item_rows[known]] = artifact['scores'][known]
+        return cls(neighbors, scores)
+
+    @property
+    def nbytes(self):
+        return self.neighbors.nbytes + self.scores.nbytes
+
+    def lookup(self, row, n=None):
+        """(rows, scores) of the recipes most similar to a row, best first"""
+        rows = self.neighbors[row, :n]
+        found = rows >= 0
+        return rows[found], self.scores[row, :n][found]
@@ -0,0 +1,188 @@
+"""Memoized filter results shared by every session.
+
+The output of a filter pipeline is stored as an array of row positions,
+keyed by a canonical hash of the filter state and the version of the
+dataset it was computed from (dataset_version: the file's absolute path
+and source signature). A changed file therefore never serves stale
+results, and two files never share results; old entries simply stop being
+requested and age out.
+
+There are two tiers: an in-memory LRU bounded by a byte budget and, when
+FOODCOM_RESULT_CACHE_DIR is set, an on-disk tier of ``.npy`` files that
+survives restarts. Hit and miss counters are kept for sizing both budgets.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from columnar_cache import source_signature
+
+# Budgets in MB (override with FOODCOM_RESULT_CACHE_MB / FOODCOM_RESULT_DISK_MB)
+DEFAULT_MEMORY_MB = 64
+DEFAULT_DISK_MB = 512
+# A prune brings the disk tier down to this share of its budget, so it runs once per many writes
+DISK_PRUNE_TARGET = 0.9
+
+
+def dataset_version(path):
+    """Version of a dataset file for cache keys: its absolute path and the size and mtime of its contents"""
+    return [os.path.abspath(path), source_signature(path)]
+
+
+def state_key(namespace, version, state):
+    """Canonical hash of a filter state for one version of a dataset
+
+    The state must already be normalized (sorted selections, no defaults);
+    dict key order does not matter.
+    """
+    payload = json.dumps([namespace, version, state], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Two-tier LRU of row-position arrays keyed by state_key"""
+
+    def __init__(self, budget_bytes, disk_dir=None, disk_budget_bytes=0):
+        self.budget_bytes = budget_bytes
+        self.disk_dir = disk_dir
+        self.disk_budget_bytes = disk_budget_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0}
+        # Bytes in disk_dir as of the last scan plus this process's writes since; None before the first scan
+        self._disk_nbytes = None
+        self._disk_lock = threading.Lock()
+
+    def rows(self, namespace, version, state, compute):
+        """Cached result for state, calling compute() on a miss"""
+        key = state_key(namespace, version, state)
+        rows = self.get(key)
+        if rows is None:
+            rows = np.asarray(compute())
+            self.put(key, rows)
+        return rows
+
+    def get(self, key):
+        """Row positions stored under key, or None"""
+        with self._lock:
+            rows = self._entries.get(key)
+            if rows is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return rows
+
+        rows = self._read_disk(key)
+        with self._lock:
+            if rows is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._remember(key, rows)
+        return rows
+
+    def put(self, key, rows):
+        """Store a result in memory and, if enabled, on disk"""
+        # Results are shared between sessions
+        rows.setflags(write=False)
+        with self._lock:
+            self._remember(key, rows)
+        self._write_disk(key, rows)
+
+    def stats(self):
+        """Counters and sizes for display and sizing"""
+        with self._lock:
+            lookups = sum(self._counters.values())
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                bytes=self._nbytes,
+                budget_bytes=self.budget_bytes,
+                hit_rate=(self._counters["hits"] + self._counters["disk_hits"]) / lookups if lookups else 0.0,
+            )
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is keyed by version and ages out)"""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _remember(self, key, rows):
+        if key in self._entries:
+            self._nbytes -= self._entries.pop(key).nbytes
+        if rows.nbytes > self.budget_bytes:
+            return
+        self._entries[key] = rows
+        self._nbytes += rows.nbytes
+        while self._nbytes > self.budget_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key + ".npy")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            rows = np.load(path)
+            # Refresh the mtime so pruning drops the least recently used files
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        rows.setflags(write=False)
+        return rows
+
+    def _write_disk(self, key, rows):
+        if not self.disk_dir:
+            return
+        os.makedirs(self.disk_dir, exist_ok=True)
+        tmp_path = f"{self._disk_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, rows)
+        path = self._disk_path(key)
+        try:
+            replaced = os.stat(path).st_size
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        written = os.stat(path).st_size
+
+        with self._disk_lock:
+            if self._disk_nbytes is not None:
+                self._disk_nbytes += written - replaced
+            # Only list the directory when it may be over budget
+            if self._disk_nbytes is None or self._disk_nbytes > self.disk_budget_bytes:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """Resync the disk total with a scan and, if over budget, drop the least recently used files"""
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".npy"):
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        if total > self.disk_budget_bytes:
+            target = self.disk_budget_bytes * DISK_PRUNE_TARGET
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+        self._disk_nbytes = total
+
+
+RESULT_CACHE = ResultCache(
+    int(os.environ.get("FOODCOM_RESULT_CACHE_MB", DEFAULT_MEMORY_MB)) * 1024 * 1024,
+    disk_dir=os.environ.get("FOODCOM_RESULT_CACHE_DIR") or None,
+    disk_budget_bytes=int(os.environ.get("FOODCOM_RESULT_DISK_MB", DEFAULT_DISK_MB)) * 1024 * 1024,
+)
@@ -0,0 +1,70 @@
+"""Review filters shared by the reviews view and the export API.
+
+A filter state is a plain dict in canonical form, which is also the key the
+filtered rows are cached under (see result_cache):
+
+    ratings     sorted ratings to keep, [] for all
+    dates       [first, last] ISO dates (either may be None), or None
+    min_length  minimum review length in characters, or None
+    search      lowercased text search (see search_backend), '' for none
+
+review_predicates() turns a state into filter_engine predicates, so every
+caller shares the same cached masks.
+"""
+import numpy as np
+import pandas as pd
+
+from columnar_cache import load_dataset
+
+
+def read_reviews(file_path, progress=None):
+    """Read reviews and add the derived columns used by the filters"""
+    df = load_dataset(file_path, progress=progress)
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    if 'review' in df.columns:
+        df['review_length'] = df['review'].astype(str).str.len()
+    return df
+
+
+def review_predicates(df, state, text_search):
+    """filter_engine predicates of a filter state over a read_reviews frame
+
+    text_search is a zero-argument loader of a search_backend review
+    search, called only when the search mask is not cached yet; queries it
+    cannot answer (BM25 with stopwords only) match the raw text instead.
+    """
+    ratings = state.get('ratings') or []
+    dates = state.get('dates')
+    min_length = state.get('min_length')
+    search = state.get('search') or ''
+
+    def date_mask():
+        mask = np.ones(len(df), dtype=bool)
+        if dates[0] is not None:
+            mask &= (df['date'] >= pd.Timestamp(dates[0])).to_numpy()
+        if dates[1] is not None:
+            mask &= (df['date'] <= pd.Timestamp(dates[1])).to_numpy()
+        return mask
+
+    def search_mask():
+        backend = text_search()
+        if backend.accepts(search):
+            # Reviews containing every query term
+            rows = backend.matches(search)
+            mask = np.zeros(len(df), dtype=bool)
+            mask[rows[rows < len(df)]] = True
+            return mask
+        return df['review'].str.contains(search, case=False, na=False, regex=False).to_numpy()
+
+    return [
+        ('rating', ratings or None,
+         lambda: df['rating'].isin(ratings).to_numpy()),
+        ('date', dates,
+         date_mask),
+        ('min_length', min_length,
+         lambda: (df['review_length'] >= min_length).to_numpy()),
+        # Both search paths are case-insensitive
+        ('search', search or None,
+         search_mask),
+    ]
@@ -0,0 +1,37 @@
+"""Shared reviews frame and indexes, for the reviews view and the exports.
+
+As recipe_loaders does for recipes, every loader goes through the
+process-wide dataset registry under the "reviews" kind, so the Streamlit
+app and the Django export endpoint share one copy of the frame and of each
+index per version of the file.
+"""
+from dataset_registry import REGISTRY
+from review_filters import read_reviews
+from review_search import BM25Index
+from search_backend import SEARCH_BACKEND, ReviewSearch, sqlite_review_search
+from sort_index import SortIndex
+
+
+def load_reviews(file_path, progress=None):
+    """Shared reviews frame with parsed dates and review lengths"""
+    return REGISTRY.get(file_path, "reviews", lambda path: read_reviews(path, progress))
+
+
+def load_review_index(file_path):
+    """Shared BM25 index over review text, persisted next to the columnar cache"""
+    return REGISTRY.derived(file_path, "reviews", "bm25", read_reviews,
+                            lambda df: BM25Index.load_or_build(file_path, df['review']))
+
+
+def load_review_search(file_path):
+    """Review text search with the configured backend (see search_backend)"""
+    if SEARCH_BACKEND == "sqlite":
+        return REGISTRY.derived(file_path, "reviews", "fts", read_reviews,
+                                lambda df: sqlite_review_search(df['user_id'], df['recipe_id']))
+    return ReviewSearch(load_review_index(file_path), load_reviews(file_path)['review'])
+
+
+def load_review_sort_index(file_path, column, ascending):
+    """Shared sort permutation of one review column, computed once per version of the file"""
+    return REGISTRY.derived(file_path, "reviews", f"sort:{column}:{ascending}", read_reviews,
+                            lambda df: SortIndex.build(df[column], ascending))
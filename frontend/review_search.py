@@ -0,0 +1,210 @@
+"""BM25 full-text index over review text.
+
+Reviews are tokenized with Arrow compute kernels (lowercase, split on
+anything that is not a letter or digit, drop stopwords and one-letter
+tokens) and turned into an inverted index: for every term, the sorted
+review positions that contain it and the term frequency in each.
+
+On disk (``*.bm25.npz`` next to the columnar cache) the postings are three
+flat arrays (uint32 review positions, uint8 term frequencies, int64
+offsets per term), plus uint16 review lengths. Queries score only the
+postings of their own terms, so latency depends on how common the query
+terms are, not on the number of reviews.
+
+Build the index ahead of time with:
+
+    python frontend/review_search.py data/RAW_interactions.csv
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from columnar_cache import artifact_path, cache_dir_for, is_artifact_fresh, load_dataset, mark_artifact_fresh
+
+ARTIFACT_SUFFIX = "bm25.npz"
+BUILD_BLOCK_ROWS = 100000
+
+# Standard BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by
+can could did do does doing don down during each few for from further had has have having he
+her here hers him his how i if in into is it its just me more most my no nor not of off on
+once only or other our out over own same she should so some such than that the their them
+then there these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your yours
+""".split())
+
+
+def tokenize(texts):
+    """Arrow list array of index tokens for each text"""
+    texts = pa.array(pd.Series(texts, dtype=object).where(pd.notna(texts), ''), type=pa.string())
+    return pc.split_pattern_regex(pc.utf8_lower(texts), r"[^\p{L}\p{N}]+")
+
+
+def _flat_tokens(token_lists):
+    """Flatten token lists into (tokens, parent positions), dropping stopwords and short tokens"""
+    tokens = pc.list_flatten(token_lists)
+    parents = pc.list_parent_indices(token_lists)
+    keep = pc.and_(
+        pc.greater(pc.utf8_length(tokens), 1),
+        pc.invert(pc.is_in(tokens, value_set=pa.array(sorted(STOPWORDS)))),
+    )
+    return pc.filter(tokens, keep), pc.filter(parents, keep).to_numpy()
+
+
+def query_terms(query):
+    """Distinct index terms of a query string"""
+    tokens, _ = _flat_tokens(tokenize([query]))
+    return list(dict.fromkeys(tokens.to_pylist()))
+
+
+class BM25Index:
+    """Inverted index with BM25 scoring over a column of texts"""
+
+    def __init__(self, vocabulary, offsets, docs, freqs, doc_lengths):
+        self.vocabulary = vocabulary
+        self.term_ids = {term: i for i, term in enumerate(vocabulary)}
+        self.offsets = offsets
+        self.docs = docs
+        self.freqs = freqs
+        self.doc_lengths = doc_lengths
+        self.n_docs = len(doc_lengths)
+        avg_length = float(doc_lengths.mean()) if self.n_docs else 1.0
+        # Per-review length normalization, the only part of BM25 that is not per query
+        self._norm = (K1 * (1 - B + B * doc_lengths / max(avg_length, 1e-9))).astype(np.float32)
+
+    @classmethod
+    def build(cls, texts, block_rows=BUILD_BLOCK_ROWS):
+        """Build the index block by block so token arrays stay bounded"""
+        texts = pd.Series(texts).reset_index(drop=True)
+        vocabulary = {}
+        term_parts, doc_parts, freq_parts, length_parts = [], [], [], []
+
+        for start in range(0, len(texts), block_rows):
+            block = texts.iloc[start:start + block_rows]
+            tokens, parents = _flat_tokens(tokenize(block))
+            length_parts.append(np.bincount(parents, minlength=len(block)))
+
+            # Map the block's own dictionary onto the global vocabulary
+            encoded = pc.dictionary_encode(tokens)
+            block_terms = encoded.dictionary.to_pylist()
+            remap = np.array([vocabulary.setdefault(term, len(vocabulary)) for term in block_terms],
+                             dtype=np.int64)
+            term_ids = remap[encoded.indices.to_numpy()]
+
+            # One posting per (term, review) with its frequency
+            keys, counts = np.unique(term_ids * len(block) + parents, return_counts=True)
+            term_parts.append((keys // len(block)).astype(np.int32))
+            doc_parts.append((keys % len(block) + start).astype(np.uint32))
+            freq_parts.append(np.minimum(counts, 255).astype(np.uint8))
+
+        terms = np.concatenate(term_parts) if term_parts else np.empty(0, dtype=np.int32)
+        docs = np.concatenate(doc_parts) if doc_parts else np.empty(0, dtype=np.uint32)
+        freqs = np.concatenate(freq_parts) if freq_parts else np.empty(0, dtype=np.uint8)
+        # Blocks are in review order, so a stable sort by term keeps each posting list sorted
+        order = np.argsort(terms, kind='stable')
+        offsets = np.searchsorted(terms[order], np.arange(len(vocabulary) + 1)).astype(np.int64)
+        lengths = np.concatenate(length_parts) if length_parts else np.empty(0)
+        return cls(
+            np.array(list(vocabulary), dtype=object),
+            offsets,
+            docs[order],
+            freqs[order],
+            np.minimum(lengths, np.iinfo(np.uint16).max).astype(np.uint16),
+        )
+
+    @classmethod
+    def load_or_build(cls, csv_path, texts):
+        """Load the persisted index for csv_path, rebuilding it if the CSV changed"""
+        path = artifact_path(csv_path, ARTIFACT_SUFFIX)
+        if is_artifact_fresh(csv_path, ARTIFACT_SUFFIX):
+            with np.load(path) as data:
+                vocabulary = data['vocabulary'].tobytes().decode('utf-8')
+                vocabulary = np.array(vocabulary.split('\n') if vocabulary else [], dtype=object)
+                return cls(vocabulary, data['offsets'], data['docs'], data['freqs'], data['doc_lengths'])
+
+        index = cls.build(texts)
+        os.makedirs(cache_dir_for(csv_path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        # Terms never contain whitespace, so the vocabulary is stored as one newline-joined blob
+        vocabulary = np.frombuffer('\n'.join(index.vocabulary).encode('utf-8'), dtype=np.uint8)
+        np.savez(tmp_path, vocabulary=vocabulary, offsets=index.offsets,
+                 docs=index.docs, freqs=index.freqs, doc_lengths=index.doc_lengths)
+        os.replace(tmp_path, path)
+        mark_artifact_fresh(csv_path, ARTIFACT_SUFFIX)
+        return index
+
+    @property
+    def nbytes(self):
+        # The term strings are shared by the vocabulary array and the term_ids dict
+        vocabulary = self.vocabulary.nbytes + sum(sys.getsizeof(term) for term in self.vocabulary)
+        return (vocabulary + sys.getsizeof(self.term_ids) + self.offsets.nbytes + self.docs.nbytes
+                + self.freqs.nbytes + self.doc_lengths.nbytes)
+
+    def _postings(self, term):
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return None
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.docs[start:end], self.freqs[start:end]
+
+    def score(self, query, require_all=True):
+        """Positions of matching reviews (ascending) and their BM25 scores
+
+        With require_all, a review must contain every query term (stopwords
+        are ignored); otherwise any term is enough.
+        """
+        postings = [self._postings(term) for term in query_terms(query)]
+        if require_all and any(p is None for p in postings):
+            postings = []
+        postings = [p for p in postings if p is not None]
+        if not postings:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        doc_parts, score_parts = [], []
+        for docs, freqs in postings:
+            idf = np.float32(np.log(1 + (self.n_docs - len(docs) + 0.5) / (len(docs) + 0.5)))
+            tf = freqs.astype(np.float32)
+            doc_parts.append(docs)
+            score_parts.append(idf * tf * (K1 + 1) / (tf + self._norm[docs]))
+
+        if len(postings) == 1:
+            return doc_parts[0].astype(np.int64), score_parts[0]
+        # Dense accumulators: a few MB per query, but no sort of the postings
+        docs = np.concatenate(doc_parts)
+        hits = np.bincount(docs, minlength=self.n_docs)
+        totals = np.bincount(docs, weights=np.concatenate(score_parts), minlength=self.n_docs)
+        matched = np.flatnonzero(hits == len(postings) if require_all else hits > 0)
+        return matched, totals[matched].astype(np.float32)
+
+    def search(self, query, require_all=True):
+        """Positions of matching reviews and their BM25 scores, best first"""
+        docs, scores = self.score(query, require_all)
+        order = np.argsort(-scores, kind='stable')
+        return docs[order], scores[order]
+
+    def top_k(self, query, k=10, require_all=False):
+        """The k best-scoring review positions for a query, best first"""
+        docs, scores = self.score(query, require_all)
+        if len(scores) > k:
+            best = np.argpartition(-scores, k)[:k]
+            docs, scores = docs[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        return docs[order], scores[order]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python frontend/review_search.py <RAW_interactions.csv>")
+        sys.exit(1)
+    csv_path = sys.argv[1]
+    index = BM25Index.load_or_build(csv_path, load_dataset(csv_path, columns=['review'])['review'])
+    print(f"{csv_path}: {index.n_docs:,} reviews, {len(index.vocabulary):,} terms, "
+          f"{len(index.docs):,} postings -> {artifact_path(csv_path, ARTIFACT_SUFFIX)}")
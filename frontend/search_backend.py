@@ -0,0 +1,286 @@
+"""Text search backends for the recipes and reviews views.
+
+Both views search through one small interface, so where the matches come
+from can change without touching the filters:
+
+    accepts(query)         whether the backend can answer query at all
+    matches(query)         row positions matching query, ascending
+    ranked(query)          (row positions, scores) of the matches, best first
+    snippets(query, rows)  highlighted excerpt (markdown bold) of each row
+
+"index" (the default) answers from the in-memory indexes the app already
+shares: recipe names through the trigram index (substring match), review
+text through the BM25 index. "sqlite" queries the FTS5 tables that
+import_foodcom fills in the Django database: recipes are matched on name,
+description and ingredients, reviews on their text, every word of the
+query is required and words are stemmed. It keeps no index in the app's
+memory, but only answers for the rows in the database: those loaded by
+import_foodcom, kept in step with later ORM edits by triggers.
+
+FTS5 rowids are database ids. Recipes map back to frame rows through the
+recipe id index, interactions by their (user_id, recipe_id) pair, so any
+reviews file is served the rows it shares with the database. The
+interaction ids and their pairs are read once and read again whenever the
+database changes (search_db_version).
+
+Choose the backend with FOODCOM_SEARCH_BACKEND=index|sqlite and the
+database with FOODCOM_SEARCH_DB (default: db.sqlite3 at the repository root).
+"""
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pyarrow.compute as pc
+
+from columnar_cache import source_signature
+from id_index import IdIndex
+from result_cache import dataset_version
+from review_search import query_terms
+
+BACKENDS = ('index', 'sqlite')
+SEARCH_BACKEND = os.environ.get('FOODCOM_SEARCH_BACKEND', 'index')
+SEARCH_DB = os.environ.get('FOODCOM_SEARCH_DB', str(Path(__file__).resolve().parent.parent / 'db.sqlite3'))
+
+# Tables created by the users app's 0002 migration
+RECIPE_FTS_TABLE = 'users_recipe_fts'
+REVIEW_FTS_TABLE = 'users_interaction_fts'
+# bm25() weight of the name, description and ingredients columns
+RECIPE_FTS_WEIGHTS = (10.0, 1.0, 2.0)
+
+# Interactions read per query when mapping interaction ids to frame rows
+ID_BATCH_ROWS = 100000
+
+SNIPPET_TOKENS = 24
+SNIPPET_CHARS = 160
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def search_db_version(db_path=SEARCH_DB):
+    """Size and mtime of the search database, None if there is none"""
+    return source_signature(db_path) if os.path.exists(db_path) else None
+
+
+def search_version(file_path):
+    """Cache version of results that may involve a text search over file_path
+
+    The dataset_version of the file, plus the search database's version with
+    the "sqlite" backend: its matches change with every import or edit.
+    """
+    version = dataset_version(file_path)
+    if SEARCH_BACKEND == 'sqlite':
+        version.append(search_db_version(SEARCH_DB))
+    return version
+
+
+def pair_keys(user_ids, recipe_ids):
+    """One int64 key per (user_id, recipe_id) pair"""
+    return (np.asarray(user_ids, dtype=np.int64) << 32) | np.asarray(recipe_ids, dtype=np.int64)
+
+
+def highlight(text, terms, width=SNIPPET_CHARS):
+    """Excerpt of text around the first occurrence of any term, every occurrence in bold"""
+    if not isinstance(text, str):
+        return ''
+    terms = sorted({term for term in terms if term}, key=len, reverse=True)
+    if not terms:
+        return text[:width]
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    first = pattern.search(text)
+    start = 0 if first is None else max(first.start() - width // 3, 0)
+    end = start + width
+    excerpt = pattern.sub(lambda match: f"**{match.group(0)}**", text[start:end])
+    return ('…' if start > 0 else '') + excerpt + ('…' if end < len(text) else '')
+
+
+def fts_query(query):
+    """FTS5 query requiring every word of query, '' if it has no words"""
+    # Each word quoted, so FTS5 operators and punctuation in user input are plain text
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', query.lower()))
+
+
+class NameSearch:
+    """Substring search over recipe names with the trigram index"""
+
+    def __init__(self, name_index, names=None):
+        self.name_index = name_index
+        # Original-case names for snippets; matching uses the index's lowercased copy
+        self.names = names
+
+    def accepts(self, query):
+        return bool(query)
+
+    def matches(self, query):
+        return self.name_index.search(query).astype(np.int64)
+
+    def ranked(self, query):
+        """Matches by the share of the name the query covers, so exact names come first"""
+        rows = self.matches(query)
+        lengths = pc.utf8_length(self.name_index.names.take(rows)).to_numpy(zero_copy_only=False)
+        scores = (len(query) / np.maximum(lengths, 1)).astype(np.float32)
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order]
+
+    def snippets(self, query, rows):
+        names = self.names if self.names is not None else self.name_index.names.to_pandas()
+        return [highlight(names.iloc[row], [query]) for row in rows]
+
+
+class ReviewSearch:
+    """BM25 search over review text with the in-memory inverted index"""
+
+    def __init__(self, review_index, texts):
+        self.review_index = review_index
+        self.texts = texts
+
+    def accepts(self, query):
+        # BM25 needs at least one indexed term: stopword-only queries are left to the caller
+        return bool(query_terms(query))
+
+    def matches(self, query):
+        return self.review_index.score(query)[0]
+
+    def ranked(self, query):
+        return self.review_index.search(query)
+
+    def snippets(self, query, rows):
+        terms = query_terms(query)
+        return [highlight(self.texts.iloc[row], terms) for row in rows]
+
+
+class FTSSearch:
+    """Search over one FTS5 table of the Django database"""
+
+    def __init__(self, db_path, table, to_rows, to_rowids, weights=()):
+        self.db_path = db_path
+        self.table = table
+        # rowids -> frame row positions (-1 where unknown), and back
+        self.to_rows = to_rows
+        self.to_rowids = to_rowids
+        self.weights = weights
+
+    def _execute(self, sql, params):
+        # One read-only connection per query: Streamlit runs sessions on several threads
+        uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+        with closing(sqlite3.connect(uri, uri=True)) as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def _rows(self, rowids):
+        rows = self.to_rows(np.asarray(rowids, dtype=np.int64))
+        return rows >= 0, rows
+
+    def accepts(self, query):
+        return bool(fts_query(query))
+
+    def matches(self, query):
+        match = fts_query(query)
+        if not match:
+            return _EMPTY
+        result = self._execute(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH ?", (match,))
+        found, rows = self._rows([rowid for rowid, in result])
+        # Several rowids may map to one row
+        return np.unique(rows[found])
+
+    def ranked(self, query):
+        match = fts_query(query)
+        if not match:
+            return _EMPTY, np.empty(0, dtype=np.float32)
+        rank = f"bm25({', '.join([self.table, *map(str, self.weights)])})"
+        result = self._execute(
+            f"SELECT rowid, {rank} FROM {self.table} WHERE {self.table} MATCH ? ORDER BY 2, 1", (match,))
+        found, rows = self._rows([rowid for rowid, _ in result])
+        # bm25() is lower for better matches
+        scores = -np.array([score for _, score in result], dtype=np.float32)
+        rows, scores = rows[found], scores[found]
+        # The best match of each row
+        first = np.sort(np.unique(rows, return_index=True)[1])
+        return rows[first], scores[first]
+
+    def snippets(self, query, rows):
+        match = fts_query(query)
+        rowids = [int(rowid) for rowid in self.to_rowids(np.asarray(rows, dtype=np.int64))]
+        if not match or not rowids:
+            return [''] * len(rowids)
+        # Only the shown rows are excerpted
+        result = dict(self._execute(
+            f"SELECT rowid, snippet({self.table}, -1, '**', '**', '…', {SNIPPET_TOKENS}) "
+            f"FROM {self.table} WHERE {self.table} MATCH ? AND rowid IN ({', '.join('?' * len(rowids))})",
+            (match, *rowids)))
+        return [result.get(rowid, '') for rowid in rowids]
+
+
+def sqlite_recipe_search(id_index, ids, db_path=SEARCH_DB):
+    """FTS5 recipe search; ids is the recipe id of every frame row"""
+    return FTSSearch(db_path, RECIPE_FTS_TABLE, id_index.lookup, lambda rows: ids[rows], RECIPE_FTS_WEIGHTS)
+
+
+class ReviewFTSSearch(FTSSearch):
+    """FTS5 review search over a reviews frame, whose rows are matched to interactions by (user_id, recipe_id)"""
+
+    def __init__(self, db_path, user_ids, recipe_ids):
+        super().__init__(db_path, REVIEW_FTS_TABLE, self._to_rows, self._to_rowids)
+        self.keys = pair_keys(user_ids, recipe_ids)
+        self._lock = threading.Lock()
+        self._mapping = self._read_mapping()
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + sum(array.nbytes for array in self._mapping[1:])
+
+    def _read_mapping(self):
+        """(database version, frame row of each interaction id, interaction id of each frame row), -1 where none"""
+        version = search_db_version(self.db_path)
+        ids, pairs = [], []
+        last = 0
+        while True:
+            batch = self._execute("SELECT id, user_id, recipe_id FROM users_interaction WHERE id > ? ORDER BY id LIMIT ?",
+                                  (last, ID_BATCH_ROWS))
+            if not batch:
+                break
+            batch = np.array(batch, dtype=np.int64)
+            ids.append(batch[:, 0])
+            pairs.append(pair_keys(batch[:, 1], batch[:, 2]))
+            last = int(batch[-1, 0])
+        ids = np.concatenate(ids) if ids else _EMPTY
+        pairs = np.concatenate(pairs) if pairs else _EMPTY
+
+        # import_foodcom stores CSV row i under id i + 1: that row is taken first, which also
+        # tells apart interactions sharing a pair. Any other file is matched on the pair alone.
+        n_rows = len(self.keys)
+        positions = ids - 1
+        same = (positions >= 0) & (positions < n_rows)
+        same[same] = self.keys[positions[same]] == pairs[same]
+        rows = np.where(same, positions, IdIndex.build(self.keys).lookup(pairs))
+
+        rows_by_id = np.full(int(ids.max()) + 1 if len(ids) else 0, -1, dtype=np.int64)
+        rows_by_id[ids] = rows
+        ids_by_row = np.full(n_rows, -1, dtype=np.int64)
+        by_pair = (rows >= 0) & ~same
+        ids_by_row[rows[by_pair]] = ids[by_pair]
+        ids_by_row[rows[same]] = ids[same]
+        return version, rows_by_id, ids_by_row
+
+    def mapping(self):
+        """(frame row of each interaction id, interaction id of each frame row) for the current database"""
+        with self._lock:
+            if self._mapping[0] != search_db_version(self.db_path):
+                self._mapping = self._read_mapping()
+            return self._mapping[1:]
+
+    def _to_rows(self, rowids):
+        rows_by_id, _ = self.mapping()
+        if len(rows_by_id) == 0:
+            return np.full(rowids.shape, -1, dtype=np.int64)
+        return np.where(rowids < len(rows_by_id), rows_by_id[np.minimum(rowids, len(rows_by_id) - 1)], -1)
+
+    def _to_rowids(self, rows):
+        return self.mapping()[1][rows]
+
+
+def sqlite_review_search(user_ids, recipe_ids, db_path=SEARCH_DB):
+    """FTS5 review search; user_ids and recipe_ids are those of every frame row"""
+    return ReviewFTSSearch(db_path, user_ids, recipe_ids)
@@ -0,0 +1,80 @@
+"""Precomputed sort orders for paging through large frames.
+
+A SortIndex holds the argsort permutation of one sort key, computed once
+per dataset version. A filtered, sorted view is then the permutation
+restricted to a boolean filter mask, which is a gather and never a sort, and
+a page is a slice of that view.
+
+For cursor (keyset) pagination, page_after scans the permutation forward
+from a cursor in blocks and stops as soon as the page is full, so fetching
+the next page does not depend on how many rows match in total.
+"""
+import numpy as np
+import pandas as pd
+
+SCAN_BLOCK = 65536
+
+
+def sort_keys(values):
+    """Sortable numeric keys of a column and its missing-value mask"""
+    values = pd.Series(values)
+    missing = values.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(values):
+        keys = values.to_numpy(dtype='datetime64[ns]').view(np.int64).copy()
+    else:
+        keys = values.to_numpy(dtype=np.float64, na_value=0).copy()
+    keys[missing] = 0
+    return keys, missing
+
+
+class SortIndex:
+    """Row positions of a frame in the order of one sort key"""
+
+    def __init__(self, permutation):
+        self.permutation = permutation
+
+    @classmethod
+    def build(cls, values, ascending=True):
+        """Stable argsort of values; missing values always sort last"""
+        keys, missing = sort_keys(values)
+        if not ascending:
+            keys = -keys
+        # lexsort is stable and sorts by the last key first
+        return cls(np.lexsort((keys, missing)).astype(np.int64))
+
+    @property
+    def nbytes(self):
+        return self.permutation.nbytes
+
+    def order(self, mask=None):
+        """Row positions in sorted order, restricted to rows where mask is True"""
+        if mask is None:
+            return self.permutation
+        return self.permutation[mask[self.permutation]]
+
+    def page(self, mask, offset, limit):
+        """Rows offset..offset+limit of the filtered, sorted view"""
+        return self.order(mask)[offset:offset + limit]
+
+    def page_after(self, mask, cursor=0, limit=25, block=SCAN_BLOCK):
+        """Up to limit matching rows at or after the cursor rank, and the cursor of the next page
+
+        The cursor is a rank in the permutation; the next cursor is None when
+        the view is exhausted.
+        """
+        rows = []
+        found = 0
+        rank = cursor
+        while rank < len(self.permutation) and found < limit:
+            chunk = self.permutation[rank:rank + block]
+            hits = np.flatnonzero(mask[chunk]) if mask is not None else np.arange(len(chunk))
+            hits = hits[:limit - found]
+            rows.append(chunk[hits])
+            found += len(hits)
+            if found == limit and len(hits):
+                rank += int(hits[-1]) + 1
+                break
+            rank += len(chunk)
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        next_cursor = rank if rank < len(self.permutation) and found == limit else None
+        return rows, next_cursor
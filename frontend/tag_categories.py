@@ -0,0 +1,86 @@
+"""Per-recipe breakdown of tags into display categories.
+
+The recipe cards group tags into cuisine, diet, method and occasion by
+keyword substrings. Matching is done once per distinct tag (a few hundred)
+instead of once per tag of every rendered recipe: each tag gets a category
+code, and every recipe's tag ids are stored sorted by category, so a
+card's breakdown is a slice of an integer array and no string is touched
+while rendering.
+
+The layout is CSR-like: offsets[row]:offsets[row + 1] delimits a row's tag
+ids in tag_ids, sorted by category and, within a category, in the order
+the recipe lists them.
+"""
+import numpy as np
+import pandas as pd
+
+from bitmap_index import explode_positions
+
+# Categories in matching order: a tag belongs to the first one with a keyword in it
+CATEGORY_KEYWORDS = [
+    ('cuisine', ['mexican', 'italian', 'american', 'chinese', 'indian',
+                 'french', 'thai', 'japanese', 'spanish', 'asian']),
+    ('diet', ['vegetarian', 'vegan', 'healthy', 'low-carb', 'low-fat',
+              'low-sodium', 'diabetic', 'gluten-free']),
+    ('method', ['easy', 'quick', 'slow-cooker', 'oven', 'grilling',
+                'baking', 'beginner-cook']),
+    ('occasion', ['christmas', 'halloween', 'thanksgiving', 'party',
+                  'birthday', 'holiday']),
+]
+CATEGORIES = [name for name, _ in CATEGORY_KEYWORDS] + ['other']
+OTHER = len(CATEGORY_KEYWORDS)
+
+# Structural tags left out of the "other" group
+HIDDEN_TAGS = {'preparation', 'time-to-make', 'course', 'main-ingredient'}
+
+
+def classify_tag(tag):
+    """Category code of a tag (OTHER if no keyword matches)"""
+    tag_lower = tag.lower()
+    for code, (_, keywords) in enumerate(CATEGORY_KEYWORDS):
+        if any(keyword in tag_lower for keyword in keywords):
+            return code
+    return OTHER
+
+
+def tag_label(tag):
+    """Display form of a tag"""
+    return tag.replace('-', ' ').title()
+
+
+class TagCategories:
+    """Tags of every recipe, grouped by display category"""
+
+    def __init__(self, labels, categories, hidden, offsets, tag_ids):
+        # Per distinct tag
+        self.labels = labels
+        self.categories = categories
+        self.hidden = hidden
+        # Per recipe
+        self.offsets = offsets
+        self.tag_ids = tag_ids
+
+    @classmethod
+    def build(cls, tags_column):
+        positions, terms = explode_positions(tags_column)
+        codes, vocabulary = pd.factorize(pd.Series(terms, dtype=object))
+        categories = np.array([classify_tag(tag) for tag in vocabulary], dtype=np.uint8)
+        labels = np.array([tag_label(tag) for tag in vocabulary], dtype=object)
+        hidden = np.array([tag in HIDDEN_TAGS for tag in vocabulary], dtype=bool)
+
+        # Positions are already ascending; the stable sort keeps each row's tag order within a category
+        order = np.lexsort((categories[codes], positions))
+        tag_ids = codes[order].astype(np.min_scalar_type(max(len(vocabulary) - 1, 0)))
+        offsets = np.zeros(len(tags_column) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(positions, minlength=len(tags_column)), out=offsets[1:])
+        return cls(labels, categories, hidden, offsets, tag_ids)
+
+    @property
+    def nbytes(self):
+        return self.categories.nbytes + self.hidden.nbytes + self.offsets.nbytes + self.tag_ids.nbytes
+
+    def breakdown(self, row):
+        """Tag ids of a recipe per category code, each in the recipe's tag order"""
+        ids = self.tag_ids[self.offsets[row]:self.offsets[row + 1]]
+        bounds = np.searchsorted(self.categories[ids], np.arange(len(CATEGORIES) + 1))
+        return [ids[bounds[code]:bounds[code + 1]] for code in range(len(CATEGORIES))]
@@ -0,0 +1,90 @@
+"""Tag frequencies and co-occurrence for the recipe category filters.
+
+The statistics are computed offline over the whole recipes file by the
+batch job in backend/analyze_tags.py, which writes them to
+``data/.cache/RAW_recipes.tag_stats.json`` along with the size and mtime of
+the CSV they describe. Besides single tags, the artifact counts the recipes
+carrying any tag of each multi-tag category option (recipe_filters.
+CATEGORY_GROUPS), which per-tag counts cannot give. TagStats reads that
+artifact; when it is missing or stale, the counts are taken from the tag
+bitmap index instead and no co-occurrence is available.
+
+Refresh the statistics with:
+
+    python backend/analyze_tags.py data/RAW_recipes.csv
+"""
+import json
+import os
+
+from columnar_cache import artifact_path
+
+ARTIFACT_SUFFIX = "tag_stats.json"
+# Artifact layout written by backend/analyze_tags.py
+FORMAT_VERSION = 2
+
+
+class TagStats:
+    """Recipe counts of every tag, of the category tag groups and of the most frequent tag pairs"""
+
+    def __init__(self, counts, pairs=None, recipes=None, groups=None):
+        self.counts = counts
+        self.recipes = recipes
+        # Sorted tag tuple -> recipes carrying any of its tags
+        self.groups = groups or {}
+        self._related = {}
+        for a, b, count in pairs or []:
+            self._related.setdefault(a, []).append((b, count))
+            self._related.setdefault(b, []).append((a, count))
+
+    @classmethod
+    def load(cls, csv_path):
+        """Statistics from the batch job's artifact, or None if it is missing or stale"""
+        try:
+            with open(artifact_path(csv_path, ARTIFACT_SUFFIX)) as f:
+                stats = json.load(f)
+            stat = os.stat(csv_path)
+        except (OSError, ValueError):
+            return None
+        if stats.get('format_version') != FORMAT_VERSION:
+            return None
+        if stats.get('source') != {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}:
+            return None
+        groups = {tuple(tags): count for tags, count in stats['groups']}
+        return cls(dict(stats['tags']), stats['pairs'], stats['recipes'], groups)
+
+    @classmethod
+    def from_index(cls, index, groups=()):
+        """Frequencies (and the counts of groups of tags) from a tag BitmapIndex, without co-occurrence"""
+        return cls({term: index.count(term) for term in index.terms()}, recipes=index.n_rows,
+                   groups={tuple(sorted(tags)): index.count_any(tags) for tags in groups})
+
+    @property
+    def has_pairs(self):
+        return bool(self._related)
+
+    def count(self, tag):
+        return self.counts.get(tag, 0)
+
+    def count_any(self, tags):
+        """Recipes carrying any of tags: exact for one tag or a counted group, else a lower bound"""
+        tags = tuple(sorted(set(tags)))
+        if len(tags) == 1:
+            return self.count(tags[0])
+        if tags in self.groups:
+            return self.groups[tags]
+        return max((self.count(tag) for tag in tags), default=0)
+
+    def most_common(self, exclude=()):
+        """Tags by decreasing count, ties by name"""
+        exclude = set(exclude)
+        return sorted((tag for tag in self.counts if tag not in exclude), key=lambda tag: (-self.counts[tag], tag))
+
+    def related(self, tags, n=5):
+        """Tags most often found on the same recipes as any of tags, with their pair counts"""
+        tags = set(tags)
+        together = {}
+        for tag in tags:
+            for other, count in self._related.get(tag, []):
+                if other not in tags:
+                    together[other] = max(together.get(other, 0), count)
+        return sorted(together.items(), key=lambda item: (-item[1], item[0]))[:n]
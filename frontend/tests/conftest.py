@@ -0,0 +1,9 @@
+"""The app's modules import each other by bare name, as when Streamlit runs frontend/app.py"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for directory in ('frontend', 'backend'):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
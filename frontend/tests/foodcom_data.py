@@ -0,0 +1,83 @@
+"""Small synthetic RAW_recipes.csv / RAW_interactions.csv files for the tests
+
+The columns and literal formats follow the Food.com dumps, including the
+awkward rows: missing names and descriptions, items quoted with "..."
+because they contain an apostrophe, non-ASCII text and missing nutrition.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+WORDS = ['chicken', 'chocolate', 'cake', 'lemon', 'garlic', 'zucchini', 'pasta', 'salad',
+         'spicy', 'easy', 'baked', 'grilled', 'soup', 'bread', 'pie', 'crème', 'brûlée']
+TAGS = ['time-to-make', 'course', 'main-dish', 'desserts', 'easy', 'vegetarian', 'low-fat',
+        '30-minutes-or-less', '60-minutes-or-less', 'american', 'italian', 'mexican',
+        'breakfast', 'lunch', 'dinner-party', 'oven', 'crock-pot-slow-cooker', 'summer']
+INGREDIENTS = ['salt', 'butter', 'eggs', 'flour', 'sugar', 'garlic', 'olive oil', 'onion',
+               'milk', 'lemon juice', "chef's knife", 'crème fraîche']
+
+
+def recipes_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        name = ' '.join(rng.choice(WORDS, size=rng.integers(1, 4)))
+        tags = [str(tag) for tag in rng.choice(TAGS, size=rng.integers(0, 7), replace=False)]
+        ingredients = [str(item) for item in rng.choice(INGREDIENTS, size=rng.integers(1, 6), replace=False)]
+        steps = [f"step {j} with {rng.choice(WORDS)}" for j in range(rng.integers(1, 5))]
+        nutrition = [float(round(value, 1)) for value in rng.uniform(0, 300, size=7)]
+        rows.append({
+            'name': name if i % 50 else np.nan,
+            'id': 1000 + 3 * i,
+            'minutes': int(rng.integers(1, 400)),
+            'contributor_id': int(rng.integers(1, 40)),
+            'submitted': str(np.datetime64('2001-01-01') + int(rng.integers(0, 6000))),
+            'tags': repr(tags),
+            'nutrition': repr(nutrition) if i % 37 else np.nan,
+            'n_steps': len(steps),
+            'steps': repr(steps),
+            'description': f"a {rng.choice(WORDS)} dish" if i % 7 else np.nan,
+            'ingredients': repr(ingredients),
+            'n_ingredients': len(ingredients),
+        })
+    return pd.DataFrame(rows)
+
+
+def interactions_frame(recipe_ids, n=3000, n_users=120, seed=1):
+    rng = np.random.default_rng(seed)
+    reviews = [' '.join(rng.choice(WORDS + ['the', 'was', 'too', 'salty', 'loved', 'it'],
+                                   size=rng.integers(0, 12)))
+               for _ in range(n)]
+    return pd.DataFrame({
+        'user_id': rng.integers(1, n_users, size=n),
+        'recipe_id': rng.choice(np.asarray(recipe_ids), size=n),
+        'date': [str(np.datetime64('2002-01-01') + int(day)) for day in rng.integers(0, 5000, size=n)],
+        'rating': rng.choice([0, 1, 2, 3, 4, 5, 5, 5], size=n),
+        'review': [review or np.nan for review in reviews],
+    })
+
+
+class DataDirTestCase(unittest.TestCase):
+    """A temporary data/ directory with RAW_recipes.csv and RAW_interactions.csv"""
+
+    n_recipes = 300
+    n_interactions = 3000
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.data_dir = tempfile.mkdtemp(prefix='foodcom-test-')
+        cls.recipes_csv = os.path.join(cls.data_dir, 'RAW_recipes.csv')
+        cls.interactions_csv = os.path.join(cls.data_dir, 'RAW_interactions.csv')
+        recipes = recipes_frame(cls.n_recipes)
+        recipes.to_csv(cls.recipes_csv, index=False)
+        interactions_frame(recipes['id'], cls.n_interactions).to_csv(cls.interactions_csv, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.data_dir, ignore_errors=True)
+        super().tearDownClass()
@@ -0,0 +1,94 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from binning import (density_grid, finite_values, fixed_width_edges, merge_outlier_samples, quantile_bin_edges,
+                     split_outliers, tukey_fences)
+
+
+class BinningTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.values = pd.Series(rng.lognormal(3, 1, size=20000))
+        self.values[rng.random(len(self.values)) < 0.05] = np.nan
+        self.values[:3] = [np.inf, -np.inf, np.nan]
+        self.finite = self.values[np.isfinite(self.values)].to_numpy()
+
+    def test_finite_values_drops_missing_and_infinite(self):
+        np.testing.assert_array_equal(finite_values(self.values), self.finite)
+        np.testing.assert_array_equal(finite_values(pd.Series(['1', 'x', None, '2.5'])), [1.0, 2.5])
+
+    def test_fixed_width_edges_match_numpy(self):
+        edges = fixed_width_edges(self.finite.min(), self.finite.max(), bins=25)
+        expected_counts, expected_edges = np.histogram(self.finite, bins=25)
+        np.testing.assert_allclose(edges, expected_edges)
+        np.testing.assert_array_equal(np.histogram(self.finite, bins=edges)[0], expected_counts)
+        np.testing.assert_array_equal(fixed_width_edges(4.0, 4.0, bins=2), [4.0, 4.5, 5.0])
+
+    def test_quantile_bin_edges_merge_repeated_quantiles(self):
+        values = np.array([1, 1, 1, 1, 1, 1, 2, 3, 3, 3], dtype=float)
+        quantiles = np.quantile(values, np.linspace(0, 1, 11))
+        edges = quantile_bin_edges(quantiles)
+        np.testing.assert_array_equal(edges, np.unique(quantiles))
+        self.assertLess(len(edges), len(quantiles))
+        self.assertEqual(np.histogram(values, bins=edges)[0].sum(), len(values))
+        np.testing.assert_array_equal(quantile_bin_edges([4.0, 4.0]), [4.0, 5.0])
+
+        edges = quantile_bin_edges(np.quantile(self.finite, np.linspace(0, 1, 21)))
+        counts = np.histogram(self.finite, bins=edges)[0]
+        # Roughly equal numbers of values per bin
+        self.assertLessEqual(counts.max() - counts.min(), 2)
+
+    def test_split_outliers_matches_pandas(self):
+        finite = pd.Series(self.finite)
+        q1, q3 = finite.quantile([0.25, 0.75])
+        fences = tukey_fences(q1, q3)
+        self.assertEqual(fences, (q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)))
+        inside = finite[finite.between(*fences)]
+        outliers = finite[~finite.between(*fences)]
+
+        whiskers, sample, n_outliers = split_outliers(self.finite, fences, max_outliers=50)
+        self.assertEqual(whiskers, (inside.min(), inside.max()))
+        self.assertEqual(n_outliers, len(outliers))
+        self.assertEqual(len(sample), 50)
+        self.assertTrue(np.isin(sample, outliers).all())
+        # Seeded: the same sample on every call
+        np.testing.assert_array_equal(sample, split_outliers(self.finite, fences, max_outliers=50)[1])
+
+        whiskers, sample, n_outliers = split_outliers(np.array([100.0]), fences)
+        self.assertEqual((whiskers, n_outliers), ((np.inf, -np.inf), 1))
+
+    def test_merged_outlier_samples_are_weighted_by_part(self):
+        rng = np.random.default_rng(6)
+        many, few = rng.uniform(100, 200, size=5000), rng.uniform(-200, -100, size=300)
+        parts = [(rng.choice(many, 200, replace=False), len(many)), (rng.choice(few, 200, replace=False), len(few)),
+                 (np.empty(0), 0)]
+        merged = merge_outlier_samples(parts, max_outliers=200)
+        self.assertEqual(len(merged), 200)
+        self.assertTrue(np.isin(merged, np.concatenate([many, few])).all())
+        self.assertTrue((np.diff(merged) >= 0).all())
+        # 300 / 5300 of the outliers come from the small part: 11.3 of 200, rounded
+        self.assertEqual((merged < 0).sum(), 11)
+        np.testing.assert_array_equal(merge_outlier_samples([(few[:3], 3)]), np.sort(few[:3]))
+        self.assertEqual(len(merge_outlier_samples([])), 0)
+
+    def test_density_grid_matches_histogram2d(self):
+        rng = np.random.default_rng(4)
+        x = pd.Series(rng.normal(size=5000))
+        y = pd.Series(x * 2 + rng.normal(size=5000))
+        x[:10], y[5:15] = np.nan, np.inf
+        both = np.isfinite(x) & np.isfinite(y)
+        x_edges, y_edges, counts = density_grid(x, y, bins=40)
+        expected, expected_x, expected_y = np.histogram2d(x[both], y[both], bins=40)
+        np.testing.assert_allclose(x_edges, expected_x)
+        np.testing.assert_allclose(y_edges, expected_y)
+        np.testing.assert_array_equal(counts, expected.astype(np.int64))
+        self.assertEqual(counts.sum(), both.sum())
+
+        x_edges, y_edges, counts = density_grid(pd.Series([np.nan]), pd.Series([1.0]))
+        self.assertEqual(counts.sum(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import BitmapIndex
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+
+
+def contains_mask(column, terms, combine):
+    """The pandas path the index replaces"""
+    return column.map(lambda items: items is not None and combine(term in list(items) for term in terms)).to_numpy()
+
+
+class BitmapIndexTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tags = load_dataset(cls.recipes_csv)['tags']
+        cls.index = BitmapIndex.build(cls.tags)
+
+    def test_counts_and_rows_match_a_scan(self):
+        for term in self.index.terms():
+            expected = contains_mask(self.tags, [term], any)
+            self.assertEqual(self.index.count(term), expected.sum(), term)
+            np.testing.assert_array_equal(self.index.rows(term), np.flatnonzero(expected))
+
+    def test_any_and_all_masks(self):
+        for terms in [['easy'], ['easy', 'vegetarian'], ['desserts', 'oven', 'summer'], ['no-such-tag'], []]:
+            np.testing.assert_array_equal(self.index.any_mask(terms), contains_mask(self.tags, terms, any))
+            np.testing.assert_array_equal(self.index.all_mask(terms), contains_mask(self.tags, terms, all))
+
+    def test_count_any_over_a_prefix(self):
+        terms = ['easy', 'oven']
+        self.assertEqual(self.index.count_any(terms, 100), contains_mask(self.tags[:100], terms, any).sum())
+
+    def test_row_sizes_count_distinct_terms(self):
+        tags = pd.Series([['a', 'b', 'a'], None, [], ['b']])
+        index = BitmapIndex.build(tags)
+        np.testing.assert_array_equal(index.row_sizes, [2, 0, 0, 1])
+        self.assertEqual(index.count('a'), 1)
+
+    def test_normalize(self):
+        index = BitmapIndex.build(pd.Series([['Salt '], ['salt'], ['pepper']]), normalize=str.strip)
+        self.assertEqual(index.count('salt'), 1)
+        index = BitmapIndex.build(pd.Series([['Salt '], ['salt'], ['pepper']]), normalize=lambda t: t.strip().lower())
+        self.assertEqual(index.count('salt'), 2)
+
+    def test_persisted_index_round_trips(self):
+        shutil.rmtree(os.path.join(self.data_dir, '.cache'), ignore_errors=True)
+        built = BitmapIndex.load_or_build(self.recipes_csv, self.tags, 'tags.npz')
+        loaded = BitmapIndex.load_or_build(self.recipes_csv, None, 'tags.npz')
+        self.assertEqual(sorted(loaded.terms()), sorted(built.terms()))
+        for term in built.terms():
+            np.testing.assert_array_equal(loaded.rows(term), built.rows(term))
+        np.testing.assert_array_equal(loaded.row_sizes, built.row_sizes)
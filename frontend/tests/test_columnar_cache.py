@@ -0,0 +1,104 @@
+import ast
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import artifact_path, build_cache, is_artifact_fresh, load_dataset, read_rows
+from foodcom_data import DataDirTestCase
+
+
+def literal_or_none(value):
+    return None if not isinstance(value, str) else ast.literal_eval(value)
+
+
+class LoadDatasetTests(DataDirTestCase):
+    def setUp(self):
+        shutil.rmtree(os.path.join(self.data_dir, '.cache'), ignore_errors=True)
+
+    def test_matches_read_csv_with_literal_eval(self):
+        expected = pd.read_csv(self.recipes_csv)
+        df = load_dataset(self.recipes_csv)
+
+        self.assertEqual(list(df.columns), list(expected.columns))
+        for column in ['tags', 'steps', 'ingredients', 'nutrition']:
+            parsed = [None if items is None else list(items) for items in df[column]]
+            self.assertEqual(parsed, [literal_or_none(value) for value in expected[column]], column)
+        for column in ['id', 'minutes', 'n_steps']:
+            np.testing.assert_array_equal(df[column].to_numpy(), expected[column].to_numpy())
+        pd.testing.assert_series_equal(df['name'].astype(object), expected['name'].astype(object),
+                                       check_dtype=False)
+
+    def test_nrows_and_columns(self):
+        df = load_dataset(self.recipes_csv, nrows=5, columns=['id', 'tags'])
+        self.assertEqual(list(df.columns), ['id', 'tags'])
+        self.assertEqual(len(df), 5)
+
+    def test_cache_is_reused_until_the_csv_changes(self):
+        load_dataset(self.interactions_csv)
+        parquet = artifact_path(self.interactions_csv, 'parquet')
+        built = os.stat(parquet).st_mtime_ns
+        self.assertTrue(is_artifact_fresh(self.interactions_csv, 'parquet'))
+
+        load_dataset(self.interactions_csv)
+        self.assertEqual(os.stat(parquet).st_mtime_ns, built)
+
+        stat = os.stat(self.interactions_csv)
+        os.utime(self.interactions_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertFalse(is_artifact_fresh(self.interactions_csv, 'parquet'))
+        self.assertEqual(len(load_dataset(self.interactions_csv)), self.n_interactions)
+        self.assertTrue(is_artifact_fresh(self.interactions_csv, 'parquet'))
+
+    def test_read_rows(self):
+        rows = np.array([2999, 0, 17, 17, 1500])
+        expected = pd.read_csv(self.interactions_csv).iloc[rows].reset_index(drop=True)
+        df = read_rows(self.interactions_csv, rows, columns=['user_id', 'review'])
+        pd.testing.assert_frame_equal(df, expected[['user_id', 'review']], check_dtype=False)
+
+    def test_no_temporary_files_left(self):
+        build_cache(self.recipes_csv, workers=2, chunksize=70)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.data_dir, '.cache'))),
+                         ['RAW_recipes.parquet', 'RAW_recipes.parquet.meta.json'])
+
+
+class SchemaWideningTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'mixed.csv')
+
+    def test_later_chunks_widen_the_schema(self):
+        # Chunks of 4 rows: 'late' is empty, then ints, then floats; 'text' turns from ints to words
+        pd.DataFrame({
+            'id': range(12),
+            'late': [None] * 4 + [1, 2, 3, 4] + [0.5, None, 2.5, 3.0],
+            'text': [1, 2, 3, 4, 5, 6, 7, 8, 'a', 'b', None, 'c'],
+            'empty': [None] * 12,
+        }).to_csv(self.path, index=False)
+        build_cache(self.path, workers=2, chunksize=4)
+        df = load_dataset(self.path)
+        expected = pd.read_csv(self.path)
+
+        np.testing.assert_array_equal(df['id'].to_numpy(), expected['id'].to_numpy())
+        self.assertEqual(df['late'].dtype, np.float64)
+        np.testing.assert_array_equal(df['late'].to_numpy(), expected['late'].to_numpy())
+        self.assertEqual(df['text'].fillna('-').tolist(), ['1', '2', '3', '4', '5', '6', '7', '8', 'a', 'b', '-', 'c'])
+        self.assertTrue(df['empty'].isna().all())
+        self.assertEqual(sorted(os.listdir(os.path.join(self.directory, '.cache'))),
+                         ['mixed.parquet', 'mixed.parquet.meta.json'])
+
+
+class HeaderOnlyTests(unittest.TestCase):
+    def test_header_only_csv(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'empty.csv')
+        with open(path, 'w') as f:
+            f.write('name,id,tags\n')
+        build_cache(path, workers=1)
+        df = load_dataset(path)
+        self.assertEqual(list(df.columns), ['name', 'id', 'tags'])
+        self.assertEqual(len(df), 0)
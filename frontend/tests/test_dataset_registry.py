@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from dataset_registry import DatasetRegistry, artifact_nbytes, frame_nbytes
+
+
+class DatasetRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'a.csv')
+        pd.DataFrame({'x': range(100)}).to_csv(self.path, index=False)
+        self.registry = DatasetRegistry(budget_bytes=10**9)
+        self.loads = 0
+
+    def loader(self, path):
+        self.loads += 1
+        return pd.read_csv(path)
+
+    def test_loads_once_until_the_file_changes(self):
+        first = self.registry.get(self.path, 'raw', self.loader)
+        self.assertIs(self.registry.get(self.path, 'raw', self.loader), first)
+        self.assertEqual(self.loads, 1)
+
+        pd.DataFrame({'x': range(50)}).to_csv(self.path, index=False)
+        self.assertEqual(len(self.registry.get(self.path, 'raw', self.loader)), 50)
+        self.assertEqual(self.loads, 2)
+
+    def test_derived_is_built_once_and_dropped_with_its_frame(self):
+        builds = []
+        build = lambda df: builds.append(1) or df['x'].to_numpy() * 2
+        first = self.registry.derived(self.path, 'raw', 'double', self.loader, build)
+        self.assertIs(self.registry.derived(self.path, 'raw', 'double', self.loader, build), first)
+        self.assertEqual(len(builds), 1)
+
+        self.registry.invalidate(self.path)
+        self.registry.derived(self.path, 'raw', 'double', self.loader, build)
+        self.assertEqual(len(builds), 2)
+
+    def test_nested_derived_does_not_deadlock(self):
+        def outer(df):
+            inner = self.registry.derived(self.path, 'raw', 'inner', self.loader, lambda df: df['x'].to_numpy())
+            return inner + 1
+
+        result = []
+        thread = threading.Thread(target=lambda: result.append(
+            self.registry.derived(self.path, 'raw', 'outer', self.loader, outer)), daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive(), "nested derived() deadlocked")
+        np.testing.assert_array_equal(result[0], np.arange(100) + 1)
+
+    def test_load_locks_are_released(self):
+        self.registry.derived(self.path, 'raw', 'sum', self.loader, lambda df: df['x'].sum())
+        self.registry.invalidate()
+        self.assertEqual(self.registry._load_locks, {})
+
+    def test_concurrent_gets_load_once(self):
+        barrier = threading.Barrier(8)
+
+        def get():
+            barrier.wait()
+            self.registry.get(self.path, 'raw', self.loader)
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(self.registry._load_locks, {})
+
+    def test_evicts_least_recently_used_over_budget(self):
+        other = os.path.join(self.directory, 'b.csv')
+        shutil.copy(self.path, other)
+        frame = self.registry.get(self.path, 'raw', self.loader)
+        self.registry.budget_bytes = frame_nbytes(frame) + 1
+        self.registry.get(other, 'raw', self.loader)
+        self.assertIsNone(self.registry.version(self.path, 'raw'))
+        self.assertIsNotNone(self.registry.version(other, 'raw'))
+
+
+class SizeTests(unittest.TestCase):
+    def test_list_cells_count_their_items(self):
+        tags = pd.Series([np.array(['tag-%d-%s' % (i, 'x' * 40) for i in range(10)], dtype=object)] * 2000)
+        df = pd.DataFrame({'tags': tags})
+        shallow = int(df.memory_usage(deep=True).sum())
+        self.assertGreater(frame_nbytes(df), shallow + 2000 * 10 * 40)
+
+    def test_objects_without_nbytes_are_sized_deeply(self):
+        class Report:
+            def __init__(self):
+                self.report = {'columns': [{'name': 'x' * 1000, 'histogram': list(range(1000))}]}
+
+        self.assertGreater(artifact_nbytes(Report()), 1000 + 1000 * 28)
+        self.assertEqual(artifact_nbytes(np.zeros(10)), 80)
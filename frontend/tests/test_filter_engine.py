@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from filter_engine import evaluate
+from result_cache import ResultCache
+
+
+class EvaluateTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.n = 1003
+        self.values = rng.integers(0, 100, size=self.n)
+        self.cache = ResultCache(10**7)
+        self.calls = []
+
+    def predicate(self, name, low):
+        def compute():
+            self.calls.append((name, low))
+            return self.values >= low
+        return (name, low, compute)
+
+    def test_matches_the_conjunction_of_masks(self):
+        predicates = [self.predicate('a', 10), ('skipped', None, lambda: self.fail()),
+                      ('b', 1, lambda: self.values % 3 == 0)]
+        mask = evaluate('t', 1, self.n, predicates, self.cache)
+        np.testing.assert_array_equal(mask, (self.values >= 10) & (self.values % 3 == 0))
+        self.assertEqual(mask.dtype, bool)
+
+    def test_no_active_predicate_keeps_every_row(self):
+        mask = evaluate('t', 1, self.n, [('a', None, lambda: self.fail())], self.cache)
+        self.assertTrue(mask.all())
+        self.assertEqual(len(mask), self.n)
+
+    def test_only_changed_predicates_are_recomputed(self):
+        evaluate('t', 1, self.n, [self.predicate('a', 10), self.predicate('b', 20)], self.cache)
+        evaluate('t', 1, self.n, [self.predicate('a', 10), self.predicate('b', 30)], self.cache)
+        self.assertEqual(self.calls, [('a', 10), ('b', 20), ('b', 30)])
+
+        # A new version of the data recomputes everything
+        evaluate('t', 2, self.n, [self.predicate('a', 10)], self.cache)
+        self.assertEqual(self.calls[-1], ('a', 10))
+        self.assertEqual(len(self.calls), 4)
+
+    def test_cached_masks_are_not_modified(self):
+        first = evaluate('t', 1, self.n, [self.predicate('a', 10), self.predicate('b', 50)], self.cache)
+        again = evaluate('t', 1, self.n, [self.predicate('a', 10)], self.cache)
+        np.testing.assert_array_equal(again, self.values >= 10)
+        self.assertFalse(np.array_equal(first, again))
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import build_cache, read_rows
+from fingerprints import RowFingerprints, file_fingerprints, frame_fingerprints, row_fingerprints
+
+
+class FingerprintTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(9)
+        n = 3000
+        self.df = pd.DataFrame({
+            'user_id': rng.integers(0, 40, size=n),
+            'rating': rng.integers(0, 3, size=n).astype(float),
+            'review': rng.choice(['great', 'too salty', 'crème brûlée', None], size=n),
+        })
+        self.df.loc[rng.random(n) < 0.1, 'rating'] = np.nan
+
+    def test_duplicates_match_pandas(self):
+        fingerprints = RowFingerprints.build(self.df)
+        expected = self.df.duplicated()
+        self.assertEqual(fingerprints.duplicates, expected.sum())
+        np.testing.assert_array_equal(fingerprints.duplicated(), expected.to_numpy())
+
+    def test_groups_match_groupby(self):
+        fingerprints = RowFingerprints.build(self.df)
+        key = self.df.astype(str).apply(tuple, axis=1)
+        expected = {tuple(rows) for rows in key.groupby(key).indices.values() if len(rows) > 1}
+        groups = fingerprints.groups()
+        self.assertEqual({tuple(np.sort(rows)) for rows in groups}, expected)
+        self.assertEqual([len(rows) for rows in groups], sorted((len(rows) for rows in groups), reverse=True))
+        self.assertEqual(len(fingerprints.groups(limit=5)), 5)
+        self.assertEqual({tuple(np.sort(rows)) for rows in fingerprints.verified_groups(self.df.take)}, expected)
+
+    def test_verified_groups_split_collisions(self):
+        df = pd.DataFrame({'a': [1, 2, 1, 2, 3]})
+        # Force every row into one candidate group, as a hash collision would
+        fingerprints = RowFingerprints(np.zeros(len(df), dtype=np.uint64))
+        self.assertEqual(len(fingerprints.groups()), 1)
+        groups = sorted(tuple(rows) for rows in fingerprints.verified_groups(df.take))
+        self.assertEqual(groups, [(0, 2), (1, 3)])
+
+    def test_row_fingerprints_agree_across_chunks(self):
+        whole = row_fingerprints(self.df)
+        chunked = np.concatenate([row_fingerprints(self.df.iloc[i:i + 700]) for i in range(0, len(self.df), 700)])
+        np.testing.assert_array_equal(whole, chunked)
+        lists = pd.DataFrame({'tags': [['a', 'b'], ['a', 'b'], ['b']]})
+        self.assertEqual(RowFingerprints(row_fingerprints(lists)).duplicates, 1)
+        self.assertEqual(RowFingerprints(frame_fingerprints(lists)).duplicates, 1)
+
+
+class FileFingerprintTests(unittest.TestCase):
+    def test_duplicates_across_chunks_match_pandas(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'reviews.csv')
+        rng = np.random.default_rng(4)
+        n = 2000
+        df = pd.DataFrame({
+            'user_id': rng.integers(0, 30, size=n),
+            'rating': rng.integers(0, 3, size=n),
+            'review': rng.choice(['great', 'too salty', 'crème brûlée'], size=n),
+        })
+        # Missing ratings in some chunks only: pandas reads those chunks' ratings as floats
+        df['rating'] = df['rating'].astype(object)
+        df.loc[900:1000, 'rating'] = None
+        df.to_csv(path, index=False)
+        build_cache(path, workers=2, chunksize=300)
+
+        expected = pd.read_csv(path)
+        fingerprints = RowFingerprints(file_fingerprints(path, batch_rows=170))
+        np.testing.assert_array_equal(fingerprints.duplicated(), expected.duplicated().to_numpy())
+        key = expected.astype(str).apply(tuple, axis=1)
+        groups = {tuple(rows) for rows in key.groupby(key).indices.values() if len(rows) > 1}
+        verified = fingerprints.verified_groups(lambda rows: read_rows(path, rows))
+        self.assertEqual({tuple(np.sort(rows)) for rows in verified}, groups)
+
+
+if __name__ == '__main__':
+    unittest.main()
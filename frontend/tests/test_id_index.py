@@ -0,0 +1,41 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from id_index import IdIndex, join_column
+
+
+class IdIndexTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.recipes = load_dataset(cls.recipes_csv)
+        cls.reviews = load_dataset(cls.interactions_csv)
+        cls.index = IdIndex.build(cls.recipes['id'])
+
+    def test_lookup_matches_a_dict(self):
+        positions = {recipe_id: row for row, recipe_id in enumerate(self.recipes['id'])}
+        ids = np.concatenate([self.reviews['recipe_id'].to_numpy(), [-5, 0, 10**9, 1001]])
+        np.testing.assert_array_equal(self.index.lookup(ids), [positions.get(i, -1) for i in ids])
+
+    def test_missing_ids(self):
+        np.testing.assert_array_equal(self.index.lookup(pd.Series([1000.0, np.nan])), [0, -1])
+        np.testing.assert_array_equal(IdIndex.build([]).lookup([1, 2]), [-1, -1])
+
+    def test_join_column_matches_merge(self):
+        ids = pd.Series(list(self.reviews['recipe_id'][:500]) + [7, 8])
+        merged = pd.DataFrame({'id': ids}).merge(self.recipes[['id', 'name']], on='id', how='left')
+        joined = join_column(self.index, ids, self.recipes['name'])
+        self.assertEqual([None if pd.isna(v) else v for v in joined],
+                         [None if pd.isna(v) else v for v in merged['name']])
+
+    def test_persisted_index_round_trips(self):
+        shutil.rmtree(os.path.join(self.data_dir, '.cache'), ignore_errors=True)
+        IdIndex.load_or_build(self.recipes_csv, self.recipes['id'])
+        loaded = IdIndex.load_or_build(self.recipes_csv, None)
+        np.testing.assert_array_equal(loaded.sorted_ids, self.index.sorted_ids)
+        np.testing.assert_array_equal(loaded.positions, self.index.positions)
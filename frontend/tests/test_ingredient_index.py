@@ -0,0 +1,103 @@
+import os
+import shutil
+import unittest
+
+import numpy as np
+
+from bitmap_index import BitmapIndex
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from ingredient_index import (IngredientIndex, covers, load_or_build_index, match_pantry, normalize_ingredient,
+                              pantry_coverage, parse_pantry)
+
+
+def index_of(lists):
+    return IngredientIndex(BitmapIndex.build(lists, normalize_ingredient))
+
+
+def scan_pantry(ingredient_lists, pantry, max_missing):
+    """match_pantry by a per-recipe set scan, ranked by coverage, then missing, then row"""
+    pantry = [normalize_ingredient(item) for item in pantry]
+    matches = []
+    for row, ingredients in enumerate(ingredient_lists):
+        items = {normalize_ingredient(item) for item in (ingredients if ingredients is not None else [])}
+        hits = sum(any(covers(item, ingredient) for item in pantry) for ingredient in items)
+        if hits and len(items) - hits <= max_missing:
+            matches.append((-hits / len(items), len(items) - hits, row))
+    matches.sort()
+    return [row for _, _, row in matches], [-coverage for coverage, _, _ in matches], [m for _, m, _ in matches]
+
+
+class NormalizeTests(unittest.TestCase):
+    def test_plurals_and_punctuation(self):
+        self.assertEqual(normalize_ingredient(' Large  EGGS '), 'large egg')
+        self.assertEqual(normalize_ingredient('all-purpose flour'), 'all purpose flour')
+        self.assertEqual(normalize_ingredient('tomatoes'), normalize_ingredient('tomato'))
+        self.assertEqual(normalize_ingredient('fresh berries'), 'fresh berry')
+        self.assertEqual(normalize_ingredient('peaches'), 'peach')
+        self.assertEqual(normalize_ingredient('couscous'), 'couscous')
+        self.assertEqual(normalize_ingredient("chef's knife"), "chef's knife")
+        self.assertEqual(normalize_ingredient('crème fraîche'), 'crème fraîche')
+
+    def test_pantry_items_cover_trailing_words(self):
+        self.assertTrue(covers('flour', 'all purpose flour'))
+        self.assertTrue(covers('egg', 'egg'))
+        self.assertFalse(covers('flour', 'flour tortilla'))
+        self.assertFalse(covers('oil', 'soil'))
+        self.assertEqual(parse_pantry('Eggs, flour;\n eggs ,, Milk'), ['egg', 'flour', 'milk'])
+
+
+class MatchPantryTests(unittest.TestCase):
+    def test_plural_and_qualified_names_match(self):
+        index = index_of([['egg', 'all-purpose flour'], ['eggs', 'milk'], ['flour tortillas']])
+        rows, coverage, missing = match_pantry(index, parse_pantry('Eggs, flour'), max_missing=1)
+        self.assertEqual(rows.tolist(), [0, 1])
+        self.assertEqual(coverage.tolist(), [1.0, 0.5])
+        self.assertEqual(pantry_coverage(['egg', 'all-purpose flour'], ['eggs', 'flour']), (2, 2))
+
+    def test_ties_on_coverage_rank_fewer_missing_first(self):
+        index = index_of([['salt', 'sugar', 'butter', 'cream'], ['salt', 'pepper'], ['salt', 'sugar']])
+        rows, coverage, missing = match_pantry(index, ['salt', 'sugar'], max_missing=2)
+        self.assertEqual(rows.tolist(), [2, 1, 0])
+        self.assertEqual(coverage.tolist(), [1.0, 0.5, 0.5])
+        self.assertEqual(missing.tolist(), [0, 1, 2])
+
+    def test_no_hits(self):
+        index = index_of([['salt'], ['sugar']])
+        for pantry in (['saffron'], []):
+            rows, coverage, missing = match_pantry(index, pantry, max_missing=10)
+            self.assertEqual((len(rows), len(coverage), len(missing)), (0, 0, 0))
+
+
+class PantryScanTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.ingredients = load_dataset(cls.recipes_csv)['ingredients']
+        cls.index = load_or_build_index(cls.recipes_csv, cls.ingredients)
+
+    def test_matches_a_set_scan(self):
+        pantries = [['salt', 'butter', 'eggs'], ['Olive oil', 'onions', 'garlic', 'milk'],
+                    ['flour', 'sugar', 'egg', 'lemon juice', 'crème fraîche'], ['oil', 'fraîche']]
+        for pantry in pantries:
+            for max_missing in (0, 1, 3):
+                rows, coverage, missing = match_pantry(self.index, pantry, max_missing)
+                expected_rows, expected_coverage, expected_missing = scan_pantry(self.ingredients, pantry, max_missing)
+                self.assertEqual(rows.tolist(), expected_rows, (pantry, max_missing))
+                np.testing.assert_array_equal(coverage, expected_coverage)
+                self.assertEqual(missing.tolist(), expected_missing)
+                for row, share in zip(rows[:20], coverage[:20]):
+                    have, size = pantry_coverage(self.ingredients[row], pantry)
+                    self.assertEqual(have / size, share)
+
+    def test_persisted_index_matches_a_fresh_build(self):
+        loaded = load_or_build_index(self.recipes_csv, self.ingredients)
+        shutil.rmtree(os.path.join(self.data_dir, '.cache'))
+        built = IngredientIndex(BitmapIndex.build(self.ingredients, normalize_ingredient))
+        for pantry in (['salt', 'eggs'], ['olive oil']):
+            for a, b in zip(match_pantry(loaded, pantry, 2), match_pantry(built, pantry, 2)):
+                np.testing.assert_array_equal(a, b)
+
+
+if __name__ == '__main__':
+    unittest.main()
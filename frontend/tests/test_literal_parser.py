@@ -0,0 +1,59 @@
+import ast
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from literal_parser import parse_float_lists, parse_float_matrix, parse_string_lists
+
+
+def literal_eval_or_none(value):
+    try:
+        return list(ast.literal_eval(value))
+    except (ValueError, SyntaxError, TypeError):
+        return None
+
+
+class ParseStringListsTests(unittest.TestCase):
+    def assertMatchesLiteralEval(self, values):
+        self.assertEqual(parse_string_lists(pd.Series(values, dtype=object)),
+                         [literal_eval_or_none(value) for value in values])
+
+    def test_canonical_lists(self):
+        self.assertMatchesLiteralEval(["['a', 'b']", "['one item']", "[]", "['', 'x']"])
+
+    def test_non_canonical_separators_are_not_split_naively(self):
+        self.assertMatchesLiteralEval(["['a','b']", "['a',   'b']", "[ 'a', 'b' ]", "['a',\n'b']"])
+
+    def test_mixed_quotes_and_escapes(self):
+        self.assertMatchesLiteralEval([
+            repr(["chef's knife", 'bowl']),
+            repr(['say "hi"', "it's"]),
+            repr(['back\\slash']),
+            repr(['tab\there']),
+        ])
+
+    def test_missing_and_malformed_rows_are_none(self):
+        self.assertEqual(parse_string_lists(pd.Series([np.nan, "['a', 'b'", "not a list", "'a'"])),
+                         [None, None, None, None])
+
+    def test_ignores_the_index(self):
+        series = pd.Series(["['a']", "['b', 'c']"], index=[10, 3])
+        self.assertEqual(parse_string_lists(series), [['a'], ['b', 'c']])
+
+
+class ParseFloatListsTests(unittest.TestCase):
+    def test_matches_literal_eval(self):
+        values = ["[51.5, 0.0, 13.0]", "[1,2,3]", "[]", "[-1e3, +2.5]", "[1..2]", np.nan]
+        expected = [None if not isinstance(value, str) else literal_eval_or_none(value) for value in values]
+        expected = [None if row is None else [float(item) for item in row] for row in expected]
+        self.assertEqual(parse_float_lists(pd.Series(values, dtype=object)), expected)
+
+    def test_matrix_pads_and_truncates(self):
+        matrix = parse_float_matrix(pd.Series(["[1.0, 2.0, 3.0]", "[4.0]", None, "[5, 6, 7, 8]"]), 3)
+        np.testing.assert_array_equal(matrix, np.array([
+            [1, 2, 3],
+            [4, np.nan, np.nan],
+            [np.nan, np.nan, np.nan],
+            [5, 6, 7],
+        ], dtype=np.float32))
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from nutrition import NUTRITION_COLUMNS, column_means, nutrition_matrix, range_mask
+
+
+class NutritionMatrixTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.column = load_dataset(cls.recipes_csv)['nutrition']
+        cls.matrix = nutrition_matrix(cls.column)
+        # The pandas path: one column per nutrient, NaN for missing lists
+        cls.frame = pd.DataFrame([list(values) if values is not None else [np.nan] * 7 for values in cls.column],
+                                 columns=NUTRITION_COLUMNS).astype(np.float32)
+
+    def test_matrix_matches_the_lists(self):
+        np.testing.assert_array_equal(self.matrix, self.frame.to_numpy())
+
+    def test_range_mask(self):
+        calories = self.frame['calories']
+        np.testing.assert_array_equal(range_mask(self.matrix, 'calories', 50, 200),
+                                      ((calories >= 50) & (calories <= 200)).to_numpy())
+        np.testing.assert_array_equal(range_mask(self.matrix, 'sugar', low=100),
+                                      (self.frame['sugar'] >= 100).to_numpy())
+
+    def test_column_means_skip_missing(self):
+        rows = np.arange(0, len(self.frame), 3)
+        means = column_means(self.matrix, rows)
+        expected = self.frame.iloc[rows].astype(np.float64).mean()
+        for column in NUTRITION_COLUMNS:
+            self.assertAlmostEqual(means[column], expected[column], places=3)
+
+
+class RaggedRowsTests(unittest.TestCase):
+    def test_short_and_long_rows(self):
+        matrix = nutrition_matrix(pd.Series([[1.0] * 7, [2.0, 3.0], None, [4.0] * 9]))
+        self.assertEqual(matrix.shape, (4, 7))
+        np.testing.assert_array_equal(matrix[1, :3], [2, 3, np.nan])
+        self.assertTrue(np.isnan(matrix[2]).all())
+        np.testing.assert_array_equal(matrix[3], [4.0] * 7)
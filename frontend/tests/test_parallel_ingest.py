@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from foodcom_data import DataDirTestCase
+from parallel_ingest import iter_chunks
+
+
+def chunk_summary(chunk):
+    """Picklable transform: where the chunk starts and what it holds"""
+    return chunk.index[0], len(chunk), int(chunk['user_id'].sum()), chunk['recipe_id'].to_numpy()
+
+
+class IterChunksTests(DataDirTestCase):
+    def collect(self, workers, chunksize=170):
+        fractions = []
+        results = list(iter_chunks(self.interactions_csv, chunk_summary, chunksize, workers, fractions.append))
+        return results, fractions
+
+    def test_chunks_in_file_order(self):
+        expected = pd.read_csv(self.interactions_csv)
+        results, _ = self.collect(workers=3)
+        starts = [start for start, _, _, _ in results]
+        self.assertEqual(starts, list(range(0, self.n_interactions, 170)))
+        self.assertEqual(sum(rows for _, rows, _, _ in results), self.n_interactions)
+        np.testing.assert_array_equal(np.concatenate([ids for _, _, _, ids in results]),
+                                      expected['recipe_id'].to_numpy())
+
+    def test_progress_only_increases(self):
+        for workers in (1, 3):
+            results, fractions = self.collect(workers)
+            self.assertEqual(len(fractions), len(results))
+            self.assertTrue(all(0 < fraction <= 1 for fraction in fractions))
+            self.assertEqual(fractions, sorted(fractions))
+            self.assertEqual(fractions[-1], 1.0)
+
+    def test_workers_do_not_change_the_output(self):
+        serial, _ = self.collect(workers=1)
+        for workers in (2, 4):
+            parallel, _ = self.collect(workers)
+            self.assertEqual(len(parallel), len(serial))
+            for a, b in zip(serial, parallel):
+                self.assertEqual(a[:3], b[:3])
+                np.testing.assert_array_equal(a[3], b[3])
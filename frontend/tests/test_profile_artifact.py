@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from profile_artifact import ProfileReport, _chunk_distributions, column_distributions, load_or_build_report, load_report
+from profiler import profile_csv
+
+
+class ProfileReportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(5)
+        n = 5000
+        df = pd.DataFrame({
+            'rating': rng.integers(0, 6, size=n).astype(float),
+            'minutes': rng.lognormal(3, 1.2, size=n).round(),
+            'kind': rng.choice(['a', 'b', None], size=n),
+            'empty': np.nan,
+        })
+        df.loc[rng.random(n) < 0.1, 'rating'] = np.nan
+        cls.directory = tempfile.mkdtemp()
+        cls.csv_path = os.path.join(cls.directory, 'report.csv')
+        df.to_csv(cls.csv_path, index=False)
+        cls.df = pd.read_csv(cls.csv_path)
+        profile = profile_csv(cls.csv_path, chunksize=600, workers=2)
+        cls.report = ProfileReport.from_profile(
+            profile, column_distributions(cls.csv_path, profile, chunksize=600, workers=2))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_histograms_match_numpy_over_the_whole_file(self):
+        for col in ['rating', 'minutes']:
+            values = self.df[col].dropna().to_numpy()
+            expected_counts, expected_edges = np.histogram(values, bins=30)
+            edges, counts = self.report.histogram(col)
+            np.testing.assert_allclose(edges, expected_edges)
+            np.testing.assert_array_equal(counts, expected_counts)
+
+            expected_edges = np.unique(np.quantile(values, np.linspace(0, 1, 31)))
+            edges, counts = self.report.histogram(col, quantile=True)
+            np.testing.assert_allclose(edges, expected_edges)
+            np.testing.assert_array_equal(counts, np.histogram(values, bins=expected_edges)[0])
+            self.assertEqual(counts.sum(), self.df[col].count())
+
+    def test_box_summary_matches_pandas(self):
+        for col in ['rating', 'minutes']:
+            values = self.df[col].dropna()
+            q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+            inside = values.between(q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+            summary = self.report.box_summary(col)
+            expected = {'q1': q1, 'median': median, 'q3': q3, 'mean': values.mean(),
+                        'lower_whisker': values[inside].min(), 'upper_whisker': values[inside].max()}
+            for key, value in expected.items():
+                self.assertAlmostEqual(summary[key], value, msg=f"{col} {key}")
+            self.assertEqual(summary['n_outliers'], (~inside).sum())
+            self.assertEqual(self.report.outliers(col), (~inside).sum())
+            # The sample is bounded and drawn from the actual outliers
+            self.assertEqual(len(summary['outliers']), min((~inside).sum(), 200))
+            self.assertTrue(np.isin(summary['outliers'], self.df[col]).all())
+            self.assertTrue(((summary['outliers'] < summary['lower_whisker'])
+                             | (summary['outliers'] > summary['upper_whisker'])).all())
+
+    def test_chunk_parts_add_up_to_the_whole_column(self):
+        values = self.df['minutes'].dropna().to_numpy()
+        edges = {'minutes': np.linspace(values.min(), values.max(), 11)}
+        quantile_edges = {'minutes': np.unique(np.quantile(values, np.linspace(0, 1, 11)))}
+        fences = {'minutes': (5.0, 60.0)}
+        whole = _chunk_distributions(self.df, edges, quantile_edges, fences, max_outliers=30)['minutes']
+        np.testing.assert_array_equal(whole['counts'], np.histogram(values, bins=edges['minutes'])[0])
+        np.testing.assert_array_equal(whole['quantile_counts'],
+                                      np.histogram(values, bins=quantile_edges['minutes'])[0])
+        inside = values[(values >= 5) & (values <= 60)]
+        self.assertEqual(whole['whiskers'], (inside.min(), inside.max()))
+        self.assertEqual(whole['n_outliers'], len(values) - len(inside))
+        self.assertEqual(len(whole['outliers']), 30)
+
+        parts = [_chunk_distributions(self.df.iloc[i:i + 700], edges, quantile_edges, fences)['minutes']
+                 for i in range(0, len(self.df), 700)]
+        np.testing.assert_array_equal(sum(part['counts'] for part in parts), whole['counts'])
+        self.assertEqual(sum(part['n_outliers'] for part in parts), whole['n_outliers'])
+        self.assertEqual(min(part['whiskers'][0] for part in parts), whole['whiskers'][0])
+        self.assertEqual(max(part['whiskers'][1] for part in parts), whole['whiskers'][1])
+
+    def test_column_stats_match_describe(self):
+        stats = self.report.column_stats('minutes')
+        expected = self.df['minutes'].describe()
+        np.testing.assert_allclose(stats.to_numpy(), expected.to_numpy())
+        self.assertEqual(list(stats.index), list(expected.index))
+
+    def test_columns_without_values_have_no_distributions(self):
+        self.assertIsNone(self.report.histogram('kind'))
+        self.assertIsNone(self.report.box_summary('kind'))
+        if 'empty' in self.report.numeric_columns:
+            self.assertIsNone(self.report.histogram('empty'))
+
+    def test_report_is_persisted_until_the_csv_changes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        csv_path = os.path.join(directory, 'small.csv')
+        pd.DataFrame({'x': [1.0, 2.0, 2.0, 50.0]}).to_csv(csv_path, index=False)
+        self.assertIsNone(load_report(csv_path))
+        built = load_or_build_report(csv_path)
+        loaded = load_report(csv_path)
+        self.assertEqual(loaded.report, built.report)
+        np.testing.assert_array_equal(loaded.histogram('x')[1], built.histogram('x')[1])
+
+        pd.DataFrame({'x': [1.0, 2.0, 3.0, 4.0, 5.0]}).to_csv(csv_path, index=False)
+        self.assertIsNone(load_report(csv_path))
+        self.assertEqual(load_or_build_report(csv_path).rows, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from profiler import HyperLogLog, TDigest, profile_csv, value_hashes
+
+
+class ProfileCsvTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(11)
+        n = 6000
+        score = rng.lognormal(2, 0.7, size=n)
+        df = pd.DataFrame({
+            'rating': rng.integers(0, 6, size=n).astype(float),
+            'score': score,
+            'related': score * 2 + rng.normal(0, 3, size=n),
+            'kind': rng.choice(['a', 'b', 'c', None], size=n),
+            'text': [f"review {i}" for i in rng.integers(0, 4000, size=n)],
+        })
+        df.loc[rng.random(n) < 0.1, 'rating'] = np.nan
+        df.loc[rng.random(n) < 0.05, 'related'] = np.nan
+        # Exact duplicate rows
+        df = pd.concat([df, df.iloc[:50]], ignore_index=True)
+        cls.directory = tempfile.mkdtemp()
+        cls.csv_path = os.path.join(cls.directory, 'profile.csv')
+        df.to_csv(cls.csv_path, index=False)
+        cls.df = pd.read_csv(cls.csv_path)
+        cls.profile = profile_csv(cls.csv_path, chunksize=700, workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_counts_and_missing_values(self):
+        self.assertEqual(self.profile.rows, len(self.df))
+        quality = self.profile.quality().set_index('Column')
+        pd.testing.assert_series_equal(quality['Missing Count'], self.df.isna().sum(), check_names=False)
+        self.assertEqual(self.profile.duplicates, int(self.df.duplicated().sum()))
+        self.assertEqual(self.profile.numeric_columns, ['rating', 'score', 'related'])
+
+    def test_distinct_counts(self):
+        for col in ['rating', 'kind']:
+            self.assertEqual(self.profile.columns[col].distinct, self.df[col].nunique())
+        # High-cardinality columns fall back to HyperLogLog
+        for col in ['score', 'text']:
+            self.assertAlmostEqual(self.profile.columns[col].distinct / self.df[col].nunique(), 1, delta=0.03)
+
+    def test_describe_matches_pandas(self):
+        expected = self.df[['rating', 'score', 'related']].describe()
+        describe = self.profile.describe()
+        for stat in ['count', 'mean', 'std', 'min', 'max']:
+            np.testing.assert_allclose(describe.loc[stat], expected.loc[stat], rtol=1e-9, err_msg=stat)
+        # Exact for the low-cardinality rating, t-digest estimates otherwise
+        np.testing.assert_allclose(describe.loc[['25%', '50%', '75%'], 'rating'],
+                                   expected.loc[['25%', '50%', '75%'], 'rating'])
+        np.testing.assert_allclose(describe.loc[['25%', '50%', '75%'], 'score'],
+                                   expected.loc[['25%', '50%', '75%'], 'score'], rtol=0.01)
+
+    def test_skewness_and_correlation_match_pandas(self):
+        for col in ['rating', 'score', 'related']:
+            self.assertAlmostEqual(self.profile.skewness(col), self.df[col].skew(), places=9)
+        np.testing.assert_allclose(self.profile.correlation(), self.df[['rating', 'score', 'related']].corr(),
+                                   atol=1e-9)
+
+    def test_top_values(self):
+        top = self.profile.top_values('kind', 3)
+        expected = self.df['kind'].value_counts().head(3)
+        self.assertEqual(dict(top), dict(expected))
+        self.assertIsNone(self.profile.top_values('text'))
+
+    def test_outliers(self):
+        rating = self.df['rating'].dropna()
+        q1, q3 = rating.quantile([0.25, 0.75])
+        expected = int(((rating < q1 - 1.5 * (q3 - q1)) | (rating > q3 + 1.5 * (q3 - q1))).sum())
+        self.assertEqual(self.profile.outliers('rating'), expected)
+
+    def test_preview_is_the_first_rows(self):
+        pd.testing.assert_frame_equal(self.profile.preview.reset_index(drop=True),
+                                      self.df.head(len(self.profile.preview)), check_dtype=False)
+
+
+class SketchTests(unittest.TestCase):
+    def test_hyperloglog_merge_equals_one_sketch(self):
+        values = pd.Series(np.arange(50000))
+        whole, left, right = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        whole.add(value_hashes(values))
+        left.add(value_hashes(values[:30000]))
+        right.add(value_hashes(values[20000:]))
+        np.testing.assert_array_equal(left.merge(right).registers, whole.registers)
+        self.assertAlmostEqual(whole.estimate() / 50000, 1, delta=0.02)
+
+    def test_tdigest_quantiles(self):
+        values = np.random.default_rng(2).normal(size=100000)
+        digest = TDigest.from_values(values[:40000]).merge(TDigest.from_values(values[40000:]))
+        for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+            self.assertAlmostEqual(digest.quantile(q), np.quantile(values, q), delta=0.02)
+        self.assertAlmostEqual(digest.cdf(0.0), 0.5, delta=0.01)
@@ -0,0 +1,116 @@
+import os
+import shutil
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import recommend
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from id_index import IdIndex
+from recommendations import AlsoLiked, artifact_version
+
+
+def brute_force_similarities(csv_path, max_user_ratings=recommend.MAX_USER_RATINGS):
+    """(item_ids, dense shrunk cosine similarities) from a dense user x recipe matrix"""
+    df = pd.read_csv(csv_path)
+    df = df[df['rating'] > 0].drop_duplicates(['user_id', 'recipe_id'], keep='last')
+    df = df[df.groupby('user_id')['user_id'].transform('size') <= max_user_ratings]
+    ratings = df.pivot(index='user_id', columns='recipe_id', values='rating').fillna(0).to_numpy()
+    norms = np.linalg.norm(ratings, axis=0)
+    rated = (ratings > 0).astype(np.float64)
+    common = rated.T @ rated
+    similarities = (ratings.T @ ratings) / np.outer(norms, norms) * common / (common + recommend.SHRINKAGE)
+    np.fill_diagonal(similarities, -np.inf)
+    similarities[common == 0] = -np.inf
+    return np.sort(df['recipe_id'].unique()), similarities
+
+
+class ItemNeighborsTests(DataDirTestCase):
+    k = 5
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.matrix = recommend.RatingMatrix.read(cls.interactions_csv)
+        cls.item_ids, cls.similarities = brute_force_similarities(cls.interactions_csv)
+
+    def assert_top_k(self, neighbors, scores):
+        np.testing.assert_array_equal(self.matrix.item_ids, self.item_ids)
+        for item, (row, row_scores) in enumerate(zip(neighbors, scores)):
+            expected = self.similarities[item]
+            found = row >= 0
+            # Every recipe sharing a rater is a candidate, so rows fill up to k where they can
+            self.assertEqual(found.sum(), min(self.k, np.isfinite(expected).sum()), item)
+            np.testing.assert_allclose(row_scores[found], expected[row[found]], rtol=1e-5)
+            np.testing.assert_allclose(row_scores[found], np.sort(expected)[::-1][:found.sum()], rtol=1e-5)
+
+    def test_block_matches_brute_force(self):
+        neighbors, scores = recommend.similar_block(self.matrix, 0, self.matrix.n_items, self.k)
+        self.assert_top_k(neighbors, scores)
+
+    def test_blocks_in_workers_match_one_block(self):
+        blocks = list(self.matrix.blocks(block_pairs=500))
+        self.assertGreater(len(blocks), 1)
+        self.assertEqual([start for start, _ in blocks[1:]], [end for _, end in blocks[:-1]])
+        self.assertEqual((blocks[0][0], blocks[-1][1]), (0, self.matrix.n_items))
+
+        one_block = recommend.similar_block(self.matrix, 0, self.matrix.n_items, self.k)
+        split = recommend.RatingMatrix.blocks
+        with mock.patch.object(recommend.RatingMatrix, 'blocks', lambda matrix: split(matrix, block_pairs=500)):
+            neighbors, scores = recommend.item_neighbors(self.matrix, self.k, workers=2)
+        np.testing.assert_array_equal(neighbors, one_block[0])
+        np.testing.assert_array_equal(scores, one_block[1])
+
+    def test_heavy_users_are_left_out(self):
+        item_ids, similarities = brute_force_similarities(self.interactions_csv, max_user_ratings=20)
+        matrix = recommend.RatingMatrix.read(self.interactions_csv, max_user_ratings=20)
+        np.testing.assert_array_equal(matrix.item_ids, item_ids)
+        neighbors, scores = recommend.similar_block(matrix, 0, matrix.n_items, self.k)
+        found = neighbors >= 0
+        rows = np.nonzero(found)[0]
+        np.testing.assert_allclose(scores[found], similarities[rows, neighbors[found]], rtol=1e-5)
+
+
+class AlsoLikedTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.recipes = load_dataset(cls.recipes_csv)
+        cls.id_index = IdIndex.build(cls.recipes['id'])
+        cls.matrix = recommend.RatingMatrix.read(cls.interactions_csv)
+        cls.neighbors, cls.scores = recommend.similar_block(cls.matrix, 0, cls.matrix.n_items, 5)
+
+    def setUp(self):
+        shutil.rmtree(os.path.join(self.data_dir, '.cache'), ignore_errors=True)
+
+    def test_missing_artifact(self):
+        self.assertIsNone(artifact_version(self.interactions_csv))
+        self.assertIsNone(AlsoLiked.load(self.interactions_csv, self.id_index, len(self.recipes)))
+
+    def test_round_trip_by_recipe_row(self):
+        recommend.write_artifact(self.interactions_csv, self.matrix, self.neighbors, self.scores)
+        self.assertIsNotNone(artifact_version(self.interactions_csv))
+        also_liked = AlsoLiked.load(self.interactions_csv, self.id_index, len(self.recipes))
+        self.assertEqual(also_liked.neighbors.shape, (len(self.recipes), 5))
+
+        recipe_ids = self.recipes['id'].to_numpy()
+        for item, recipe_id in enumerate(self.matrix.item_ids):
+            rows, scores = also_liked.lookup(self.id_index.lookup([recipe_id])[0])
+            found = self.neighbors[item] >= 0
+            np.testing.assert_array_equal(recipe_ids[rows], self.matrix.item_ids[self.neighbors[item][found]])
+            np.testing.assert_array_equal(scores, self.scores[item][found])
+        # Recipes nobody rated have no neighbours
+        unrated = ~np.isin(recipe_ids, self.matrix.item_ids)
+        self.assertTrue((also_liked.neighbors[unrated] == -1).all())
+
+    def test_stale_artifact(self):
+        recommend.write_artifact(self.interactions_csv, self.matrix, self.neighbors, self.scores)
+        stat = os.stat(self.interactions_csv)
+        os.utime(self.interactions_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        try:
+            self.assertIsNone(AlsoLiked.load(self.interactions_csv, self.id_index, len(self.recipes)))
+        finally:
+            os.utime(self.interactions_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNotNone(AlsoLiked.load(self.interactions_csv, self.id_index, len(self.recipes)))
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import result_cache
+from result_cache import ResultCache, dataset_version, state_key
+
+
+# Bound before the tests count the cache's own directory scans
+_scandir = os.scandir
+
+
+def disk_bytes(directory):
+    return sum(entry.stat().st_size for entry in _scandir(directory) if entry.name.endswith('.npy'))
+
+
+class ResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_state_key_ignores_dict_order(self):
+        self.assertEqual(state_key('recipes', (1, 2), {'a': 1, 'b': [2]}),
+                         state_key('recipes', (1, 2), {'b': [2], 'a': 1}))
+        self.assertNotEqual(state_key('recipes', (1, 2), {'a': 1}), state_key('recipes', (1, 3), {'a': 1}))
+
+    def test_dataset_version_tells_files_and_contents_apart(self):
+        first, second = os.path.join(self.directory, 'a.csv'), os.path.join(self.directory, 'b.csv')
+        for path in (first, second):
+            with open(path, 'w') as f:
+                f.write('x\n1\n')
+            os.utime(path, ns=(10**18, 10**18))
+        # Same size and mtime: only the path differs
+        self.assertNotEqual(dataset_version(first), dataset_version(second))
+        self.assertEqual(dataset_version(first), dataset_version(os.path.join(self.directory, '.', 'a.csv')))
+
+        cache = ResultCache(10**6)
+        cache.rows('recipes', dataset_version(first), {'q': 'x'}, lambda: np.arange(3))
+        rows = cache.rows('recipes', dataset_version(second), {'q': 'x'}, lambda: np.arange(5))
+        self.assertEqual(len(rows), 5)
+
+        version = dataset_version(first)
+        os.utime(first, ns=(10**18, 10**18 + 1))
+        self.assertNotEqual(dataset_version(first), version)
+
+    def test_rows_computes_once_and_shares_read_only_results(self):
+        cache = ResultCache(10**6)
+        calls = []
+        compute = lambda: calls.append(1) or np.arange(10)
+        first = cache.rows('recipes', 1, {'q': 'x'}, compute)
+        second = cache.rows('recipes', 1, {'q': 'x'}, compute)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(first.flags.writeable)
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = ResultCache(budget_bytes=3 * 800)
+        for i in range(3):
+            cache.put(str(i), np.zeros(100, dtype=np.int64))
+        cache.get('0')
+        cache.put('3', np.zeros(100, dtype=np.int64))
+        self.assertIsNone(cache.get('1'))
+        self.assertIsNotNone(cache.get('0'))
+        self.assertLessEqual(cache.stats()['bytes'], cache.budget_bytes)
+
+        cache.put('big', np.zeros(1000, dtype=np.int64))
+        self.assertIsNone(cache.get('big'))
+
+    def test_disk_tier_survives_a_new_cache(self):
+        ResultCache(10**6, self.directory, 10**6).put('k', np.arange(5))
+        cache = ResultCache(10**6, self.directory, 10**6)
+        np.testing.assert_array_equal(cache.get('k'), np.arange(5))
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_disk_tier_stays_within_budget_without_rescanning_every_write(self):
+        rows = np.arange(1000, dtype=np.int64)
+        file_size = 8000 + 128
+        cache = ResultCache(0, self.directory, disk_budget_bytes=20 * file_size)
+        with mock.patch.object(result_cache.os, 'scandir', wraps=_scandir) as scandir:
+            for i in range(100):
+                cache.put(f'key{i}', rows.copy())
+                self.assertLessEqual(disk_bytes(self.directory), cache.disk_budget_bytes)
+        self.assertLess(scandir.call_count, 30)
+        self.assertEqual(cache._disk_nbytes, disk_bytes(self.directory))
+        # The most recent results are the ones kept
+        self.assertIsNotNone(cache.get('key99'))
+        self.assertIsNone(cache.get('key0'))
+
+    def test_rewriting_a_key_does_not_inflate_the_total(self):
+        cache = ResultCache(0, self.directory, disk_budget_bytes=10**6)
+        for _ in range(5):
+            cache.put('same', np.arange(100))
+        self.assertEqual(cache._disk_nbytes, disk_bytes(self.directory))
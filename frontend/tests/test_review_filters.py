@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from foodcom_data import DataDirTestCase
+from review_filters import read_reviews, review_predicates
+from review_search import BM25Index
+from search_backend import ReviewSearch
+
+
+class ReviewFiltersTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.df = read_reviews(cls.interactions_csv)
+        cls.raw = pd.read_csv(cls.interactions_csv)
+        cls.search = ReviewSearch(BM25Index.build(cls.df['review']), cls.df['review'])
+
+    def mask(self, **state):
+        state = {'ratings': [], 'dates': None, 'min_length': None, 'search': '', **state}
+        mask = np.ones(len(self.df), dtype=bool)
+        for _, params, mask_fn in review_predicates(self.df, state, lambda: self.search):
+            if params is not None:
+                mask &= mask_fn()
+        return mask
+
+    def test_read_reviews_adds_dates_and_lengths(self):
+        self.assertEqual(len(self.df), len(self.raw))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(self.df['date']))
+        np.testing.assert_array_equal(self.df['review_length'], self.raw['review'].astype(str).str.len())
+
+    def test_filters_match_pandas(self):
+        dates = pd.to_datetime(self.raw['date'])
+        lengths = self.raw['review'].astype(str).str.len()
+        cases = [
+            ({'ratings': [4, 5]}, self.raw['rating'].isin([4, 5])),
+            ({'dates': ['2005-01-01', None]}, dates >= '2005-01-01'),
+            ({'dates': ['2003-06-01', '2008-12-31']}, dates.between('2003-06-01', '2008-12-31')),
+            ({'min_length': 40}, lengths >= 40),
+            ({'ratings': [0], 'min_length': 20, 'dates': [None, '2010-01-01']},
+             (self.raw['rating'] == 0) & (lengths >= 20) & (dates <= '2010-01-01')),
+        ]
+        for state, expected in cases:
+            np.testing.assert_array_equal(self.mask(**state), expected.to_numpy(), state)
+
+    def test_search_uses_the_index_or_falls_back_to_the_text(self):
+        words = self.raw['review'].fillna('').str.lower().str.split()
+        expected = words.map(lambda items: 'salty' in items and 'chicken' in items)
+        np.testing.assert_array_equal(self.mask(search='salty chicken'), expected.to_numpy())
+        # Stopwords only: BM25 cannot answer, so the raw text is matched
+        expected = self.raw['review'].str.contains('it was', case=False, na=False, regex=False)
+        self.assertGreater(expected.sum(), 0)
+        np.testing.assert_array_equal(self.mask(search='it was'), expected.to_numpy())
@@ -0,0 +1,86 @@
+import math
+import os
+import re
+import shutil
+import sys
+from collections import Counter
+
+import numpy as np
+
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from review_search import B, K1, STOPWORDS, BM25Index, query_terms
+
+
+def tokens(text):
+    if not isinstance(text, str):
+        return []
+    return [token for token in re.findall(r"[^\W_]+", text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+class BM25IndexTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reviews = load_dataset(cls.interactions_csv)['review']
+        cls.index = BM25Index.build(cls.reviews, block_rows=700)
+        cls.docs = [Counter(tokens(text)) for text in cls.reviews]
+
+    def reference(self, query, require_all=True):
+        """BM25 of every review computed directly from its token counts"""
+        terms = list(dict.fromkeys(tokens(query)))
+        lengths = np.array([sum(doc.values()) for doc in self.docs], dtype=np.float64)
+        average = lengths.mean()
+        scores = {}
+        for term in terms:
+            containing = [i for i, doc in enumerate(self.docs) if term in doc]
+            idf = math.log(1 + (len(self.docs) - len(containing) + 0.5) / (len(containing) + 0.5))
+            for i in containing:
+                tf = self.docs[i][term]
+                norm = K1 * (1 - B + B * lengths[i] / average)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        if require_all:
+            scores = {i: s for i, s in scores.items() if all(term in self.docs[i] for term in terms)}
+        return scores
+
+    def assertScoresMatch(self, query, require_all=True):
+        docs, scores = self.index.score(query, require_all)
+        expected = self.reference(query, require_all)
+        self.assertEqual(docs.tolist(), sorted(expected), query)
+        np.testing.assert_allclose(scores, [expected[i] for i in sorted(expected)], rtol=1e-4)
+
+    def test_scores_match_the_formula(self):
+        for query in ['salty', 'too salty', 'kids loved it', 'crème brûlée', 'Chicken, SOUP!']:
+            self.assertScoresMatch(query)
+            self.assertScoresMatch(query, require_all=False)
+
+    def test_matches_agree_with_a_word_scan(self):
+        for word in ['salty', 'cake', 'brûlée']:
+            expected = self.reviews.str.contains(rf"\b{word}\b", case=False, na=False, regex=True)
+            np.testing.assert_array_equal(self.index.score(word)[0], np.flatnonzero(expected.to_numpy()))
+
+    def test_stopwords_and_unknown_terms(self):
+        self.assertEqual(query_terms('the was it'), [])
+        self.assertEqual(len(self.index.score('the')[0]), 0)
+        self.assertEqual(len(self.index.score('salty unknownword')[0]), 0)
+        self.assertGreater(len(self.index.score('salty unknownword', require_all=False)[0]), 0)
+
+    def test_search_and_top_k_are_ordered(self):
+        docs, scores = self.index.search('spicy soup', require_all=False)
+        self.assertTrue((np.diff(scores) <= 0).all())
+        top_docs, top_scores = self.index.top_k('spicy soup', k=5)
+        np.testing.assert_allclose(top_scores, scores[:5])
+
+    def test_nbytes_counts_the_vocabulary(self):
+        arrays = sum(array.nbytes for array in [self.index.offsets, self.index.docs,
+                                                self.index.freqs, self.index.doc_lengths])
+        vocabulary = sum(sys.getsizeof(term) for term in self.index.vocabulary)
+        self.assertGreaterEqual(self.index.nbytes, arrays + vocabulary)
+
+    def test_persisted_index_round_trips(self):
+        shutil.rmtree(os.path.join(self.data_dir, '.cache'), ignore_errors=True)
+        built = BM25Index.load_or_build(self.interactions_csv, self.reviews)
+        loaded = BM25Index.load_or_build(self.interactions_csv, None)
+        self.assertEqual(list(loaded.vocabulary), list(built.vocabulary))
+        for query in ['salty', 'lemon garlic']:
+            np.testing.assert_array_equal(loaded.score(query)[0], built.score(query)[0])
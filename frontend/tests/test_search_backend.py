@@ -0,0 +1,74 @@
+import os
+import re
+from unittest import mock
+
+import numpy as np
+
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from review_filters import read_reviews
+from review_search import STOPWORDS, BM25Index
+import search_backend
+from search_backend import NameSearch, ReviewSearch, fts_query, highlight, search_version
+from trigram_index import TrigramIndex
+
+
+class SearchBackendTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.names = load_dataset(cls.recipes_csv)['name']
+        cls.reviews = read_reviews(cls.interactions_csv)['review']
+        cls.name_search = NameSearch(TrigramIndex.build(cls.names), cls.names)
+        cls.review_search = ReviewSearch(BM25Index.build(cls.reviews), cls.reviews)
+
+    def test_name_matches_are_str_contains(self):
+        for query in ['cake', 'Crème', 'rûl', 'ke ch', 'ch', 'no such name']:
+            expected = np.flatnonzero(self.names.str.lower().str.contains(query.lower(), regex=False, na=False))
+            np.testing.assert_array_equal(self.name_search.matches(query), expected, query)
+
+    def test_name_ranking_puts_exact_names_first(self):
+        rows, scores = self.name_search.ranked('cake')
+        self.assertEqual(sorted(rows), list(self.name_search.matches('cake')))
+        self.assertTrue((np.diff(scores) <= 0).all())
+        if (self.names == 'cake').any():
+            self.assertEqual(self.names.iloc[rows[0]], 'cake')
+
+    def test_review_matches_require_every_word(self):
+        tokens = self.reviews.fillna('').str.lower().map(lambda text: set(re.findall(r'\w+', text)))
+        for query in ['salty', 'loved the chocolate', 'crème brûlée']:
+            words = set(re.findall(r'\w+', query.lower())) - STOPWORDS
+            expected = np.flatnonzero(tokens.map(words.issubset).to_numpy())
+            np.testing.assert_array_equal(self.review_search.matches(query), expected, query)
+        self.assertFalse(self.review_search.accepts('the was it'))
+        self.assertTrue(self.review_search.accepts('salty'))
+
+    def test_snippets_bold_the_query_words(self):
+        rows = self.review_search.ranked('salty')[0][:5]
+        for row, snippet in zip(rows, self.review_search.snippets('salty', rows)):
+            self.assertIn('**salty**', snippet.lower())
+        self.assertEqual(highlight('Crème brûlée', ['crème']), '**Crème** brûlée')
+        self.assertEqual(highlight(float('nan'), ['x']), '')
+        long_text = 'x ' * 200 + 'target'
+        self.assertTrue(highlight(long_text, ['target']).startswith('…'))
+
+    def test_fts_query_quotes_every_word(self):
+        self.assertEqual(fts_query('Crème "brûlée" OR NEAR(x'), '"crème" "brûlée" "or" "near" "x"')
+        self.assertEqual(fts_query("--"), '')
+
+    def test_search_version_follows_the_sqlite_database(self):
+        db_path = os.path.join(self.data_dir, 'search.sqlite3')
+        with open(db_path, 'wb') as db:
+            db.write(b'x')
+        versions = {}
+        for backend in search_backend.BACKENDS:
+            with mock.patch.multiple(search_backend, SEARCH_BACKEND=backend, SEARCH_DB=db_path):
+                before = search_version(self.interactions_csv)
+                stat = os.stat(db_path)
+                os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+                versions[backend] = (before, search_version(self.interactions_csv))
+        index_before, index_after = versions['index']
+        self.assertEqual(index_before, index_after)
+        sqlite_before, sqlite_after = versions['sqlite']
+        self.assertNotEqual(sqlite_before, sqlite_after)
+        self.assertEqual(sqlite_before[:len(index_before)], index_before)
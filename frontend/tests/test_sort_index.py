@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from sort_index import SortIndex
+
+
+class SortIndexTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(3)
+        n = 5000
+        ratings = rng.integers(0, 6, size=n).astype(float)
+        ratings[rng.random(n) < 0.05] = np.nan
+        dates = pd.Series(np.datetime64('2005-01-01') + rng.integers(0, 3000, size=n)).astype('datetime64[ns]')
+        dates[rng.random(n) < 0.05] = pd.NaT
+        cls.df = pd.DataFrame({'rating': ratings, 'date': dates})
+        cls.mask = rng.random(n) < 0.3
+
+    def expected(self, column, ascending, mask=None):
+        """The pandas path: a stable sort with missing values last"""
+        df = self.df if mask is None else self.df[mask]
+        order = df.sort_values(column, ascending=ascending, kind='stable', na_position='last').index
+        return order.to_numpy()
+
+    def test_order_matches_sort_values(self):
+        for column in ['rating', 'date']:
+            for ascending in [True, False]:
+                index = SortIndex.build(self.df[column], ascending)
+                np.testing.assert_array_equal(index.order(), self.expected(column, ascending))
+                np.testing.assert_array_equal(index.order(self.mask), self.expected(column, ascending, self.mask))
+
+    def test_page(self):
+        index = SortIndex.build(self.df['rating'], ascending=False)
+        np.testing.assert_array_equal(index.page(self.mask, 40, 20),
+                                      self.expected('rating', False, self.mask)[40:60])
+
+    def test_page_after_walks_the_whole_view(self):
+        index = SortIndex.build(self.df['date'])
+        expected = self.expected('date', True, self.mask)
+        for limit, block in [(25, 64), (100, 65536), (7, 3)]:
+            pages, cursor = [], 0
+            while cursor is not None:
+                rows, cursor = index.page_after(self.mask, cursor, limit, block=block)
+                self.assertLessEqual(len(rows), limit)
+                pages.append(rows)
+            np.testing.assert_array_equal(np.concatenate(pages), expected)
+
+    def test_page_after_cursor_resumes_after_the_last_row(self):
+        index = SortIndex.build(self.df['rating'])
+        rows, cursor = index.page_after(self.mask, 0, 10)
+        following, _ = index.page_after(self.mask, cursor, 10)
+        np.testing.assert_array_equal(np.concatenate([rows, following]),
+                                      self.expected('rating', True, self.mask)[:20])
+
+    def test_page_after_without_mask_and_past_the_end(self):
+        index = SortIndex.build(self.df['rating'])
+        rows, cursor = index.page_after(None, len(self.df) - 3, 10)
+        np.testing.assert_array_equal(rows, index.permutation[-3:])
+        self.assertIsNone(cursor)
+        rows, cursor = index.page_after(np.zeros(len(self.df), dtype=bool), 0, 10)
+        self.assertEqual(len(rows), 0)
+        self.assertIsNone(cursor)
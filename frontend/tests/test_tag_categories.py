@@ -0,0 +1,52 @@
+import unittest
+
+import pandas as pd
+
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from tag_categories import CATEGORIES, CATEGORY_KEYWORDS, OTHER, TagCategories, classify_tag, tag_label
+
+
+def scan_breakdown(tags):
+    """The per-render keyword loop the table replaces: tag labels per category"""
+    groups = [[] for _ in CATEGORIES]
+    for tag in tags if tags is not None else []:
+        code = classify_tag(tag)
+        groups[code].append(tag_label(tag))
+    return groups
+
+
+class TagCategoriesTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tags = load_dataset(cls.recipes_csv)['tags']
+        cls.table = TagCategories.build(cls.tags)
+
+    def test_classify_tag_takes_the_first_matching_category(self):
+        self.assertEqual(CATEGORIES[classify_tag('mexican')], 'cuisine')
+        self.assertEqual(CATEGORIES[classify_tag('Low-Fat')], 'diet')
+        # 'healthy' (diet) comes before 'party' (occasion)
+        self.assertEqual(CATEGORIES[classify_tag('healthy-party-snacks')], 'diet')
+        self.assertEqual(classify_tag('main-dish'), OTHER)
+        self.assertEqual(len(CATEGORIES), len(CATEGORY_KEYWORDS) + 1)
+
+    def test_breakdown_matches_a_scan_of_every_recipe(self):
+        for row, tags in enumerate(self.tags):
+            breakdown = self.table.breakdown(row)
+            self.assertEqual([list(self.table.labels[ids]) for ids in breakdown], scan_breakdown(tags), row)
+
+    def test_hidden_tags(self):
+        hidden = {self.table.labels[i] for i in range(len(self.table.labels)) if self.table.hidden[i]}
+        self.assertEqual(hidden, {'Time To Make', 'Course'})
+
+    def test_rows_without_tags(self):
+        table = TagCategories.build(pd.Series([['easy'], [], None, ['italian', 'oven']], dtype=object))
+        self.assertEqual([len(ids) for ids in table.breakdown(1)], [0] * len(CATEGORIES))
+        self.assertEqual([len(ids) for ids in table.breakdown(2)], [0] * len(CATEGORIES))
+        self.assertEqual([list(table.labels[ids]) for ids in table.breakdown(3)],
+                         [['Italian'], [], ['Oven'], [], []])
+
+
+if __name__ == '__main__':
+    unittest.main()
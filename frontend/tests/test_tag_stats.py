@@ -0,0 +1,92 @@
+import ast
+import itertools
+import os
+import unittest
+from collections import Counter
+
+import pandas as pd
+
+import analyze_tags
+from bitmap_index import BitmapIndex
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from recipe_filters import CATEGORY_FILTERS, CATEGORY_GROUPS, category_options
+from tag_stats import TagStats
+
+
+class TagStatisticsJobTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.recipes, cls.tag_counts, cls.pair_counts, cls.group_counts = analyze_tags.count_tags(
+            cls.recipes_csv, workers=2, chunksize=70)
+        # The per-row ast path the job replaced
+        cls.tag_sets = [set(ast.literal_eval(value)) for value in pd.read_csv(cls.recipes_csv)['tags']]
+
+    def test_counts_match_literal_eval(self):
+        self.assertEqual(self.recipes, self.n_recipes)
+        self.assertEqual(self.tag_counts, Counter(tag for tags in self.tag_sets for tag in tags))
+        pairs = Counter(pair for tags in self.tag_sets for pair in itertools.combinations(sorted(tags), 2))
+        self.assertEqual(self.pair_counts, pairs)
+
+    def test_group_counts_are_unions(self):
+        self.assertEqual(set(self.group_counts), set(CATEGORY_GROUPS))
+        for group, count in self.group_counts.items():
+            self.assertEqual(count, sum(1 for tags in self.tag_sets if tags & set(group)), group)
+
+    def test_artifact_round_trips_and_goes_stale(self):
+        analyze_tags.write_artifact(self.recipes_csv, self.recipes, self.tag_counts, self.pair_counts,
+                                    self.group_counts)
+        stats = TagStats.load(self.recipes_csv)
+        self.assertEqual(stats.counts, dict(self.tag_counts))
+        self.assertEqual(stats.recipes, self.n_recipes)
+        self.assertTrue(stats.has_pairs)
+        for group, count in self.group_counts.items():
+            self.assertEqual(stats.count_any(group), count)
+
+        stat = os.stat(self.recipes_csv)
+        os.utime(self.recipes_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.addCleanup(os.utime, self.recipes_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(TagStats.load(self.recipes_csv))
+
+    def test_index_fallback_agrees_with_the_job(self):
+        index = BitmapIndex.build(load_dataset(self.recipes_csv)['tags'])
+        stats = TagStats.from_index(index, CATEGORY_GROUPS)
+        self.assertEqual(stats.counts, dict(self.tag_counts))
+        self.assertFalse(stats.has_pairs)
+        for group, count in self.group_counts.items():
+            self.assertEqual(stats.count_any(group), count)
+
+
+class TagStatsTests(unittest.TestCase):
+    def setUp(self):
+        self.stats = TagStats({'a': 5, 'b': 3, 'c': 3}, pairs=[['a', 'b', 2], ['b', 'c', 1]], recipes=10,
+                              groups={('a', 'b'): 6})
+
+    def test_most_common_and_related(self):
+        self.assertEqual(self.stats.most_common(), ['a', 'b', 'c'])
+        self.assertEqual(self.stats.most_common(exclude=['a']), ['b', 'c'])
+        self.assertEqual(self.stats.related(['b']), [('a', 2), ('c', 1)])
+
+    def test_count_any(self):
+        self.assertEqual(self.stats.count_any(['a']), 5)
+        self.assertEqual(self.stats.count_any(['b', 'a', 'a']), 6)
+        # Not a counted group: the largest single count is a lower bound
+        self.assertEqual(self.stats.count_any(['b', 'c']), 3)
+        self.assertEqual(self.stats.count_any([]), 0)
+
+
+class CategoryOptionsTests(unittest.TestCase):
+    def test_options_are_built_and_ordered_from_the_statistics(self):
+        counts = {'italian': 40, 'greek': 70, 'mexican': 0, 'american': 10, 'north-american': 30,
+                  'vegan': 5, 'not-a-category': 99}
+        stats = TagStats(counts, groups={('american', 'north-american'): 35})
+        sections = {title: options for title, _, _, options in category_options(stats)}
+        self.assertEqual(len(sections), len(CATEGORY_FILTERS))
+
+        cuisines = sections["🌍 World Cuisines"]
+        self.assertEqual(list(cuisines), ['Greek', '🇮🇹 Italian', '🇺🇸 American'])
+        self.assertEqual(cuisines['Greek'], (['greek'], 70))
+        self.assertEqual(cuisines['🇺🇸 American'][1], 35)
+        self.assertEqual(list(sections["🥗 Diet & Health"]), ['🌿 Vegan'])
+        self.assertFalse(any('Not A Category' in options for options in sections.values()))
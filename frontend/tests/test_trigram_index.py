@@ -0,0 +1,49 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from columnar_cache import load_dataset
+from foodcom_data import DataDirTestCase
+from trigram_index import TrigramIndex
+
+
+class TrigramIndexTests(DataDirTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.names = load_dataset(cls.recipes_csv)['name']
+        cls.index = TrigramIndex.build(cls.names)
+
+    def expected(self, term):
+        """The pandas path the index replaces"""
+        return np.flatnonzero(self.names.str.contains(term, case=False, na=False, regex=False).to_numpy())
+
+    def test_search_matches_str_contains(self):
+        for term in ['chicken', 'Cake', 'late c', 'cake chicken', 'crème', 'BRÛLÉE', 'zz', 'x', 'no such name']:
+            np.testing.assert_array_equal(self.index.search(term), self.expected(term), term)
+
+    def test_candidates_are_a_superset(self):
+        for term in ['chocolate', 'ake', 'pie bread']:
+            self.assertTrue(set(self.expected(term)) <= set(self.index.candidates(term)))
+        self.assertIsNone(self.index.candidates('ab'))
+
+    def test_mask(self):
+        np.testing.assert_array_equal(np.flatnonzero(self.index.mask('soup')), self.expected('soup'))
+
+    def test_trigrams_do_not_span_names(self):
+        index = TrigramIndex.build(pd.Series(['abc', 'def', None, 'cde']))
+        np.testing.assert_array_equal(index.search('cde'), [3])
+        np.testing.assert_array_equal(index.search('bcd'), [])
+
+    def test_empty(self):
+        index = TrigramIndex.build(pd.Series([], dtype=object))
+        self.assertEqual(len(index.search('abc')), 0)
+
+    def test_persisted_index_round_trips(self):
+        shutil.rmtree(os.path.join(self.data_dir, '.cache'), ignore_errors=True)
+        TrigramIndex.load_or_build(self.recipes_csv, self.names)
+        loaded = TrigramIndex.load_or_build(self.recipes_csv, self.names)
+        np.testing.assert_array_equal(loaded.keys, self.index.keys)
+        np.testing.assert_array_equal(loaded.search('garlic'), self.expected('garlic'))
@@ -0,0 +1,139 @@
+"""Trigram index for substring search over recipe names.
+
+Every lowercased name is split into overlapping 3-character windows and
+each distinct trigram maps to the sorted row positions containing it. A
+substring query intersects the posting lists of its own trigrams to get a
+small candidate set, then verifies the candidates with Arrow's vectorized
+substring match.
+
+The postings are persisted next to the columnar cache (``*.trigrams.npz``)
+and rebuilt only when the source CSV changes.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from columnar_cache import artifact_path, cache_dir_for, is_artifact_fresh, mark_artifact_fresh
+
+ARTIFACT_SUFFIX = "trigrams.npz"
+
+
+def _codepoints(text):
+    """Unicode code points of a string as uint64"""
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+
+def _trigram_keys(codes, rows=None):
+    """Pack each 3-character window into one integer (21 bits per code point)"""
+    c0, c1, c2 = codes[:-2], codes[1:-1], codes[2:]
+    keys = (c0 << np.uint64(42)) | (c1 << np.uint64(21)) | c2
+    # Windows touching the row separator (code point 0) span two names
+    valid = (c0 != 0) & (c1 != 0) & (c2 != 0)
+    if rows is None:
+        return keys[valid]
+    return keys[valid], rows[:-2][valid]
+
+
+def lowercase_names(names):
+    """Lowercased names as an Arrow string array, '' for missing names"""
+    names = pa.array(pd.Series(names, dtype=object).where(pd.notna(names), ''), type=pa.string())
+    return pc.utf8_lower(names)
+
+
+class TrigramIndex:
+    """Trigram -> sorted row positions, plus the lowercased names for verification"""
+
+    def __init__(self, names, keys, offsets, postings):
+        self.names = names
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+
+    @classmethod
+    def build(cls, names):
+        """Build the index from a column of names"""
+        names = lowercase_names(names)
+        if len(names) == 0:
+            empty = np.empty(0, dtype=np.uint64)
+            return cls(names, empty, np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32))
+
+        codes = _codepoints('\x00'.join(names.to_pylist()))
+        lengths = pc.utf8_length(names).to_numpy().astype(np.int64)
+        rows = np.repeat(np.arange(len(names), dtype=np.int32), lengths + 1)[:len(codes)]
+        keys, rows = _trigram_keys(codes, rows)
+
+        # Sort by (trigram, row) and drop repeated trigrams within a name
+        order = np.lexsort((rows, keys))
+        keys, rows = keys[order], rows[order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+        keys, rows = keys[first], rows[first]
+
+        vocabulary, starts = np.unique(keys, return_index=True)
+        offsets = np.append(starts, len(keys)).astype(np.int64)
+        return cls(names, vocabulary, offsets, rows)
+
+    @classmethod
+    def load_or_build(cls, csv_path, names):
+        """Load the persisted index for csv_path, rebuilding it if the CSV changed"""
+        path = artifact_path(csv_path, ARTIFACT_SUFFIX)
+        if is_artifact_fresh(csv_path, ARTIFACT_SUFFIX):
+            with np.load(path) as data:
+                return cls(lowercase_names(names), data['keys'], data['offsets'], data['postings'])
+
+        index = cls.build(names)
+        os.makedirs(cache_dir_for(csv_path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, keys=index.keys, offsets=index.offsets, postings=index.postings)
+        os.replace(tmp_path, path)
+        mark_artifact_fresh(csv_path, ARTIFACT_SUFFIX)
+        return index
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.offsets.nbytes + self.postings.nbytes
+
+    def _posting(self, key):
+        pos = np.searchsorted(self.keys, key)
+        if pos == len(self.keys) or self.keys[pos] != key:
+            return None
+        return self.postings[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def candidates(self, term):
+        """Row positions that contain every trigram of term (None if term is too short)"""
+        term = term.lower()
+        if len(term) < 3:
+            return None
+        postings = []
+        for key in np.unique(_trigram_keys(_codepoints(term))):
+            posting = self._posting(key)
+            if posting is None:
+                return np.empty(0, dtype=np.int32)
+            postings.append(posting)
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            result = np.intersect1d(result, posting, assume_unique=True)
+            if len(result) == 0:
+                break
+        return result
+
+    def search(self, term):
+        """Sorted row positions whose name contains term (case-insensitive)"""
+        term = term.lower()
+        candidates = self.candidates(term)
+        if candidates is None:
+            found = pc.match_substring(self.names, term).to_numpy(zero_copy_only=False)
+            return np.flatnonzero(found).astype(np.int32)
+        # Verify: the trigrams may all occur without forming the substring
+        found = pc.match_substring(self.names.take(candidates), term).to_numpy(zero_copy_only=False)
+        return candidates[found]
+
+    def mask(self, term):
+        """Boolean mask over all rows of names containing term"""
+        mask = np.zeros(len(self.names), dtype=bool)
+        mask[self.search(term)] = True
+        return mask
@@ -1,6 +1,18 @@
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        # The search API and the import command reuse the Streamlit app's modules
+        if str(settings.FRONTEND_DIR) not in sys.path:
+            sys.path.insert(0, str(settings.FRONTEND_DIR))
+
+        from users.search_tables import ensure_triggers
+        post_migrate.connect(ensure_triggers, sender=self)
@@ -0,0 +1,135 @@
+"""Streaming exports of filtered recipes and reviews.
+
+An export is a boolean mask over one of the shared in-process frames (the
+filter masks are cached by filter_engine, as for the search API and the
+Streamlit views) plus an optional sort permutation. The mask is scanned
+block by block, and each chunk of selected rows is encoded on a worker
+thread. So an export holds at most one chunk of output at a time, however
+many rows it selects, and encoding never blocks the event loop.
+
+Backpressure comes from the ASGI server. Django's ASGI handler awaits
+send() for every chunk the response iterator yields, and the server holds
+send() while the client is behind. The next chunk is therefore only
+encoded once the previous one has gone out.
+"""
+import json
+
+import numpy as np
+from asgiref.sync import sync_to_async
+
+from columnar_cache import FLOAT_LIST_COLUMNS, STRING_LIST_COLUMNS
+from filter_engine import evaluate
+from recipe_loaders import load_recipes, load_sort_index
+from review_filters import review_predicates
+from review_loaders import load_review_search, load_reviews
+from search_backend import search_version
+
+from .recipe_search import SearchError, _list_param, _number_param, parse_query, select
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+CHUNK_ROWS = 1000
+SCAN_BLOCK_ROWS = 65536
+# Derived by read_reviews, not part of RAW_interactions.csv
+REVIEW_DERIVED_COLUMNS = ['review_length']
+
+
+def _date_param(params, name):
+    value = params.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return str(np.datetime64(value, 'D'))
+    except ValueError:
+        raise SearchError(f"{name} must be a date (YYYY-MM-DD)") from None
+
+
+def parse_review_query(params):
+    """Canonical review filter state (see review_filters) of a query string"""
+    try:
+        ratings = sorted({int(rating) for rating in _list_param(params, 'rating')})
+    except ValueError:
+        raise SearchError("rating must be a number") from None
+    dates = [_date_param(params, 'date_min'), _date_param(params, 'date_max')]
+    return {
+        'ratings': ratings,
+        'dates': dates if dates != [None, None] else None,
+        'min_length': _number_param(params, 'min_length'),
+        'search': params.get('q', '').strip().lower(),
+    }
+
+
+def select_recipes(file_path, params):
+    """(frame, mask, order) of the recipes selected by a search API query string"""
+    state, sort, _, _ = parse_query(params)
+    keep = select(file_path, state)
+    order = None
+    if sort:
+        order = load_sort_index(file_path, sort.lstrip('-'), not sort.startswith('-')).permutation
+    return load_recipes(file_path), keep, order
+
+
+def select_reviews(file_path, params):
+    """(frame, mask, order) of the reviews selected by a query string, in file order"""
+    state = parse_review_query(params)
+    df = load_reviews(file_path)
+    predicates = review_predicates(df, state, lambda: load_review_search(file_path))
+    keep = evaluate("reviews", search_version(file_path), len(df), predicates)
+    return df.drop(columns=REVIEW_DERIVED_COLUMNS, errors='ignore'), keep, None
+
+
+def row_chunks(keep, order=None, chunk_rows=CHUNK_ROWS, block_rows=SCAN_BLOCK_ROWS):
+    """Selected row positions in output order, at most chunk_rows at a time
+
+    Without order the rows come in file order. The mask is scanned one
+    block at a time, so no array of all selected rows is ever built.
+    """
+    total = len(keep) if order is None else len(order)
+    for start in range(0, total, block_rows):
+        if order is None:
+            rows = start + np.flatnonzero(keep[start:start + block_rows])
+        else:
+            block = order[start:start + block_rows]
+            rows = block[keep[block]]
+        for offset in range(0, len(rows), chunk_rows):
+            yield rows[offset:offset + chunk_rows]
+
+
+def _json_list(value):
+    return '' if value is None else json.dumps(np.asarray(value).tolist())
+
+
+def encode_chunk(df, rows, fmt, header):
+    """Rows of df as NDJSON lines or CSV records, in bytes"""
+    # Arrow-backed columns concatenate every chunk a take spans: narrow to the rows' span first
+    low = rows.min()
+    chunk = df.iloc[low:rows.max() + 1].iloc[rows - low]
+    datetimes = chunk.select_dtypes('datetime').columns
+    chunk = chunk.assign(**{column: chunk[column].dt.strftime('%Y-%m-%d') for column in datetimes})
+    if fmt == 'ndjson':
+        return chunk.to_json(orient='records', lines=True).rstrip('\n').encode('utf-8') + b'\n'
+    # List columns as JSON arrays, one CSV field each
+    lists = [column for column in STRING_LIST_COLUMNS + FLOAT_LIST_COLUMNS if column in chunk.columns]
+    chunk = chunk.assign(**{column: chunk[column].map(_json_list) for column in lists})
+    return chunk.to_csv(index=False, header=header).encode('utf-8')
+
+
+def encoded_chunks(df, keep, order, fmt):
+    """The whole export as a blocking iterator of byte chunks"""
+    header = True
+    for rows in row_chunks(keep, order):
+        yield encode_chunk(df, rows, fmt, header)
+        header = False
+    if header and fmt == 'csv':
+        # Nothing selected: still name the columns
+        yield df.iloc[:0].to_csv(index=False).encode('utf-8')
+
+
+async def stream_in_thread(iterator):
+    """Async iterator over a blocking iterator, advanced on a worker thread"""
+    advance = sync_to_async(next, thread_sensitive=False)
+    done = object()
+    while (item := await advance(iterator, done)) is not done:
+        yield item
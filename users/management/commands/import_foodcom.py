@@ -0,0 +1,287 @@
+"""Bulk-load the Food.com CSVs into the Recipe, Tag and Interaction tables.
+
+Both files are streamed in chunks; each chunk is parsed with the batch
+literal parser of the Streamlit app and written inside its own
+transaction. Recipes and tags go through bulk_create; the two large tables
+(recipe-tag links and interactions) hold only plain columns and are
+written as plain tuples per chunk, skipping the per-row cost of model
+instances: with COPY on PostgreSQL, with one executemany elsewhere. The
+secondary indexes of Recipe, Interaction and the recipe-tag table are
+dropped before the load and rebuilt once at the end, which is much cheaper
+than maintaining them row by row. The tables are emptied first, so running
+the command again reloads the data.
+
+Each interaction is stored under its CSV row position + 1, so the id maps
+straight back to a row of the app's reviews frame; the id sequences are
+reset past the loaded ids afterwards, so rows created later through the
+ORM do not collide with them. On SQLite the triggers that keep the FTS5
+search tables in step (see users.search_tables) are dropped too, and the
+tables are rebuilt in one pass once the load is done.
+
+Usage (from the repository root):
+
+    python backend/manage.py import_foodcom --recipes data/RAW_recipes.csv \\
+        --interactions data/RAW_interactions.csv
+"""
+import io
+import os
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from literal_parser import parse_float_lists, parse_string_lists
+from users.models import Interaction, Recipe, Tag, ingredients_text
+from users.search_tables import RECIPE_FTS_TABLE, REVIEW_FTS_TABLE, rebuild
+
+DEFAULT_CHUNKSIZE = 20000
+RecipeTag = Recipe.tags.through
+
+
+def _text(value):
+    return value if isinstance(value, str) else ''
+
+
+def _dates(column):
+    """ISO date of each value, None where it does not parse"""
+    dates = pd.to_datetime(column, errors='coerce').dt.strftime('%Y-%m-%d')
+    return dates.astype(object).where(dates.notna(), None).tolist()
+
+
+def _copy_text(value):
+    """A value in COPY's text format"""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copy_rows(cursor, table, columns, rows):
+    """COPY tuples into a PostgreSQL table with whichever psycopg version Django runs on"""
+    sql = f"COPY {table} ({columns}) FROM STDIN"
+    driver_cursor = cursor.cursor
+    if hasattr(driver_cursor, 'copy'):
+        # psycopg 3
+        with driver_cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+    else:
+        # psycopg2
+        data = io.StringIO(''.join('\t'.join(map(_copy_text, row)) + '\n' for row in rows))
+        driver_cursor.copy_expert(sql, data)
+
+
+def insert_rows(model, fields, rows):
+    """Insert tuples of field values in one statement, bypassing model instances"""
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ', '.join(quote(model._meta.get_field(field).column) for field in fields)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            copy_rows(cursor, table, columns, rows)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+
+
+def _index_ddl(cursor, table):
+    """(drop, create) statements of the indexes and unique constraints of a table, except its primary key
+
+    The create statements are the table's own DDL as the database reports
+    it (sqlite_master on SQLite, pg_indexes and pg_get_constraintdef on
+    PostgreSQL), so dropped indexes come back exactly as they were. Other
+    databases keep their indexes.
+    """
+    quote = connection.ops.quote_name
+    statements = []
+    for name, constraint in connection.introspection.get_constraints(cursor, table).items():
+        if constraint['primary_key'] or not (constraint['index'] or constraint['unique']):
+            continue
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = %s", [name])
+            row = cursor.fetchone()
+            # Indexes SQLite makes for constraints in the table definition have no SQL and cannot be dropped
+            if row is not None and row[0] is not None:
+                statements.append((f"DROP INDEX {quote(name)}", row[0]))
+        elif connection.vendor == 'postgresql':
+            if constraint['index']:
+                cursor.execute("SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() "
+                               "AND indexname = %s", [name])
+                statements.append((f"DROP INDEX {quote(name)}", cursor.fetchone()[0]))
+            else:
+                cursor.execute("SELECT pg_get_constraintdef(oid) FROM pg_constraint "
+                               "WHERE conname = %s AND conrelid = %s::regclass", [name, table])
+                statements.append((f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}",
+                                   f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {cursor.fetchone()[0]}"))
+    return statements
+
+
+@contextmanager
+def dropped_indexes(models, tables, log):
+    """Drop secondary indexes for the duration of the block, then rebuild them
+
+    models lose their Meta.indexes. tables (auto-created many-to-many
+    models, which declare none) lose every index and unique constraint,
+    recreated afterwards from the DDL read before dropping them.
+    """
+    with connection.cursor() as cursor:
+        table_ddl = [statements for model in tables for statements in _index_ddl(cursor, model._meta.db_table)]
+    with connection.schema_editor() as editor:
+        for model in models:
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+        for drop, _ in table_ddl:
+            editor.execute(drop)
+    try:
+        yield
+    finally:
+        start = time.perf_counter()
+        with connection.schema_editor() as editor:
+            for model in models:
+                for index in model._meta.indexes:
+                    editor.add_index(model, index)
+            for _, create in table_ddl:
+                editor.execute(create)
+        log(f"Rebuilt indexes in {time.perf_counter() - start:.1f}s")
+
+
+@contextmanager
+def dropped_triggers(models):
+    """Drop the SQLite triggers on the tables of models for the duration of the block, then recreate them"""
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+                       f"AND tbl_name IN ({', '.join(['%s'] * len(tables))})", tables)
+        triggers = cursor.fetchall()
+        for name, _ in triggers:
+            cursor.execute(f"DROP TRIGGER {connection.ops.quote_name(name)}")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in triggers:
+                cursor.execute(sql)
+
+
+def reset_sequences(models):
+    """Move the id sequences of models past the largest loaded id (a no-op on SQLite)"""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+class Command(BaseCommand):
+    help = "Load RAW_recipes.csv and RAW_interactions.csv into the database, replacing existing rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', default='data/RAW_recipes.csv')
+        parser.add_argument('--interactions', default='data/RAW_interactions.csv')
+        parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="rows per batch")
+
+    def handle(self, *args, **options):
+        for path in (options['recipes'], options['interactions']):
+            if not os.path.exists(path):
+                raise CommandError(f"{path} not found")
+        chunksize = options['chunksize']
+
+        if connection.vendor == 'sqlite':
+            # A failed import is simply rerun, so skip the per-commit fsyncs
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
+                cursor.execute('PRAGMA journal_mode = MEMORY')
+
+        if connection.vendor == 'sqlite':
+            # Row-by-row FTS5 updates from the triggers would cost more than one rebuild
+            with dropped_triggers([Recipe, Interaction]):
+                self.load(options, chunksize)
+                self.rebuild_search_tables()
+        else:
+            self.load(options, chunksize)
+
+    def load(self, options, chunksize):
+        tables = [model._meta.db_table for model in (Interaction, RecipeTag, Recipe, Tag)]
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, reset_sequences=True))
+
+        with dropped_indexes([Recipe, Interaction], [RecipeTag], self.stdout.write):
+            recipe_ids = self.load_recipes(options['recipes'], chunksize)
+            self.load_interactions(options['interactions'], chunksize, recipe_ids)
+        reset_sequences([Interaction, RecipeTag, Recipe, Tag])
+
+    def report(self, what, rows, start, extra=''):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{rows:,} {what} in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s){extra}")
+
+    def load_recipes(self, path, chunksize):
+        """Load recipes, their tags and the recipe-tag links; returns the loaded recipe ids"""
+        start = time.perf_counter()
+        tag_ids = {}
+        recipe_ids = set()
+        links = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            tags = parse_string_lists(chunk['tags'])
+            steps = parse_string_lists(chunk['steps'])
+            ingredients = parse_string_lists(chunk['ingredients'])
+            nutrition = parse_float_lists(chunk['nutrition'])
+            submitted = _dates(chunk['submitted'])
+
+            recipes = []
+            recipe_tags = []
+            columns = ['id', 'name', 'minutes', 'contributor_id', 'n_steps', 'n_ingredients', 'description']
+            for i, (recipe_id, name, minutes, contributor_id, n_steps, n_ingredients, description) in enumerate(
+                    zip(*(chunk[column].tolist() for column in columns))):
+                if recipe_id in recipe_ids:
+                    continue
+                recipe_ids.add(recipe_id)
+                recipes.append(Recipe(
+                    id=recipe_id, name=_text(name), minutes=minutes, contributor_id=contributor_id,
+                    submitted=submitted[i], n_steps=n_steps, n_ingredients=n_ingredients,
+                    description=_text(description), steps=steps[i] or [],
+                    ingredients=ingredients[i] or [], ingredients_text=ingredients_text(ingredients[i]),
+                    nutrition=nutrition[i] or [],
+                ))
+                recipe_tags.extend((recipe_id, tag) for tag in set(tags[i] or []))
+
+            with transaction.atomic():
+                new_tags = {tag for _, tag in recipe_tags} - tag_ids.keys()
+                if new_tags:
+                    Tag.objects.bulk_create([Tag(name=tag) for tag in sorted(new_tags)])
+                    tag_ids.update(Tag.objects.filter(name__in=new_tags).values_list('name', 'id'))
+                Recipe.objects.bulk_create(recipes)
+                insert_rows(RecipeTag, ['recipe', 'tag'],
+                            [(recipe_id, tag_ids[tag]) for recipe_id, tag in recipe_tags])
+            links += len(recipe_tags)
+            self.report("recipes", len(recipe_ids), start)
+
+        self.report("recipes", len(recipe_ids), start, f", {len(tag_ids):,} tags, {links:,} recipe tags")
+        return recipe_ids
+
+    def load_interactions(self, path, chunksize, recipe_ids):
+        start = time.perf_counter()
+        loaded = skipped = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            # Row position in the file + 1, kept for skipped rows too
+            ids = (chunk.index + 1).tolist()
+            known = chunk['recipe_id'].isin(recipe_ids).to_numpy()
+            skipped += int((~known).sum())
+            chunk = chunk[known]
+            ids = [row_id for row_id, keep in zip(ids, known) if keep]
+            rows = list(zip(ids, chunk['user_id'].tolist(), chunk['recipe_id'].tolist(), _dates(chunk['date']),
+                            chunk['rating'].tolist(), [_text(review) for review in chunk['review'].tolist()]))
+            with transaction.atomic():
+                insert_rows(Interaction, ['id', 'user_id', 'recipe', 'date', 'rating', 'review'], rows)
+            loaded += len(rows)
+            self.report("interactions", loaded, start)
+
+        extra = f", skipped {skipped:,} of unknown recipes" if skipped else ''
+        self.report("interactions", loaded, start, extra)
+
+    def rebuild_search_tables(self):
+        """Reindex the FTS5 tables from their content tables in one pass"""
+        start = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            rebuild(cursor, [RECIPE_FTS_TABLE, REVIEW_FTS_TABLE])
+        self.stdout.write(f"Rebuilt search tables in {time.perf_counter() - start:.1f}s")
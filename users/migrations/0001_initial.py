@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Recipe',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('minutes', models.IntegerField()),
+                ('contributor_id', models.IntegerField()),
+                ('submitted', models.DateField(null=True)),
+                ('n_steps', models.IntegerField()),
+                ('n_ingredients', models.IntegerField()),
+                ('description', models.TextField(blank=True)),
+                ('steps', models.JSONField(default=list)),
+                ('ingredients', models.JSONField(default=list)),
+                ('nutrition', models.JSONField(default=list)),
+                ('tags', models.ManyToManyField(related_name='recipes', to='users.tag')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Interaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('date', models.DateField(null=True)),
+                ('rating', models.SmallIntegerField()),
+                ('review', models.TextField(blank=True)),
+                ('recipe', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='interactions', to='users.recipe')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['recipe', 'date'], name='interaction_recipe_date_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['minutes'], name='recipe_minutes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['n_ingredients'], name='recipe_n_ingredients_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+"""Plain-text recipe ingredients, and the FTS5 search tables with their sync triggers (SQLite only).
+
+FTS5 cannot read the JSON ingredient lists directly (JSONField stores
+non-ASCII characters as \\uXXXX escapes, so "crème" would never match), so
+Recipe.ingredients_text holds them as plain text, written by import_foodcom
+and Recipe.save(). See users.search_tables for the tables and triggers.
+"""
+from django.db import migrations, models
+
+from users.search_tables import RECIPE_FTS_TABLE, REVIEW_FTS_TABLE, TABLES, TRIGGERS, rebuild
+
+
+def fill_ingredients_text(apps, schema_editor):
+    Recipe = apps.get_model('users', 'Recipe')
+    batch = []
+    for recipe in Recipe.objects.only('id', 'ingredients').iterator(chunk_size=10000):
+        recipe.ingredients_text = ', '.join(recipe.ingredients or [])
+        batch.append(recipe)
+        if len(batch) == 10000:
+            Recipe.objects.bulk_update(batch, ['ingredients_text'], batch_size=1000)
+            batch = []
+    Recipe.objects.bulk_update(batch, ['ingredients_text'], batch_size=1000)
+
+
+def create_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in [*TABLES, *(statement for _, statement in TRIGGERS.values())]:
+            schema_editor.execute(statement)
+        # Index whatever was imported before this migration
+        with schema_editor.connection.cursor() as cursor:
+            rebuild(cursor, [RECIPE_FTS_TABLE, REVIEW_FTS_TABLE])
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for name in TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for table in (REVIEW_FTS_TABLE, RECIPE_FTS_TABLE):
+            schema_editor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(fill_ingredients_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -1,3 +1,66 @@
 from django.db import models
 
-# Create your models here.
+
+def ingredients_text(ingredients):
+    """Plain-text form of an ingredient list, as indexed by the recipe search table"""
+    return ', '.join(ingredients or [])
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Recipe(models.Model):
+    # Food.com recipe id, so interactions reference recipes by their dataset id
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=255, blank=True)
+    minutes = models.IntegerField()
+    contributor_id = models.IntegerField()
+    submitted = models.DateField(null=True)
+    n_steps = models.IntegerField()
+    n_ingredients = models.IntegerField()
+    description = models.TextField(blank=True)
+    steps = models.JSONField(default=list)
+    ingredients = models.JSONField(default=list)
+    # The ingredients as plain text, for the FTS5 table (see search_tables); kept in step by save()
+    ingredients_text = models.TextField(blank=True, default='')
+    # Calories, then % daily value of fat, sugar, sodium, protein, saturated fat, carbs
+    nutrition = models.JSONField(default=list)
+    tags = models.ManyToManyField(Tag, related_name='recipes')
+
+    class Meta:
+        # Declared here rather than with db_index so the import command can drop and rebuild them
+        indexes = [
+            models.Index(fields=['minutes'], name='recipe_minutes_idx'),
+            models.Index(fields=['n_ingredients'], name='recipe_n_ingredients_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.ingredients_text = ingredients_text(self.ingredients)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'ingredients' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'ingredients_text'}
+        super().save(*args, **kwargs)
+
+
+class Interaction(models.Model):
+    user_id = models.IntegerField()
+    # The (recipe, date) index below also serves lookups by recipe alone
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='interactions', db_index=False)
+    date = models.DateField(null=True)
+    rating = models.SmallIntegerField()
+    review = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipe', 'date'], name='interaction_recipe_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.recipe_id}: {self.rating}"
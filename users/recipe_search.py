@@ -0,0 +1,156 @@
+"""Recipe search over the Streamlit app's in-process indexes.
+
+The API reuses the frontend modules: the recipes frame, the trigram name
+index, the tag bitmap index and the nutrition matrix are loaded on the first
+request by recipe_loaders, as in the recipes view, so each gunicorn worker
+loads them once and serves every later request from memory. The
+name parameter is always a substring match on names, whatever search
+backend the Streamlit app is configured with.
+Predicate masks are cached by filter_engine exactly as for the recipes
+view; a page is a forward scan of a SortIndex permutation from the cursor
+(SortIndex.page_after), so deep pages cost no more than the first.
+"""
+import math
+
+import numpy as np
+
+from dataset_registry import file_version
+from filter_engine import evaluate
+from nutrition import NUTRITION_COLUMNS
+from recipe_filters import category_tags, recipe_predicates
+from recipe_loaders import load_name_index, load_nutrition_matrix, load_recipes, load_sort_index, load_tag_index
+from result_cache import dataset_version, state_key
+from search_backend import NameSearch
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+SORT_COLUMNS = ['minutes', 'n_ingredients', 'n_steps']
+RESULT_COLUMNS = ['id', 'name', 'minutes', 'n_ingredients', 'n_steps', 'submitted', 'description', 'tags']
+
+
+class SearchError(ValueError):
+    """Invalid search parameters"""
+
+
+def _list_param(params, name):
+    """Values of a repeatable, comma-separable parameter"""
+    return [value.strip() for raw in params.getlist(name) for value in raw.split(',') if value.strip()]
+
+
+def _number_param(params, name, cast=int):
+    value = params.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        number = cast(value)
+    except ValueError:
+        raise SearchError(f"{name} must be a number") from None
+    if isinstance(number, float) and not math.isfinite(number):
+        raise SearchError(f"{name} must be finite")
+    return number
+
+
+def _range_param(params, name, cast=int):
+    """[low, high] from name_min/name_max, or None if neither is given"""
+    low = _number_param(params, f"{name}_min", cast)
+    high = _number_param(params, f"{name}_max", cast)
+    if low is None and high is None:
+        return None
+    return [low, high]
+
+
+def parse_query(params):
+    """Canonical (filter state, sort, cursor, limit) of a query string
+
+    The filter state has the layout of recipe_filters; ranges left open on
+    one side are completed when the search runs.
+    """
+    try:
+        tags = category_tags(_list_param(params, 'category'))
+    except KeyError as exc:
+        raise SearchError(f"unknown category {exc.args[0]!r}") from None
+    tags.update(_list_param(params, 'tag'))
+
+    nutrition = {}
+    for column in NUTRITION_COLUMNS:
+        bounds = _range_param(params, column, float)
+        if bounds is not None:
+            nutrition[column] = bounds
+    state = {
+        'name': params.get('name', '').strip().lower(),
+        'minutes': _range_param(params, 'minutes'),
+        'n_ingredients': _range_param(params, 'n_ingredients'),
+        'tags': sorted(tags),
+        'nutrition': nutrition,
+    }
+
+    sort = params.get('sort', '').strip()
+    if sort and sort.lstrip('-') not in SORT_COLUMNS:
+        raise SearchError(f"sort must be one of {', '.join(SORT_COLUMNS)} (prefix - for descending)")
+    cursor = _number_param(params, 'cursor')
+    cursor = 0 if cursor is None else cursor
+    limit = _number_param(params, 'limit')
+    limit = DEFAULT_LIMIT if limit is None else limit
+    if cursor < 0:
+        raise SearchError("cursor must not be negative")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise SearchError(f"limit must be between 1 and {MAX_LIMIT}")
+    return state, sort, cursor, limit
+
+
+def query_etag(file_path, params):
+    """ETag of a query's response: changes with the parameters and the recipes file"""
+    try:
+        return state_key("recipe-search", file_version(file_path), list(parse_query(params)))
+    except (SearchError, OSError):
+        return None
+
+
+def _closed_range(bounds, values):
+    """[low, high] with open sides filled from the column's extremes"""
+    low, high = bounds
+    return [values.min() if low is None else low, values.max() if high is None else high]
+
+
+def _json_value(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def select(file_path, state):
+    """Boolean mask over the recipes of those matching a filter state"""
+    df = load_recipes(file_path)
+    state = dict(state)
+    for column in ('minutes', 'n_ingredients'):
+        if state[column] is not None:
+            state[column] = [int(bound) for bound in _closed_range(state[column], df[column])]
+
+    predicates = recipe_predicates(df, state,
+                                   lambda: NameSearch(load_name_index(file_path)),
+                                   lambda: load_tag_index(file_path),
+                                   lambda: load_nutrition_matrix(file_path))
+    return evaluate("recipes", dataset_version(file_path), len(df), predicates)
+
+
+def search(file_path, state, sort='', cursor=0, limit=DEFAULT_LIMIT):
+    """One page of matching recipes as JSON-ready dicts, the total match count and the next cursor"""
+    df = load_recipes(file_path)
+    keep = select(file_path, state)
+
+    column = sort.lstrip('-') or None
+    order = load_sort_index(file_path, column, not sort.startswith('-'))
+    rows, next_cursor = order.page_after(keep, cursor, limit)
+
+    page = df.iloc[rows]
+    nutrition = load_nutrition_matrix(file_path)[rows]
+    results = []
+    for position, (_, recipe) in enumerate(page.iterrows()):
+        item = {column: _json_value(recipe[column]) for column in RESULT_COLUMNS if column in page.columns}
+        item['nutrition'] = {column: _json_value(value) for column, value in zip(NUTRITION_COLUMNS, nutrition[position])}
+        results.append(item)
+    return results, int(np.count_nonzero(keep)), next_cursor
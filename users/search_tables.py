@@ -0,0 +1,101 @@
+"""FTS5 full-text tables over recipe and review text (SQLite only).
+
+Both are external-content tables: they store only the inverted index and
+read the text back from users_recipe (name, description and the
+plain-text ingredients) and users_interaction (review) for snippet().
+Triggers on the two content tables keep the indexes in step with every
+insert, update and delete, so rows written through the ORM (or any SQL)
+are searchable at once; import_foodcom drops them for the duration of a
+bulk load and rebuilds the tables instead.
+
+SQLite drops a table's triggers with it, and Django rebuilds a table for
+most field changes, so a later migration touching Recipe or Interaction
+loses them silently. ensure_triggers, connected to post_migrate, creates
+whichever are missing and reindexes the tables they cover.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+
+RECIPE_FTS_TABLE = 'users_recipe_fts'
+REVIEW_FTS_TABLE = 'users_interaction_fts'
+RECIPE_COLUMNS = 'name, description, ingredients_text'
+
+TABLES = [
+    f"""CREATE VIRTUAL TABLE {RECIPE_FTS_TABLE} USING fts5(
+            {RECIPE_COLUMNS},
+            content='users_recipe', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2')""",
+    f"""CREATE VIRTUAL TABLE {REVIEW_FTS_TABLE} USING fts5(
+            review,
+            content='users_interaction', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2')""",
+]
+
+# Trigger name -> (FTS table it maintains, statement)
+TRIGGERS = {
+    'users_recipe_fts_insert': (RECIPE_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS users_recipe_fts_insert AFTER INSERT ON users_recipe BEGIN
+            INSERT INTO {RECIPE_FTS_TABLE}(rowid, {RECIPE_COLUMNS})
+            VALUES (new.id, new.name, new.description, new.ingredients_text);
+        END"""),
+    'users_recipe_fts_delete': (RECIPE_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS users_recipe_fts_delete AFTER DELETE ON users_recipe BEGIN
+            INSERT INTO {RECIPE_FTS_TABLE}({RECIPE_FTS_TABLE}, rowid, {RECIPE_COLUMNS})
+            VALUES ('delete', old.id, old.name, old.description, old.ingredients_text);
+        END"""),
+    'users_recipe_fts_update': (RECIPE_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS users_recipe_fts_update AFTER UPDATE OF id, {RECIPE_COLUMNS} ON users_recipe
+        BEGIN
+            INSERT INTO {RECIPE_FTS_TABLE}({RECIPE_FTS_TABLE}, rowid, {RECIPE_COLUMNS})
+            VALUES ('delete', old.id, old.name, old.description, old.ingredients_text);
+            INSERT INTO {RECIPE_FTS_TABLE}(rowid, {RECIPE_COLUMNS})
+            VALUES (new.id, new.name, new.description, new.ingredients_text);
+        END"""),
+    'users_interaction_fts_insert': (REVIEW_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS users_interaction_fts_insert AFTER INSERT ON users_interaction BEGIN
+            INSERT INTO {REVIEW_FTS_TABLE}(rowid, review) VALUES (new.id, new.review);
+        END"""),
+    'users_interaction_fts_delete': (REVIEW_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS users_interaction_fts_delete AFTER DELETE ON users_interaction BEGIN
+            INSERT INTO {REVIEW_FTS_TABLE}({REVIEW_FTS_TABLE}, rowid, review) VALUES ('delete', old.id, old.review);
+        END"""),
+    'users_interaction_fts_update': (REVIEW_FTS_TABLE, f"""
+        CREATE TRIGGER IF NOT EXISTS users_interaction_fts_update AFTER UPDATE OF id, review ON users_interaction
+        BEGIN
+            INSERT INTO {REVIEW_FTS_TABLE}({REVIEW_FTS_TABLE}, rowid, review) VALUES ('delete', old.id, old.review);
+            INSERT INTO {REVIEW_FTS_TABLE}(rowid, review) VALUES (new.id, new.review);
+        END"""),
+}
+
+
+def rebuild(cursor, tables):
+    """Reindex FTS5 tables from their content tables in one pass"""
+    for table in tables:
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES('rebuild')")
+
+
+def _existing(cursor, kind, names):
+    cursor.execute(f"SELECT name FROM sqlite_master WHERE type = %s AND name IN ({', '.join(['%s'] * len(names))})",
+                   [kind, *names])
+    return {name for name, in cursor.fetchall()}
+
+
+def ensure_triggers(using=DEFAULT_DB_ALIAS, verbosity=1, **kwargs):
+    """post_migrate receiver: recreate missing sync triggers, and reindex the tables they maintain
+
+    Rows may have changed while a trigger was gone, so its FTS table is
+    rebuilt from its content table.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if _existing(cursor, 'table', [RECIPE_FTS_TABLE, REVIEW_FTS_TABLE]) != {RECIPE_FTS_TABLE, REVIEW_FTS_TABLE}:
+            # Migrated backwards past the search tables
+            return
+        missing = set(TRIGGERS) - _existing(cursor, 'trigger', list(TRIGGERS))
+        for name in sorted(missing):
+            cursor.execute(TRIGGERS[name][1])
+        stale = sorted({TRIGGERS[name][0] for name in missing})
+        rebuild(cursor, stale)
+    if missing and verbosity >= 1:
+        print(f"Recreated {len(missing)} search table triggers and reindexed {', '.join(stale)}")
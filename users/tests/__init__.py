@@ -0,0 +1,8 @@
+import sys
+
+from django.conf import settings
+
+# The synthetic Food.com files (foodcom_data) are shared with the frontend tests
+FRONTEND_TESTS_DIR = str(settings.FRONTEND_DIR / 'tests')
+if FRONTEND_TESTS_DIR not in sys.path:
+    sys.path.insert(0, FRONTEND_TESTS_DIR)
@@ -0,0 +1,103 @@
+import ast
+import io
+import json
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from foodcom_data import DataDirTestCase
+from users.export import row_chunks
+
+
+class RowChunksTests(SimpleTestCase):
+    def test_chunks_follow_the_mask_and_order(self):
+        rng = np.random.default_rng(2)
+        keep = rng.random(1000) < 0.3
+        order = rng.permutation(1000)
+        chunks = list(row_chunks(keep, chunk_rows=7, block_rows=50))
+        self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+        np.testing.assert_array_equal(np.concatenate(chunks), np.flatnonzero(keep))
+        chunks = list(row_chunks(keep, order, chunk_rows=7, block_rows=50))
+        np.testing.assert_array_equal(np.concatenate(chunks), order[keep[order]])
+        self.assertEqual(list(row_chunks(np.zeros(10, dtype=bool))), [])
+
+
+class ExportTests(DataDirTestCase, SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.recipes = pd.read_csv(cls.recipes_csv)
+        cls.reviews = pd.read_csv(cls.interactions_csv)
+
+    def setUp(self):
+        super().setUp()
+        override = override_settings(RECIPES_CSV=self.recipes_csv, INTERACTIONS_CSV=self.interactions_csv)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    async def export(self, kind, fmt, params=None):
+        response = await self.async_client.get(reverse('export', args=[kind, fmt]), params or {})
+        if not response.streaming:
+            return response, None
+        return response, b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8')
+
+    async def test_recipes_ndjson_matches_pandas(self):
+        response, body = await self.export('recipes', 'ndjson', {'minutes_max': 120, 'sort': '-minutes', 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in body.splitlines()]
+        expected = (self.recipes.assign(row=np.arange(len(self.recipes)))
+                    .query('minutes <= 120').sort_values(['minutes', 'row'], ascending=[False, True]))
+        # Every match, not one page: cursor and limit are ignored
+        self.assertEqual([record['id'] for record in records], expected['id'].tolist())
+        first = expected.iloc[0]
+        self.assertEqual(records[0]['tags'], ast.literal_eval(first['tags']))
+        self.assertEqual(records[0]['submitted'], first['submitted'])
+
+    async def test_recipes_csv_round_trips(self):
+        response, body = await self.export('recipes', 'csv', {'name': 'cake'})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="recipes.csv"')
+        exported = pd.read_csv(io.StringIO(body))
+        expected = self.recipes[self.recipes['name'].str.contains('cake', na=False)]
+        self.assertEqual(list(exported.columns), list(self.recipes.columns))
+        self.assertEqual(exported['id'].tolist(), expected['id'].tolist())
+        # List columns are JSON arrays
+        self.assertEqual([json.loads(tags) for tags in exported['tags']],
+                         [ast.literal_eval(tags) for tags in expected['tags']])
+        np.testing.assert_array_equal(exported['minutes'], expected['minutes'])
+
+    async def test_empty_csv_still_has_a_header(self):
+        response, body = await self.export('recipes', 'csv', {'name': 'no such recipe'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body.strip(), ','.join(self.recipes.columns))
+        response, body = await self.export('reviews', 'ndjson', {'q': 'no such words'})
+        self.assertEqual(body, '')
+
+    async def test_reviews_match_pandas(self):
+        response, body = await self.export('reviews', 'ndjson',
+                                           {'rating': '4,5', 'date_min': '2004-01-01', 'min_length': 10})
+        records = [json.loads(line) for line in body.splitlines()]
+        lengths = self.reviews['review'].astype(str).str.len()
+        expected = self.reviews[self.reviews['rating'].isin([4, 5]) & (self.reviews['date'] >= '2004-01-01')
+                                & (lengths >= 10)]
+        self.assertEqual([record['user_id'] for record in records], expected['user_id'].tolist())
+        self.assertEqual([record['date'] for record in records], expected['date'].tolist())
+        self.assertNotIn('review_length', records[0])
+
+        response, body = await self.export('reviews', 'csv', {'q': 'salty'})
+        exported = pd.read_csv(io.StringIO(body))
+        expected = self.reviews[self.reviews['review'].fillna('').str.split().map(lambda words: 'salty' in words)]
+        self.assertEqual(list(exported.columns), list(self.reviews.columns))
+        self.assertEqual(exported['review'].tolist(), expected['review'].tolist())
+
+    async def test_invalid_parameters_and_missing_files(self):
+        for kind, params in [('recipes', {'sort': 'name'}), ('recipes', {'category': 'nope'}),
+                             ('recipes', {'minutes_min': 'x'}), ('reviews', {'rating': 'five'}),
+                             ('reviews', {'date_min': '2004-13-45'}), ('reviews', {'min_length': 'long'})]:
+            response, _ = await self.export(kind, 'ndjson', params)
+            self.assertEqual(response.status_code, 400, params)
+        with self.settings(INTERACTIONS_CSV=self.interactions_csv + '.missing'):
+            response, _ = await self.export('reviews', 'csv')
+            self.assertEqual(response.status_code, 503)
@@ -0,0 +1,83 @@
+import ast
+import io
+from unittest import mock
+
+import pandas as pd
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+from foodcom_data import DataDirTestCase
+from users.management.commands.import_foodcom import Command
+from users.models import Interaction, Recipe, Tag
+
+RecipeTag = Recipe.tags.through
+
+
+def table_indexes(model):
+    """(name, columns, unique) of a table's secondary indexes"""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return sorted((name, tuple(constraint['columns']), bool(constraint['unique']))
+                  for name, constraint in constraints.items()
+                  if constraint['index'] and not constraint['primary_key'])
+
+
+class ImportFoodcomTests(DataDirTestCase, TransactionTestCase):
+    def import_files(self, chunksize=70):
+        call_command('import_foodcom', recipes=self.recipes_csv, interactions=self.interactions_csv,
+                     chunksize=chunksize, stdout=io.StringIO())
+
+    def test_tables_match_the_csv_files(self):
+        self.import_files()
+        recipes = pd.read_csv(self.recipes_csv)
+        interactions = pd.read_csv(self.interactions_csv)
+        tags = recipes['tags'].map(ast.literal_eval)
+
+        self.assertEqual(Recipe.objects.count(), len(recipes))
+        self.assertEqual(Tag.objects.count(), len({tag for items in tags for tag in items}))
+        self.assertEqual(RecipeTag.objects.count(), sum(len(set(items)) for items in tags))
+        self.assertEqual(Interaction.objects.count(), len(interactions))
+
+        recipe = Recipe.objects.get(id=recipes['id'][3])
+        self.assertEqual(recipe.name, recipes['name'][3])
+        self.assertEqual(sorted(recipe.tags.values_list('name', flat=True)), sorted(set(tags[3])))
+        self.assertEqual(recipe.ingredients, ast.literal_eval(recipes['ingredients'][3]))
+        self.assertEqual(Recipe.objects.get(id=recipes['id'][0]).name, '')
+
+        # Interaction ids are CSV row positions + 1
+        for row in [0, 1, len(interactions) - 1]:
+            interaction = Interaction.objects.get(id=row + 1)
+            self.assertEqual(interaction.user_id, interactions['user_id'][row])
+            self.assertEqual(interaction.recipe_id, interactions['recipe_id'][row])
+            self.assertEqual(interaction.rating, interactions['rating'][row])
+
+    def test_indexes_are_dropped_during_the_load(self):
+        during = {}
+        load_interactions = Command.load_interactions
+
+        def record_indexes(command, *args):
+            during.update({model: table_indexes(model) for model in (Recipe, Interaction, RecipeTag)})
+            return load_interactions(command, *args)
+
+        with mock.patch.object(Command, 'load_interactions', record_indexes):
+            self.import_files()
+        self.assertEqual(during, {Recipe: [], Interaction: [], RecipeTag: []})
+        self.assertEqual(Interaction.objects.count(), self.n_interactions)
+
+    def test_reimport_restores_indexes_and_sequences(self):
+        indexes = {model: table_indexes(model) for model in (Recipe, Interaction, RecipeTag)}
+        self.assertIn((('recipe_id', 'tag_id'), True), [index[1:] for index in indexes[RecipeTag]])
+        self.import_files()
+        self.import_files(chunksize=1000)
+        for model, expected in indexes.items():
+            self.assertEqual(table_indexes(model), expected, model.__name__)
+        self.assertEqual(Interaction.objects.count(), self.n_interactions)
+
+        # Rows created through the ORM get ids after the imported ones
+        recipe = Recipe.objects.first()
+        created = Interaction.objects.create(user_id=1, recipe=recipe, rating=5, review='new')
+        self.assertGreater(created.id, self.n_interactions)
+        tag = Tag.objects.create(name='brand-new-tag')
+        recipe.tags.add(tag)
+        self.assertEqual(Tag.objects.count(), Tag.objects.filter(id__lte=tag.id).count())
@@ -0,0 +1,130 @@
+import ast
+import asyncio
+import threading
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from foodcom_data import DataDirTestCase
+from recipe_filters import CATEGORY_TAGS
+from users import views_api
+
+
+class RecipeSearchApiTests(DataDirTestCase, SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        df = pd.read_csv(cls.recipes_csv)
+        df['tags'] = df['tags'].map(ast.literal_eval)
+        calories = df['nutrition'].map(lambda value: ast.literal_eval(value)[0] if isinstance(value, str) else np.nan)
+        cls.df = df.assign(calories=calories, row=np.arange(len(df)))
+
+    def setUp(self):
+        super().setUp()
+        override = override_settings(RECIPES_CSV=self.recipes_csv)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get(self, params, **headers):
+        return self.client.get(reverse('recipe-search'), params, headers=headers)
+
+    def expected_ids(self, name='', minutes=None, tags=(), calories_max=None, sort=''):
+        """The same query with pandas"""
+        df = self.df
+        keep = pd.Series(True, index=df.index)
+        if name:
+            keep &= df['name'].str.lower().str.contains(name, regex=False, na=False)
+        if minutes is not None:
+            keep &= df['minutes'].between(*minutes)
+        if tags:
+            keep &= df['tags'].map(lambda items: any(tag in items for tag in tags))
+        if calories_max is not None:
+            keep &= df['calories'] <= calories_max
+        selected = df[keep]
+        if sort:
+            # Ties (and missing values, last) keep file order
+            selected = selected.sort_values([sort.lstrip('-'), 'row'], ascending=[not sort.startswith('-'), True],
+                                            na_position='last')
+        return selected['id'].tolist()
+
+    def all_pages(self, params):
+        ids, cursor = [], 0
+        while cursor is not None:
+            response = self.get({**params, 'cursor': cursor, 'limit': 17})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids += [item['id'] for item in data['results']]
+            cursor = data['next_cursor']
+        return ids, data['count']
+
+    def test_filters_and_paging_match_pandas(self):
+        queries = [
+            ({}, {}),
+            ({'name': 'Chicken'}, {'name': 'chicken'}),
+            ({'name': 'crème'}, {'name': 'crème'}),
+            ({'minutes_min': 30, 'minutes_max': 120}, {'minutes': (30, 120)}),
+            ({'minutes_max': 60, 'sort': '-minutes'}, {'minutes': (0, 60), 'sort': '-minutes'}),
+            ({'category': 'vegetarian,italian', 'sort': 'n_ingredients'},
+             {'tags': CATEGORY_TAGS['vegetarian'] | CATEGORY_TAGS['italian'], 'sort': 'n_ingredients'}),
+            ({'tag': ['easy', 'oven'], 'calories_max': 150}, {'tags': {'easy', 'oven'}, 'calories_max': 150}),
+            ({'name': 'no such recipe'}, {'name': 'no such recipe'}),
+        ]
+        for params, expected in queries:
+            ids, count = self.all_pages(params)
+            expected_ids = self.expected_ids(**expected)
+            self.assertEqual(ids, expected_ids, params)
+            self.assertEqual(count, len(expected_ids), params)
+
+    def test_results_carry_the_recipe_fields(self):
+        data = self.get({'sort': 'minutes', 'limit': 100}).json()
+        by_id = self.df.set_index('id')
+        for item in data['results']:
+            recipe = by_id.loc[item['id']]
+            self.assertEqual(item['minutes'], recipe['minutes'])
+            self.assertEqual(item['name'], None if pd.isna(recipe['name']) else recipe['name'])
+            self.assertEqual(item['tags'], recipe['tags'])
+            if pd.isna(recipe['calories']):
+                self.assertIsNone(item['nutrition']['calories'])
+            else:
+                self.assertAlmostEqual(item['nutrition']['calories'], recipe['calories'], places=3)
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in [{'cursor': -1}, {'cursor': 'abc'}, {'limit': 0}, {'limit': 101}, {'limit': '2.5'},
+                       {'sort': 'name'}, {'sort': '-rating'}, {'category': 'no-such-category'},
+                       {'minutes_min': 'ten'}, {'calories_max': 'inf'}, {'calories_min': 'nan'}]:
+            response = self.get(params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+
+    def test_unchanged_pages_revalidate(self):
+        response = self.get({'name': 'cake', 'limit': 5})
+        etag = response['ETag']
+        self.assertEqual(self.get({'name': 'cake', 'limit': 5}, if_none_match=etag).status_code, 304)
+        # The same filters in another order are the same query
+        response = self.get({'limit': 5, 'name': ' Cake '}, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.get({'name': 'cake', 'limit': 6}, if_none_match=etag).status_code, 200)
+        self.assertEqual(self.get({'name': 'cake', 'cursor': 5, 'limit': 5}, if_none_match=etag).status_code, 200)
+
+    def test_missing_recipes_file(self):
+        with self.settings(RECIPES_CSV=self.recipes_csv + '.missing'):
+            self.assertEqual(self.get({}).status_code, 503)
+
+    async def test_concurrent_searches_run_in_parallel(self):
+        # Both searches must be running at once to pass the barrier: a single sync thread would deadlock it
+        barrier = threading.Barrier(2, timeout=10)
+        search = views_api.search
+
+        def blocking_search(*args):
+            barrier.wait()
+            return search(*args)
+
+        url = reverse('recipe-search')
+        with mock.patch.object(views_api, 'search', blocking_search):
+            responses = await asyncio.gather(self.async_client.get(url, {'name': 'cake'}),
+                                             self.async_client.get(url, {'name': 'pie'}))
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(responses[0].json()['count'], len(self.expected_ids(name='cake')))
@@ -0,0 +1,132 @@
+import ast
+import io
+import re
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+from foodcom_data import DataDirTestCase
+from id_index import IdIndex
+from search_backend import FTSSearch, sqlite_recipe_search, sqlite_review_search
+from users.models import Interaction, Recipe
+
+
+def django_execute(search, sql, params):
+    """FTSSearch._execute on the test database, which is not a file the backend can open"""
+    with connection.cursor() as cursor:
+        cursor.execute(sql.replace('?', '%s'), params)
+        return cursor.fetchall()
+
+
+def word_match(texts, query):
+    """Positions of the texts containing every word of query, as whole words"""
+    words = set(re.findall(r'\w+', query.lower()))
+    tokens = pd.Series(texts).fillna('').str.lower().map(lambda text: set(re.findall(r'\w+', text)))
+    return np.flatnonzero(tokens.map(words.issubset).to_numpy())
+
+
+class SearchTablesTests(DataDirTestCase, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        call_command('import_foodcom', recipes=self.recipes_csv, interactions=self.interactions_csv,
+                     stdout=io.StringIO())
+        patcher = mock.patch.object(FTSSearch, '_execute', django_execute)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.recipes = pd.read_csv(self.recipes_csv)
+        self.interactions = pd.read_csv(self.interactions_csv)
+        self.reviews = self.interactions['review']
+        ids = self.recipes['id'].to_numpy()
+        self.recipe_search = sqlite_recipe_search(IdIndex.build(ids), ids)
+        self.review_search = sqlite_review_search(self.interactions['user_id'], self.interactions['recipe_id'])
+
+    def recipe_texts(self):
+        ingredients = self.recipes['ingredients'].map(lambda items: ', '.join(ast.literal_eval(items)))
+        return (self.recipes['name'].fillna('') + ' ' + self.recipes['description'].fillna('') + ' '
+                + ingredients)
+
+    def test_recipe_matches_cover_name_description_and_ingredients(self):
+        texts = self.recipe_texts()
+        for query in ['crème', 'brûlée cake', 'fraîche', 'lemon juice', "chef's knife", 'pasta garlic']:
+            np.testing.assert_array_equal(self.recipe_search.matches(query), word_match(texts, query), query)
+        self.assertGreater(len(self.recipe_search.matches('crème')), 0)
+
+    def test_diacritics_are_ignored(self):
+        np.testing.assert_array_equal(self.recipe_search.matches('creme'), self.recipe_search.matches('crème'))
+        np.testing.assert_array_equal(self.recipe_search.matches('FRAICHE'), word_match(self.recipe_texts(), 'fraîche'))
+
+    def test_review_matches(self):
+        for query in ['salty', 'loved chocolate', 'crème']:
+            np.testing.assert_array_equal(self.review_search.matches(query), word_match(self.reviews, query), query)
+        rows, scores = self.review_search.ranked('salty chicken')
+        np.testing.assert_array_equal(np.sort(rows), word_match(self.reviews, 'salty chicken'))
+        self.assertTrue((np.diff(scores) <= 0).all())
+        self.assertTrue(all('**' in snippet for snippet in self.review_search.snippets('salty', rows[:5])))
+
+    def test_orm_edits_are_searchable_at_once(self):
+        recipe = Recipe.objects.create(id=1, name='Zabaglione', minutes=5, contributor_id=1, n_steps=1,
+                                       n_ingredients=2, ingredients=['crème anglaise', 'marsala'])
+        self.assertEqual(recipe.ingredients_text, 'crème anglaise, marsala')
+
+        def recipe_ids(query):
+            return django_execute(None, "SELECT rowid FROM users_recipe_fts WHERE users_recipe_fts MATCH ?",
+                                  (query,))
+
+        self.assertEqual(recipe_ids('zabaglione'), [(1,)])
+        self.assertEqual(recipe_ids('marsala'), [(1,)])
+        recipe.name = 'Sabayon'
+        recipe.ingredients = ['eggs', 'sugar']
+        recipe.save(update_fields=['name', 'ingredients'])
+        self.assertEqual(recipe_ids('zabaglione'), [])
+        self.assertEqual(recipe_ids('marsala'), [])
+        self.assertEqual(recipe_ids('sabayon'), [(1,)])
+
+        def interaction_ids(query):
+            return django_execute(None, "SELECT rowid FROM users_interaction_fts WHERE users_interaction_fts MATCH ?",
+                                  (query,))
+
+        interaction = Interaction.objects.create(user_id=7, recipe=recipe, rating=5, review='silky sabayon')
+        self.assertEqual(interaction_ids('silky'), [(interaction.id,)])
+        # Not a row of the reviews file
+        self.assertEqual(len(self.review_search.matches('silky')), 0)
+        Interaction.objects.filter(id=interaction.id).update(review='grainy')
+        self.assertEqual(interaction_ids('silky'), [])
+        recipe.delete()
+        self.assertEqual(recipe_ids('sabayon'), [])
+        self.assertEqual(interaction_ids('grainy'), [])
+
+        Interaction.objects.filter(id=1).update(review='velvety')
+        self.assertEqual(self.review_search.matches('velvety').tolist(), [0])
+
+    def test_reviews_of_another_file_map_by_user_and_recipe(self):
+        # A shuffled half of the imported file, without the pairs rated twice
+        subset = self.interactions.drop_duplicates(['user_id', 'recipe_id'], keep=False)
+        subset = subset.sample(frac=0.5, random_state=0).reset_index(drop=True)
+        search = sqlite_review_search(subset['user_id'], subset['recipe_id'])
+        for query in ['salty', 'loved chocolate', 'crème']:
+            np.testing.assert_array_equal(search.matches(query), word_match(subset['review'], query), query)
+        rows, _ = search.ranked('salty chicken')
+        np.testing.assert_array_equal(np.sort(rows), word_match(subset['review'], 'salty chicken'))
+        self.assertTrue(all('**' in snippet for snippet in search.snippets('salty', rows[:5])))
+
+    def test_pairs_rated_twice_keep_their_own_reviews(self):
+        twice = self.interactions[self.interactions.duplicated(['user_id', 'recipe_id'], keep=False)]
+        self.assertGreater(len(twice), 0)
+        rows_by_id, ids_by_row = self.review_search.mapping()
+        np.testing.assert_array_equal(ids_by_row[twice.index], twice.index + 1)
+        np.testing.assert_array_equal(rows_by_id[twice.index + 1], twice.index)
+
+    def test_migrate_recreates_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER users_interaction_fts_update")
+        Interaction.objects.filter(id=1).update(review='velvety')
+        self.assertEqual(len(self.review_search.matches('velvety')), 0)
+
+        call_command('migrate', verbosity=0)
+        self.assertEqual(self.review_search.matches('velvety').tolist(), [0])
+        Interaction.objects.filter(id=1).update(review='grainy')
+        self.assertEqual(len(self.review_search.matches('velvety')), 0)
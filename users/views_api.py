@@ -0,0 +1,59 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_GET
+
+from .export import EXPORT_FORMATS, encoded_chunks, select_recipes, select_reviews, stream_in_thread
+from .recipe_search import SearchError, parse_query, query_etag, search
+
+EXPORTS = {
+    'recipes': (select_recipes, lambda: settings.RECIPES_CSV),
+    'reviews': (select_reviews, lambda: settings.INTERACTIONS_CSV),
+}
+
+
+def recipe_search_etag(request):
+    return query_etag(settings.RECIPES_CSV, request.GET)
+
+
+@require_GET
+@condition(etag_func=recipe_search_etag)
+async def recipe_search(request):
+    """Paginated recipe search with the filters of the Streamlit recipes view
+
+    Pass next_cursor back as cursor to fetch the following page; responses
+    carry an ETag, so unchanged pages revalidate with 304 Not Modified.
+    The search runs on a worker thread of its own, so concurrent requests
+    are not queued behind Django's single thread for sync views.
+    """
+    try:
+        state, sort, cursor, limit = parse_query(request.GET)
+    except SearchError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    try:
+        results, count, next_cursor = await sync_to_async(search, thread_sensitive=False)(
+            settings.RECIPES_CSV, state, sort, cursor, limit)
+    except FileNotFoundError:
+        return JsonResponse({'error': 'recipes file not found'}, status=503)
+    return JsonResponse({'count': count, 'next_cursor': next_cursor, 'results': results})
+
+
+@require_GET
+async def export(request, kind, fmt):
+    """Stream every recipe or review matching the filters as NDJSON or CSV
+
+    Recipes take the search parameters (cursor and limit are ignored);
+    reviews take rating, date_min, date_max, min_length and q. Must be
+    served over ASGI: a WSGI server would buffer the whole export.
+    """
+    select, file_path = EXPORTS[kind]
+    try:
+        df, keep, order = await sync_to_async(select, thread_sensitive=False)(file_path(), request.GET)
+    except SearchError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    except FileNotFoundError:
+        return JsonResponse({'error': f'{kind} file not found'}, status=503)
+    response = StreamingHttpResponse(stream_in_thread(encoded_chunks(df, keep, order, fmt)),
+                                     content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    return response